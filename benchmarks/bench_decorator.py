@@ -0,0 +1,70 @@
+"""Micro-benchmark of the cache decorator overhead (dict-backed cache).
+
+Usage: python -m benchmarks.bench_decorator [--number N]
+
+It prints the mean time per call (in microseconds) of a cache hit through the
+decorator (function and method), with and without a cache hook, compared to
+a direct call of the undecorated function.
+
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict, Iterable
+
+from rtc import CacheInfo, RedisTaggedCache
+
+
+def noop_hook(
+    cache_key: str,
+    cache_tags: Iterable[str],
+    cache_info: CacheInfo,
+    userdata: Any = None,
+) -> None:
+    pass
+
+
+def make_cases(cache: RedisTaggedCache) -> Dict[str, Callable[[], Any]]:
+    def func(a: int, b: str, c: int = 0) -> int:
+        return a + c
+
+    @cache.decorator(tags=["tag1", "tag2"])
+    def decorated_func(a: int, b: str, c: int = 0) -> int:
+        return a + c
+
+    class A:
+        @cache.decorator(tags=["tag1", "tag2"])
+        def decorated_method(self, a: int, b: str, c: int = 0) -> int:
+            return a + c
+
+    @cache.decorator(tags=lambda a, b, c=0: [f"tag{a}", "tag2"])
+    def decorated_func_dynamic_tags(a: int, b: str, c: int = 0) -> int:
+        return a + c
+
+    instance = A()
+    return {
+        "direct call": lambda: func(1, "foo", c=2),
+        "function (hit)": lambda: decorated_func(1, "foo", c=2),
+        "function (hit, dynamic tags)": lambda: decorated_func_dynamic_tags(
+            1, "foo", c=2
+        ),
+        "method (hit)": lambda: instance.decorated_method(1, "foo", c=2),
+    }
+
+
+def bench(number: int) -> None:
+    for with_hook in (False, True):
+        cache = RedisTaggedCache(
+            in_local_memory=True, cache_hook=noop_hook if with_hook else None
+        )
+        for name, case in make_cases(cache).items():
+            case()  # warm the cache
+            elapsed = min(timeit.repeat(case, number=number, repeat=5))
+            label = f"{name}{' + hook' if with_hook else ''}"
+            print(f"{label:<30} {elapsed / number * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    bench(parser.parse_args().number)
@@ -0,0 +1,123 @@
+"""Multi-threaded throughput benchmark of the in-memory (dict) adapters.
+
+Usage: python -m benchmarks.bench_dict_adapters [--duration SECONDS]
+    [--threads 1,2,4,8] [--keys N]
+
+For each number of threads, all threads run the same mix of operations during
+the given duration:
+
+- storage: 90% reads, 10% writes (on random keys),
+- metadata: reads of 3 random tags (with 1% of invalidations),
+- locks: lock/unlock of random keys.
+
+It prints the total throughput (in operations per second) for each adapter
+configuration (1 shard, i.e. a single lock, versus 16 shards).
+
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Callable, Dict, List
+
+from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
+from rtc.infra.adapters.storage.dict import DictStorageAdapter
+
+Operation = Callable[[random.Random], None]
+
+
+def make_storage_operation(adapter: DictStorageAdapter, keys: int) -> Operation:
+    value = b"x" * 100
+    for i in range(keys):
+        adapter.set("ns", f"key{i}", "hash", value, 0)
+
+    def operation(rng: random.Random) -> None:
+        key = f"key{rng.randrange(keys)}"
+        if rng.random() < 0.1:
+            adapter.set("ns", key, "hash", value, 0)
+        else:
+            adapter.get("ns", key, "hash")
+
+    return operation
+
+
+def make_metadata_operation(adapter: DictMetadataAdapter, keys: int) -> Operation:
+    def operation(rng: random.Random) -> None:
+        tag_names = [f"tag{rng.randrange(keys)}" for _ in range(3)]
+        if rng.random() < 0.01:
+            adapter.invalidate_tags("ns", tag_names[:1], None)
+        else:
+            adapter.get_or_set_tag_values("ns", tag_names, None)
+
+    return operation
+
+
+def make_lock_operation(adapter: DictMetadataAdapter, keys: int) -> Operation:
+    def operation(rng: random.Random) -> None:
+        key = f"key{rng.randrange(keys)}"
+        lock_id = adapter.lock("ns", key, "hash", 10, 1)
+        if lock_id is not None:
+            adapter.unlock("ns", key, "hash", lock_id)
+
+    return operation
+
+
+def run(operation: Operation, threads: int, duration: float) -> float:
+    """Run the operation in the given number of threads, return ops/s."""
+    barrier = threading.Barrier(threads + 1)
+    stop = threading.Event()
+    counts: List[int] = []
+
+    def _run(seed: int) -> None:
+        rng = random.Random(seed)
+        count = 0
+        barrier.wait()
+        while not stop.is_set():
+            for _ in range(100):
+                operation(rng)
+            count += 100
+        counts.append(count)
+
+    workers = [threading.Thread(target=_run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    before = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - before)
+
+
+def get_operations(keys: int) -> Dict[str, Operation]:
+    operations: Dict[str, Operation] = {}
+    for shards in (1, 16):
+        suffix = f"({shards} shard{'s' if shards > 1 else ''})"
+        operations[f"storage {suffix}"] = make_storage_operation(
+            DictStorageAdapter(shards=shards, expiry_sweep=False), keys
+        )
+        operations[f"metadata {suffix}"] = make_metadata_operation(
+            DictMetadataAdapter(shards=shards, expiry_sweep=False), keys
+        )
+        operations[f"locks {suffix}"] = make_lock_operation(
+            DictMetadataAdapter(shards=shards, expiry_sweep=False), keys
+        )
+    return operations
+
+
+def bench(duration: float, threads: List[int], keys: int) -> None:
+    for name, operation in get_operations(keys).items():
+        for n in threads:
+            ops = run(operation, n, duration)
+            print(f"{name:<30} {n:3d} thread(s) {ops:12.0f} ops/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=1.0)
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+    bench(args.duration, [int(x) for x in args.threads.split(",")], args.keys)
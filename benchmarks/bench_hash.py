@@ -0,0 +1,47 @@
+"""Micro-benchmark of the key hashing (keys per second for each hash backend).
+
+Usage: python -m benchmarks.bench_hash [--number N]
+
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict
+
+from rtc.app.hash import HASH_BACKENDS, set_hash_backend, short_hash
+from rtc.infra.adapters.metadata.redis import get_tag_key
+from rtc.infra.adapters.storage.redis import get_storage_key
+
+NAMESPACE = "my-application-namespace"
+TAG_NAME = "user-1234567"
+KEY = "a4Sx9QwZ0pE"  # typical decorator key (already a short hash)
+METADATA_HASH = "Qm9vTmFtZQ"
+
+
+def make_cases() -> Dict[str, Callable[[], Any]]:
+    return {
+        "short_hash (tag name)": lambda: short_hash(TAG_NAME),
+        "get_tag_key (not memoized)": lambda: (
+            f"rtc:{short_hash(NAMESPACE)}:t:{short_hash(TAG_NAME)}"
+        ),
+        "get_tag_key": lambda: get_tag_key(NAMESPACE, TAG_NAME),
+        "get_storage_key": lambda: get_storage_key(NAMESPACE, KEY, METADATA_HASH),
+    }
+
+
+def bench(number: int) -> None:
+    try:
+        for backend in HASH_BACKENDS:
+            set_hash_backend(backend)
+            for name, case in make_cases().items():
+                elapsed = min(timeit.repeat(case, number=number, repeat=5))
+                label = f"{backend}: {name}"
+                print(f"{label:<35} {number / elapsed:12,.0f} keys/s")
+    finally:
+        set_hash_backend("md5")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000)
+    bench(parser.parse_args().number)
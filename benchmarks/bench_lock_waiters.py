@@ -0,0 +1,63 @@
+"""Benchmark of the lock waiters latency (a running Redis is required).
+
+Usage: python -m benchmarks.bench_lock_waiters [--host HOST] [--port PORT]
+    [--waiters N] [--compute-time SECONDS]
+
+N threads call concurrently the same (uncached) function decorated with
+lock=True. One of them gets the lock and computes the value, the other ones
+wait for it. It prints the distribution of the extra latency of waiters
+(time between the value being stored and the waiter getting it).
+
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from typing import List
+
+from rtc import RedisTaggedCache
+
+
+def bench(host: str, port: int, waiters: int, compute_time: float) -> None:
+    cache = RedisTaggedCache(
+        namespace=f"bench-lock-waiters-{time.time()}", host=host, port=port
+    )
+    stored_at: List[float] = []
+
+    @cache.decorator(lock=True, lock_timeout=30)
+    def decorated() -> str:
+        time.sleep(compute_time)
+        stored_at.append(time.perf_counter())  # (approximately)
+        return "value"
+
+    barrier = threading.Barrier(waiters)
+    done_at: List[float] = []
+
+    def _call() -> None:
+        barrier.wait()
+        assert decorated() == "value"
+        done_at.append(time.perf_counter())
+
+    threads = [threading.Thread(target=_call) for _ in range(waiters)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.invalidate_all()
+    latencies = sorted((x - stored_at[0]) * 1000 for x in done_at)
+    quantiles = statistics.quantiles(latencies, n=10)
+    print(f"waiters: {waiters}, computations: {len(stored_at)}")
+    print(f"{'p50':<10} {statistics.median(latencies):10.2f} ms")
+    print(f"{'p90':<10} {quantiles[-1]:10.2f} ms")
+    print(f"{'max':<10} {latencies[-1]:10.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--waiters", type=int, default=30)
+    parser.add_argument("--compute-time", type=float, default=0.1)
+    args = parser.parse_args()
+    bench(args.host, args.port, args.waiters, args.compute_time)
@@ -0,0 +1,267 @@
+"""Micro-benchmark suite of the cache hot paths (JSON output and regression check).
+
+Usage: python -m benchmarks.suite [--json FILE] [--compare FILE] [--threshold T]
+                                  [--filter TEXT] [--redis-server PATH | --no-redis]
+
+Building blocks are timed in isolation (hashing, decorator keys, metadata hash,
+Service.get/set and the full decorator hit/miss paths) with the dict adapters
+and, if a `redis-server` binary is available, against a redis-server spawned
+locally (on a free port, without persistence) for the duration of the suite.
+
+Each case is timed with timeit: the number of calls per run is chosen to last
+at least 0.2s, the best of 5 runs is kept and reported in microseconds per call.
+
+With --json FILE, results are written as JSON:
+`{"meta": {...}, "results": {"<case>": {"us_per_call": ..., "number": ...}}}`.
+
+With --compare FILE (a previous --json output, for example of the main branch),
+each case is compared to its baseline and the exit code is 1 if a case is slower
+than `baseline * (1 + threshold)`. The default threshold is 0.25 (25% slower):
+micro-benchmarks on a laptop or a shared CI runner easily vary by 10-15% between
+two runs, so a lower threshold must only be used on a quiet dedicated machine.
+Cases which are not in both files are ignored.
+
+Typical workflow:
+    python -m benchmarks.suite --json before.json
+    (make your change)
+    python -m benchmarks.suite --compare before.json
+
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import redis
+
+from benchmarks import bench_decorator, bench_hash
+from rtc import MetricsHook, RedisTaggedCache, TagSet
+from rtc.app.decorator import _get_key, _make_static_infos
+from rtc.app.hash import HASH_BACKENDS, set_hash_backend
+
+DEFAULT_THRESHOLD = 0.25
+"""Default regression threshold (a case is a regression if > baseline * (1 + threshold))."""
+
+REPEAT = 5
+TAGS = ["tag1", "tag2", "tag3"]
+
+Cases = Dict[str, Callable[[], Any]]
+
+
+def get_hash_cases() -> Cases:
+    cases: Cases = {}
+    for backend in HASH_BACKENDS:
+        for name, case in bench_hash.make_cases().items():
+            # (the backend is set once per timing, see _time_case())
+            case.hash_backend = backend  # type: ignore
+            cases[f"hash/{backend}/{name}"] = case
+    return cases
+
+
+def get_key_cases() -> Cases:
+    def func(*args, **kwargs):
+        pass
+
+    static_infos = _make_static_infos(func, "")
+    shapes: Dict[str, Any] = {
+        "no args": ((), {}),
+        "3 ints": ((1, 2, 3), {}),
+        "str + kwargs": (("user-1234",), {"page": 2, "lang": "fr"}),
+        "nested": (({"ids": [1, 2, 3], "filters": {"active": True}},), {}),
+    }
+
+    def make_case(args: Any, kwargs: Any) -> Callable[[], Any]:
+        return lambda: _get_key(static_infos, None, None, *args, **kwargs)
+
+    return {
+        f"decorator/_get_key/{name}": make_case(args, kwargs)
+        for name, (args, kwargs) in shapes.items()
+    }
+
+
+def get_cache_cases(backend: str, cache: RedisTaggedCache) -> Cases:
+    service = cache._service
+    metadata_service = service.metadata_service
+    tag_set = TagSet(TAGS)
+    service.set("key", "value", TAGS)
+    counter = itertools.count()
+
+    @cache.decorator(tags=TAGS)
+    def decorated(i: int) -> int:
+        return i
+
+    decorated(0)
+    return {
+        f"{backend}/get_metadata_hash": lambda: metadata_service.get_metadata_hash(
+            TAGS
+        ),
+        f"{backend}/get_metadata_hash (TagSet)": (
+            lambda: metadata_service.get_metadata_hash(tag_set)
+        ),
+        f"{backend}/Service.get (hit)": lambda: service.get("key", TAGS),
+        f"{backend}/Service.set": lambda: service.set("key", "value", TAGS),
+        f"{backend}/decorator (hit)": lambda: decorated(0),
+        f"{backend}/decorator (miss)": lambda: decorated(next(counter)),
+    }
+
+
+def get_decorator_overhead_cases() -> Cases:
+    cache = RedisTaggedCache(in_local_memory=True)
+    cases = {
+        f"decorator/{name}": case
+        for name, case in bench_decorator.make_cases(cache).items()
+    }
+    cache = RedisTaggedCache(in_local_memory=True, cache_hook=MetricsHook())
+    cases["decorator/function (hit) + MetricsHook"] = bench_decorator.make_cases(cache)[
+        "function (hit)"
+    ]
+    return cases
+
+
+def _get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def spawn_redis_server(path: str) -> Iterator[int]:
+    """Spawn a redis-server (without persistence) and yield its port."""
+    port = _get_free_port()
+    process = subprocess.Popen(
+        [path, "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        client = redis.Redis(port=port)
+        for _ in range(100):
+            try:
+                client.ping()
+                break
+            except redis.exceptions.ConnectionError:
+                time.sleep(0.05)
+        else:
+            raise RuntimeError(f"can't connect to the spawned redis-server ({path})")
+        client.close()
+        yield port
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def _time_case(case: Callable[[], Any]) -> Dict[str, Any]:
+    backend = getattr(case, "hash_backend", None)
+    if backend is not None:
+        set_hash_backend(backend)
+    try:
+        timer = timeit.Timer(case)
+        number, _ = timer.autorange()
+        elapsed = min(timer.repeat(number=number, repeat=REPEAT))
+    finally:
+        if backend is not None:
+            set_hash_backend("md5")
+    return {"us_per_call": elapsed / number * 1e6, "number": number}
+
+
+def run(cases: Cases, name_filter: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, case in cases.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = _time_case(case)
+        print(f"{name:<50} {results[name]['us_per_call']:10.3f} us/call", flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    """Print the comparison with the baseline and return the regressed case names."""
+    regressions: List[str] = []
+    print(f"\n{'case':<50} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["us_per_call"]
+        after = result["us_per_call"]
+        ratio = after / before if before > 0 else 1.0
+        regressed = ratio > 1.0 + threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<50} {before:10.3f} {after:10.3f} {ratio:7.2f}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare to this JSON file (baseline)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--filter", help="only run cases containing this text")
+    parser.add_argument(
+        "--redis-server",
+        default=shutil.which("redis-server"),
+        help="path of the redis-server binary (default: from PATH)",
+    )
+    parser.add_argument("--no-redis", action="store_true", help="skip Redis cases")
+    args = parser.parse_args(argv)
+
+    cases: Cases = {}
+    cases.update(get_hash_cases())
+    cases.update(get_key_cases())
+    cases.update(get_decorator_overhead_cases())
+    cases.update(get_cache_cases("dict", RedisTaggedCache(in_local_memory=True)))
+    results: Dict[str, Dict[str, Any]] = {}
+    with contextlib.ExitStack() as stack:
+        with_redis = not args.no_redis and args.redis_server is not None
+        if with_redis:
+            port = stack.enter_context(spawn_redis_server(args.redis_server))
+            cache = RedisTaggedCache(namespace="bench", port=port)
+            cases.update(get_cache_cases("redis", cache))
+        elif not args.no_redis:
+            print("(no redis-server binary found => Redis cases skipped)")
+        results = run(cases, args.filter)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "timestamp": time.time(),
+                        "redis": with_redis,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) (threshold: {args.threshold})")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,20 @@
-import pickle
-import zlib
-from typing import Any
-
-from rtc import RedisTaggedCache
-
-
-def custom_serializer(value: Any) -> bytes:
-    """Custom serializer is a simple function to convert any value to bytes.
-
-    If an exception is raised here, a warning will be logged
-    and the cache will be bypassed.
-
-    """
-    serialized = pickle.dumps(value)  # serialize the value
-    return zlib.compress(serialized)  # compress the serialized value
-
-
-def custom_unserializer(value: bytes) -> Any:
-    """Custom unserializer is a simple function to convert bytes to a value.
-
-    If an exception is raised here, a warning will be logged
-    and the cache will be bypassed.
-
-    """
-    serialized = zlib.decompress(value)  # decompress the value
-    return pickle.loads(serialized)  # unserialize the value
-
+from rtc import (
+    RedisTaggedCache,
+    get_compressing_serializer,
+    get_compressing_unserializer,
+)
 
 cache = RedisTaggedCache(
     namespace="foo",
     host="localhost",
     port=6379,
-    serializer=custom_serializer,
-    unserializer=custom_unserializer,
+    # values are serialized with pickle, then compressed with zlib
+    # (only if the serialized value is bigger than 1024 bytes)
+    serializer=get_compressing_serializer(codec="zlib", level=6, threshold=1024),
+    # the codec is read from a 1-byte header (so you can change the codec later)
+    unserializer=get_compressing_unserializer(),
 )
 
 # Use cache normally
-value = ["data", "to", "store"]
+value = ["data", "to", "store"] * 1000
 cache.set("key1", value, tags=["tag1", "tag2"])
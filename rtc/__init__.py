@@ -1,5 +1,33 @@
 from rtc.app.exc import CacheMiss
-from rtc.app.types import CacheHook, CacheInfo
+from rtc.app.hash import set_hash_backend
+from rtc.app.metrics import FunctionMetrics, Histogram, MetricsHook, MetricsSnapshot
+from rtc.app.serializer import get_compressing_serializer, get_compressing_unserializer
+from rtc.app.tags import TagSet
+from rtc.app.types import (
+    CacheHook,
+    CacheInfo,
+    ConnectionPoolStats,
+    LocalCacheStats,
+    SpanHook,
+)
+from rtc.infra.controllers.async_lib import AsyncRedisTaggedCache
 from rtc.infra.controllers.lib import RedisTaggedCache
 
-__all__ = ["CacheHook", "CacheInfo", "CacheMiss", "RedisTaggedCache"]
+__all__ = [
+    "AsyncRedisTaggedCache",
+    "CacheHook",
+    "CacheInfo",
+    "CacheMiss",
+    "ConnectionPoolStats",
+    "FunctionMetrics",
+    "Histogram",
+    "LocalCacheStats",
+    "MetricsHook",
+    "MetricsSnapshot",
+    "RedisTaggedCache",
+    "SpanHook",
+    "TagSet",
+    "get_compressing_serializer",
+    "get_compressing_unserializer",
+    "set_hash_backend",
+]
@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Tuple
+
+
+class CombinedReadPort(ABC):
+    """Interface for the (optional) combined read port.
+
+    A combined read resolves the tag values, computes the metadata hash and reads
+    the stored value in a single operation (instead of a metadata read followed
+    by a storage read).
+
+    """
+
+    @abstractmethod
+    def get_metadata_hash_and_value(
+        self,
+        namespace: str,
+        key: str,
+        sorted_tag_names: Iterable[str],
+        tags_lifetime: Optional[int],
+    ) -> Optional[Tuple[str, Optional[bytes]]]:
+        """Get the metadata hash and the stored value for the given key.
+
+        Missing tags are created with a random value (like in
+        MetadataPort.get_or_set_tag_values).
+
+        Args:
+            namespace: the namespace.
+            key: the key.
+            sorted_tag_names: the sorted names of the tags (including the special "all" tag).
+            tags_lifetime: the lifetime of the created tags (in seconds), None means "no expiration".
+
+        Returns:
+            A (metadata_hash, value) tuple (value is None if the key does not exist)
+            or None if the combined read is not available (the caller must fall back
+            to the classic metadata read + storage read).
+
+        Raises:
+            CacheException: if we had an unexpected error.
+
+        """
+        pass  # pragma: no cover
@@ -1,21 +1,192 @@
+import copy
 import inspect
 import json
 import logging
+import math
+import random
+import struct
+import threading
 import time
-from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
 
 import wrapt
 
-from rtc.app.hash import short_hash
+from rtc.app.hash import get_prefixed_short_hash
 from rtc.app.serializer import DEFAULT_SERIALIZER, DEFAULT_UNSERIALIZER
 from rtc.app.service import Service
+from rtc.app.tags import TagSet, TagSetMemo
+from rtc.app.timings import (
+    PHASE_DECORATED,
+    PHASE_KEY,
+    PHASE_LOCK,
+    PHASE_SERIALIZE,
+    PHASE_STORAGE_GET,
+    PHASE_STORAGE_SET,
+    PHASE_TAGS,
+    PHASE_UNSERIALIZE,
+    PhaseTimings,
+)
 from rtc.app.types import CacheInfo
 
 LOGGER = logging.getLogger("rtc.app.decorator")
+# same output than json.dumps(..., sort_keys=True) without building an encoder each time
+JSON_ENCODER = json.JSONEncoder(sort_keys=True)
+# maximum number of pending background refreshes (per decorator)
+MAX_PENDING_REFRESHES = 1000
+# envelope (only with early refresh): magic + (expiration timestamp, compute time)
+ENVELOPE_MAGIC = b"\xffrtc1"
+ENVELOPE_STRUCT = struct.Struct("!dd")
+ENVELOPE_HEADER_SIZE = len(ENVELOPE_MAGIC) + ENVELOPE_STRUCT.size
+# stale copy (only with stale while revalidate): magic + deadline timestamp
+# (0.0 means: not returned as a stale value yet)
+STALE_MAGIC = b"\xffrtcs1"
+STALE_STRUCT = struct.Struct("!d")
+STALE_HEADER_SIZE = len(STALE_MAGIC) + STALE_STRUCT.size
+
+
+def _wrap_envelope(serialized: bytes, lifetime: int, compute_time: float) -> bytes:
+    expiration = time.time() + lifetime if lifetime > 0 else 0.0
+    return ENVELOPE_MAGIC + ENVELOPE_STRUCT.pack(expiration, compute_time) + serialized
+
+
+def _unwrap_envelope(data: bytes) -> Tuple[bytes, float, float]:
+    """Return (serialized value, expiration timestamp, compute time).
+
+    If there is no envelope, the data is returned as is (with 0.0 for other values).
+
+    """
+    if not data.startswith(ENVELOPE_MAGIC):
+        return data, 0.0, 0.0
+    expiration, compute_time = ENVELOPE_STRUCT.unpack_from(data, len(ENVELOPE_MAGIC))
+    return data[ENVELOPE_HEADER_SIZE:], expiration, compute_time
+
+
+def _wrap_stale(serialized: bytes, deadline: float) -> bytes:
+    return STALE_MAGIC + STALE_STRUCT.pack(deadline) + serialized
+
+
+def _unwrap_stale(data: bytes) -> Tuple[bytes, float]:
+    """Return (serialized value, deadline timestamp) of a stale copy.
+
+    If there is no header, the data is returned as is (with 0.0 as deadline).
+
+    """
+    if not data.startswith(STALE_MAGIC):
+        return data, 0.0
+    (deadline,) = STALE_STRUCT.unpack_from(data, len(STALE_MAGIC))
+    return data[STALE_HEADER_SIZE:], deadline
+
+
+def _should_refresh_early(expiration: float, compute_time: float, beta: float) -> bool:
+    """Probabilistic early expiration (XFetch algorithm).
+
+    The closer we are to the expiration (and the longer the computation is), the
+    higher the probability to return True.
+
+    See: "Optimal Probabilistic Cache Stampede Prevention" (Vattani et al.)
+
+    """
+    if expiration <= 0.0 or compute_time <= 0.0 or beta <= 0.0:
+        return False
+    # note: 1.0 - random.random() is in ]0, 1] (so log() is always defined)
+    gap = -compute_time * beta * math.log(1.0 - random.random())
+    return time.time() + gap >= expiration
+
+
+@dataclass(frozen=True)
+class _StaticInfos:
+    """Infos about a decorated function which don't change between calls."""
+
+    filepath: str
+    class_name: str
+    function_name: str
+    key_hash: Callable[[bytes], str]
+    """short_hash(<json prefix> + data) with the json prefix already hashed."""
+
+
+def _make_static_infos(wrapped: Callable, class_name: str) -> _StaticInfos:
+    filepath = inspect.getfile(wrapped)
+    function_name = wrapped.__name__
+    # the key is (for compatibility reasons) the short_hash of:
+    # json.dumps([[filepath, class_name, function_name], args, kwargs], sort_keys=True)
+    # => we split it into a static prefix and json.dumps([args, kwargs])[1:]
+    prefix = "[" + json.dumps([filepath, class_name, function_name]) + ", "
+    return _StaticInfos(
+        filepath=filepath,
+        class_name=class_name,
+        function_name=function_name,
+        key_hash=get_prefixed_short_hash(prefix.encode("utf-8")),
+    )
+
+
+def _make_cache_info(
+    static_infos: _StaticInfos,
+    instance: Any,
+    args: Tuple,
+    kwargs: Dict,
+    before: float,
+    *,
+    timings: Optional[PhaseTimings],
+    hit: bool,
+    decorated_elapsed: float = 0.0,
+    lock_waiting_ms: int = 0,
+    lock_full_hit: bool = False,
+    lock_full_miss: bool = False,
+    serialized_size: int = 0,
+    stale: bool = False,
+    early_refresh: bool = False,
+    coalesced: bool = False,
+) -> CacheInfo:
+    if timings is None:
+        timings = PhaseTimings()
+    return CacheInfo(
+        filepath=static_infos.filepath,
+        class_name=static_infos.class_name,
+        function_name=static_infos.function_name,
+        function_args=args,
+        function_kwargs=kwargs,
+        method_decorator=instance is not None,
+        hit=hit,
+        elapsed=time.perf_counter() - before,
+        decorated_elapsed=decorated_elapsed,
+        lock_waiting_ms=lock_waiting_ms,
+        lock_full_hit=lock_full_hit,
+        lock_full_miss=lock_full_miss,
+        serialized_size=serialized_size,
+        stale=stale,
+        early_refresh=early_refresh,
+        coalesced=coalesced,
+        key_elapsed_ns=timings.get(PHASE_KEY),
+        tags_elapsed_ns=timings.get(PHASE_TAGS),
+        storage_get_elapsed_ns=timings.get(PHASE_STORAGE_GET),
+        lock_elapsed_ns=timings.get(PHASE_LOCK),
+        unserialize_elapsed_ns=timings.get(PHASE_UNSERIALIZE),
+        serialize_elapsed_ns=timings.get(PHASE_SERIALIZE),
+        storage_set_elapsed_ns=timings.get(PHASE_STORAGE_SET),
+    )
+
+
+def _copy_exception(e: BaseException) -> BaseException:
+    """Return a copy of the given exception (or the exception itself if it can't be copied).
+
+    (the copy has its own traceback)
+
+    """
+    try:
+        res = copy.copy(e)
+    except Exception:
+        return e
+    return res if type(res) is type(e) else e
+
+
+def _get_stale_key(ckey: str) -> str:
+    return f"@@@stale@@@{ckey}"
 
 
 def _get_key(
-    cache_info: CacheInfo,
+    static_infos: _StaticInfos,
     key: Optional[Callable[..., str]],
     instance: Any,
     *decorated_args,
@@ -34,15 +205,13 @@ def _get_key(
             )
         return None
     try:
-        serialized_args = json.dumps(
+        serialized_args = JSON_ENCODER.encode(
             [
-                cache_info._dump(),
                 decorated_args,
                 decorated_kwargs,
-            ],
-            sort_keys=True,
-        ).encode("utf-8")
-        return short_hash(serialized_args)
+            ]
+        )[1:].encode("utf-8")
+        return static_infos.key_hash(serialized_args)
     except Exception:
         LOGGER.warning(
             "arguments are not JSON serializable => cache bypassed",
@@ -51,25 +220,25 @@ def _get_key(
         return None
 
 
-def _get_full_tag_names(
-    tags: Optional[Union[Iterable[str], Callable[..., Iterable[str]]]],
+def _get_dynamic_tag_set(
+    tags: Callable[..., Iterable[str]],
+    tag_set_memo: TagSetMemo,
     instance: Any,
     *decorated_args,
     **decorated_kwargs,
-) -> Optional[Iterable[str]]:
-    if callable(tags):
-        try:
-            if instance is None:
-                return tags(*decorated_args, **decorated_kwargs)
-            else:
-                return tags(instance, *decorated_args, **decorated_kwargs)
-        except Exception:
-            LOGGER.warning(
-                "error while computing dynamic tag names => cache bypassed",
-                exc_info=True,
-            )
-            return None
-    return tags or []
+) -> Optional[TagSet]:
+    try:
+        if instance is None:
+            tag_names = tags(*decorated_args, **decorated_kwargs)
+        else:
+            tag_names = tags(instance, *decorated_args, **decorated_kwargs)
+        return tag_set_memo.get(tag_names)
+    except Exception:
+        LOGGER.warning(
+            "error while computing dynamic tag names => cache bypassed",
+            exc_info=True,
+        )
+        return None
 
 
 def cache_decorator(
@@ -83,63 +252,282 @@ def cache_decorator(
     unserializer: Callable[[bytes], Any] = DEFAULT_UNSERIALIZER,
     lock: bool = False,
     lock_timeout: int = 5,
+    stale_while_revalidate: int = 0,
+    refresh_executor: Optional[Executor] = None,
+    early_refresh_beta: float = 0.0,
+    single_flight: bool = False,
+    dynamic_tags_memo_size: int = 1024,
 ):
-    @wrapt.decorator
-    def wrapper(wrapped: Callable, instance: Any, args: Tuple, kwargs: Dict) -> Any:
-        before = time.perf_counter()
+    if stale_while_revalidate > 0 and refresh_executor is None:
+        raise ValueError("refresh_executor is mandatory with stale_while_revalidate")
+    # static tags are prepared once, dynamic ones go through a bounded memo
+    static_tag_set: Optional[TagSet] = None
+    tag_set_memo = TagSetMemo(max_size=dynamic_tags_memo_size)
+    if not callable(tags):
+        static_tag_set = tag_set_memo.get(tags or [])
+    # keys of the values being refreshed in background
+    pending_refreshes: Set[str] = set()
+    pending_refreshes_lock = threading.Lock()
+    # (key, tag names) => in-flight call (only with single_flight)
+    flights: Dict[Tuple[str, TagSet], Future[Tuple[Any, Optional[bytes]]]] = {}
+    flights_lock = threading.Lock()
+
+    # (function, class name) => static infos (computed on first call)
+    static_infos_cache: Dict[Tuple[Any, str], _StaticInfos] = {}
+
+    def _get_static_infos(wrapped: Callable, instance: Any) -> _StaticInfos:
         class_name: str = ""
         if instance is not None:
             try:
                 class_name = instance.__class__.__name__
             except Exception:
                 pass
-        cache_info = CacheInfo(
-            filepath=inspect.getfile(wrapped),
-            class_name=class_name,
-            function_name=wrapped.__name__,
-            function_args=args,
-            function_kwargs=kwargs,
-            method_decorator=instance is not None,
+        cache_key = (getattr(wrapped, "__func__", wrapped), class_name)
+        static_infos = static_infos_cache.get(cache_key)
+        if static_infos is None:
+            static_infos = _make_static_infos(wrapped, class_name)
+            static_infos_cache[cache_key] = static_infos
+        return static_infos
+
+    def _get_resolved_lifetime() -> int:
+        return (
+            lifetime
+            if lifetime is not None
+            else service.storage_service.default_lifetime
         )
-        ckey = _get_key(
-            cache_info,
-            key,
-            instance,
-            *args,
-            **kwargs,
+
+    def _get_stale_lifetime() -> int:
+        resolved = _get_resolved_lifetime()
+        if resolved <= 0:
+            return 0
+        return resolved + stale_while_revalidate
+
+    def _unserialize(data: bytes) -> Tuple[Any, bool]:
+        """Unserialize the given data, return (value, should_refresh_early)."""
+        serialized, expiration, compute_time = _unwrap_envelope(data)
+        return unserializer(serialized), _should_refresh_early(
+            expiration, compute_time, early_refresh_beta
         )
-        full_tag_names = _get_full_tag_names(tags, instance, *args, **kwargs)
+
+    def _store(
+        ckey: str,
+        full_tag_names: Iterable[str],
+        res: Any,
+        compute_time: float,
+        timings: Optional[PhaseTimings] = None,
+    ) -> Optional[bytes]:
+        """Serialize and store the given result, return the stored bytes (if any)."""
+        start_ns = time.perf_counter_ns() if timings is not None else 0
+        serialized: Optional[bytes] = None
+        try:
+            serialized = serializer(res)
+        except Exception:
+            logging.warning(
+                "error while serializing cache value => cache bypassed",
+                exc_info=True,
+            )
+        if serialized is None:
+            return None
+        if early_refresh_beta > 0.0:
+            serialized = _wrap_envelope(
+                serialized, _get_resolved_lifetime(), compute_time
+            )
+        if timings is not None:
+            start_ns = timings.add(PHASE_SERIALIZE, start_ns)
+        service.set_bytes(ckey, serialized, full_tag_names, lifetime=lifetime)
+        if stale_while_revalidate > 0:
+            # copy without tags (so not invalidated) and with a longer lifetime
+            service.set_bytes(
+                _get_stale_key(ckey),
+                _wrap_stale(serialized, 0.0),
+                lifetime=_get_stale_lifetime(),
+            )
+        if timings is not None:
+            timings.add(PHASE_STORAGE_SET, start_ns)
+        return serialized
+
+    def _read_stale(
+        ckey: str, timings: Optional[PhaseTimings]
+    ) -> Optional[Tuple[Any, bytes]]:
+        """Read the stale copy, return (unserialized value, serialized value) or None."""
+        stale_key = _get_stale_key(ckey)
+        stale_res, _ = service._get_bytes(stale_key, [], timings)
+        if stale_res is None:
+            return None
+        serialized, deadline = _unwrap_stale(stale_res)
+        now = time.time()
+        if deadline <= 0.0:
+            # first stale read (after an invalidation or an expiration) => the
+            # stale copy can only be returned during stale_while_revalidate seconds
+            service.set_bytes(
+                stale_key,
+                _wrap_stale(serialized, now + stale_while_revalidate),
+                lifetime=stale_while_revalidate,
+            )
+        elif now > deadline:
+            return None
+        try:
+            return _unserialize(serialized)[0], serialized
+        except Exception:
+            logging.warning(
+                "error while unserializing stale value => ignored",
+                exc_info=True,
+            )
+        return None
+
+    def _refresh(
+        wrapped: Callable,
+        args: Tuple,
+        kwargs: Dict,
+        ckey: str,
+        full_tag_names: Iterable[str],
+    ) -> None:
+        try:
+            before = time.perf_counter()
+            res = wrapped(*args, **kwargs)
+            _store(ckey, full_tag_names, res, time.perf_counter() - before)
+        except Exception:
+            LOGGER.warning("error while refreshing a stale value", exc_info=True)
+        finally:
+            with pending_refreshes_lock:
+                pending_refreshes.discard(ckey)
+
+    def _schedule_refresh(
+        wrapped: Callable,
+        args: Tuple,
+        kwargs: Dict,
+        ckey: str,
+        full_tag_names: Iterable[str],
+    ) -> None:
+        with pending_refreshes_lock:
+            if ckey in pending_refreshes:
+                return  # already scheduled
+            if len(pending_refreshes) >= MAX_PENDING_REFRESHES:
+                LOGGER.warning("too many pending refreshes => refresh skipped")
+                return
+            pending_refreshes.add(ckey)
+        try:
+            refresh_executor.submit(  # type: ignore
+                _refresh, wrapped, args, kwargs, ckey, full_tag_names
+            )
+        except Exception:
+            LOGGER.warning("can't schedule a refresh => refresh skipped", exc_info=True)
+            with pending_refreshes_lock:
+                pending_refreshes.discard(ckey)
+
+    def _get_or_compute(
+        wrapped: Callable,
+        instance: Any,
+        args: Tuple,
+        kwargs: Dict,
+        before: float,
+        *,
+        static_infos: _StaticInfos,
+        ckey: Optional[str],
+        full_tag_names: Optional[Iterable[str]],
+        with_hook: bool,
+        timings: Optional[PhaseTimings],
+    ) -> Tuple[Any, Optional[bytes]]:
+        """Read the value from cache (or compute it), return (value, serialized value).
+
+        Note: the serialized value is None if it's not available (not cacheable,
+        serialization error...).
+
+        """
+        # note: the CacheInfo object is only built if a hook is configured
+        # (and the call is sampled)
+        lock_full_hit = False
+        lock_full_miss = False
+        lock_waiting_ms = 0
+        serialized_size = 0
+        early_refresh = False
+        serialized: Optional[bytes] = None
         lock_id: Optional[str] = None
         if ckey is not None and full_tag_names is not None:
-            serialized_res: Optional[bytes]
-            if lock:
+            serialized_res: Optional[bytes] = None
+            already_read = False
+            if stale_while_revalidate > 0:
+                serialized_res, metadata_hash = service._get_bytes(
+                    ckey, full_tag_names, timings
+                )
+                already_read = True
+                stale = (
+                    _read_stale(ckey, timings)
+                    if serialized_res is None and metadata_hash is not None
+                    else None
+                )
+                if stale is not None:
+                    # stale hit => let's refresh the value in background
+                    _schedule_refresh(wrapped, args, kwargs, ckey, full_tag_names)
+                    if with_hook:
+                        service._safe_call_hook(
+                            ckey,
+                            full_tag_names,
+                            _make_cache_info(
+                                static_infos,
+                                instance,
+                                args,
+                                kwargs,
+                                before,
+                                timings=timings,
+                                hit=True,
+                                serialized_size=len(stale[1]),
+                                stale=True,
+                            ),
+                            hook_userdata,
+                        )
+                    return stale
+            if lock and serialized_res is None:
                 get_or_lock_result = service._get_bytes_or_lock_id(
                     ckey,
                     full_tag_names,
                     lock_timeout=lock_timeout,
+                    timings=timings,
                 )
                 serialized_res = get_or_lock_result.value
                 lock_id = get_or_lock_result.lock_id
                 metadata_hash = get_or_lock_result.metadata_hash
-                cache_info.lock_full_hit = get_or_lock_result.full_hit
-                cache_info.lock_full_miss = get_or_lock_result.full_miss
-                cache_info.lock_waiting_ms = get_or_lock_result.waiting_ms
-            else:
+                lock_full_hit = get_or_lock_result.full_hit
+                lock_full_miss = get_or_lock_result.full_miss
+                lock_waiting_ms = get_or_lock_result.waiting_ms
+            elif not already_read:
                 serialized_res, metadata_hash = service._get_bytes(
-                    ckey,
-                    full_tag_names,
+                    ckey, full_tag_names, timings
                 )
             if serialized_res is not None:
                 # cache hit!
-                cache_info.serialized_size = len(serialized_res)
+                serialized_size = len(serialized_res)
                 try:
-                    unserialized = unserializer(serialized_res)
-                    cache_info.hit = True
-                    cache_info.elapsed = time.perf_counter() - before
-                    service._safe_call_hook(
-                        ckey, full_tag_names, cache_info, hook_userdata
-                    )
-                    return unserialized
+                    start_ns = time.perf_counter_ns() if timings is not None else 0
+                    unserialized, early_refresh = _unserialize(serialized_res)
+                    if timings is not None:
+                        timings.add(PHASE_UNSERIALIZE, start_ns)
+                    if early_refresh and stale_while_revalidate > 0:
+                        # let's refresh in background (the value is still valid)
+                        _schedule_refresh(wrapped, args, kwargs, ckey, full_tag_names)
+                    if not early_refresh or stale_while_revalidate > 0:
+                        if with_hook:
+                            service._safe_call_hook(
+                                ckey,
+                                full_tag_names,
+                                _make_cache_info(
+                                    static_infos,
+                                    instance,
+                                    args,
+                                    kwargs,
+                                    before,
+                                    timings=timings,
+                                    hit=True,
+                                    lock_waiting_ms=lock_waiting_ms,
+                                    lock_full_hit=lock_full_hit,
+                                    lock_full_miss=lock_full_miss,
+                                    serialized_size=serialized_size,
+                                    early_refresh=early_refresh,
+                                ),
+                                hook_userdata,
+                            )
+                        return unserialized, serialized_res
+                    # else: early refresh => let's recompute the value now
                 except Exception:
                     logging.warning(
                         "error while unserializing cache value => cache bypassed",
@@ -149,32 +537,220 @@ def cache_decorator(
                     if lock_id and metadata_hash:
                         service._unlock(ckey, metadata_hash, lock_id)
         # cache miss => let's call the decorated function
+        start_ns = time.perf_counter_ns() if timings is not None else 0
         before_decorated = time.perf_counter()
         res = wrapped(*args, **kwargs)
-        cache_info.decorated_elapsed = time.perf_counter() - before_decorated
+        decorated_elapsed = time.perf_counter() - before_decorated
+        if timings is not None:
+            timings.add(PHASE_DECORATED, start_ns)
 
-        if ckey is not None and full_tag_names is not None:
-            serialized: Optional[bytes] = None
+        if (
+            ckey is not None
+            and full_tag_names is not None
+            and metadata_hash is not None
+        ):
+            serialized = _store(ckey, full_tag_names, res, decorated_elapsed, timings)
+            serialized_size = len(serialized) if serialized is not None else 0
+        if ckey and lock_id and metadata_hash:
+            service._unlock(ckey, metadata_hash, lock_id)
+        if ckey and with_hook:
+            service._safe_call_hook(
+                ckey,
+                full_tag_names if full_tag_names else [],
+                _make_cache_info(
+                    static_infos,
+                    instance,
+                    args,
+                    kwargs,
+                    before,
+                    timings=timings,
+                    hit=False,
+                    decorated_elapsed=decorated_elapsed,
+                    early_refresh=early_refresh,
+                    lock_waiting_ms=lock_waiting_ms,
+                    lock_full_hit=lock_full_hit,
+                    lock_full_miss=lock_full_miss,
+                    serialized_size=serialized_size,
+                ),
+                hook_userdata,
+            )
+        return res, serialized
+
+    def _get_or_compute_single_flight(
+        wrapped: Callable,
+        instance: Any,
+        args: Tuple,
+        kwargs: Dict,
+        before: float,
+        *,
+        static_infos: _StaticInfos,
+        ckey: str,
+        full_tag_names: TagSet,
+        with_hook: bool,
+        timings: Optional[PhaseTimings],
+    ) -> Any:
+        flight_key = (ckey, full_tag_names)
+        with flights_lock:
+            flight = flights.get(flight_key)
+            leader = flight is None
+            if flight is None:
+                flight = Future()
+                flights[flight_key] = flight
+        if leader:
+            try:
+                res = _get_or_compute(
+                    wrapped,
+                    instance,
+                    args,
+                    kwargs,
+                    before,
+                    static_infos=static_infos,
+                    ckey=ckey,
+                    full_tag_names=full_tag_names,
+                    with_hook=with_hook,
+                    timings=timings,
+                )
+            except BaseException as e:
+                flight.set_exception(e)
+                raise
+            finally:
+                with flights_lock:
+                    flights.pop(flight_key, None)
+            flight.set_result(res)
+            return res[0]
+        # follower => let's wait for the leader result (or exception)
+        try:
+            value, serialized = flight.result()
+        except BaseException as e:
+            # (a copy: followers must not share and extend the traceback of the
+            # leader exception, which is given as the cause)
+            copied = _copy_exception(e)
+            if copied is e:
+                raise
+            raise copied from e
+        if serialized is not None:
+            # we unserialize our own copy (so callers never share a mutable value)
             try:
-                serialized = serializer(res)
+                value = _unserialize(serialized)[0]
             except Exception:
-                logging.warning(
-                    "error while serializing cache value => cache bypassed",
+                LOGGER.warning(
+                    "error while unserializing coalesced value => computed again",
                     exc_info=True,
                 )
-            if serialized is not None and metadata_hash is not None:
-                cache_info.serialized_size = len(serialized)
-                service.set_bytes(ckey, serialized, full_tag_names, lifetime=lifetime)
-        if ckey and lock_id and metadata_hash:
-            service._unlock(ckey, metadata_hash, lock_id)
-        if ckey:
-            cache_info.elapsed = time.perf_counter() - before
+                serialized = None
+        if serialized is None:
+            # no copy available (not cacheable value, serialization error, cache
+            # exception...) => the function is called for this caller
+            return _get_or_compute(
+                wrapped,
+                instance,
+                args,
+                kwargs,
+                before,
+                static_infos=static_infos,
+                ckey=ckey,
+                full_tag_names=full_tag_names,
+                with_hook=with_hook,
+                timings=timings,
+            )[0]
+        if with_hook:
             service._safe_call_hook(
                 ckey,
-                full_tag_names if full_tag_names else [],
-                cache_info,
+                full_tag_names,
+                _make_cache_info(
+                    static_infos,
+                    instance,
+                    args,
+                    kwargs,
+                    before,
+                    timings=timings,
+                    hit=True,
+                    serialized_size=len(serialized),
+                    coalesced=True,
+                ),
                 hook_userdata,
             )
-        return res
+        return value
+
+    def _call(
+        wrapped: Callable,
+        instance: Any,
+        args: Tuple,
+        kwargs: Dict,
+        before: float,
+        *,
+        static_infos: _StaticInfos,
+        ckey: Optional[str],
+        full_tag_names: Optional[TagSet],
+        with_hook: bool,
+        timings: Optional[PhaseTimings],
+    ) -> Any:
+        if single_flight and ckey is not None and full_tag_names is not None:
+            return _get_or_compute_single_flight(
+                wrapped,
+                instance,
+                args,
+                kwargs,
+                before,
+                static_infos=static_infos,
+                ckey=ckey,
+                full_tag_names=full_tag_names,
+                with_hook=with_hook,
+                timings=timings,
+            )
+        return _get_or_compute(
+            wrapped,
+            instance,
+            args,
+            kwargs,
+            before,
+            static_infos=static_infos,
+            ckey=ckey,
+            full_tag_names=full_tag_names,
+            with_hook=with_hook,
+            timings=timings,
+        )[0]
+
+    @wrapt.decorator
+    def wrapper(wrapped: Callable, instance: Any, args: Tuple, kwargs: Dict) -> Any:
+        before = time.perf_counter()
+        with_hook = service._should_call_hook()
+        # note: timings are only collected with a (sampled) cache hook or a span hook
+        timings = service._get_phase_timings(with_hook)
+        static_infos = _get_static_infos(wrapped, instance)
+        ckey = _get_key(
+            static_infos,
+            key,
+            instance,
+            *args,
+            **kwargs,
+        )
+        full_tag_names = static_tag_set
+        if full_tag_names is None:
+            full_tag_names = _get_dynamic_tag_set(
+                tags,  # type: ignore
+                tag_set_memo,
+                instance,
+                *args,
+                **kwargs,
+            )
+        if timings is not None:
+            timings.add(PHASE_KEY, timings.start_ns)
+        try:
+            return _call(
+                wrapped,
+                instance,
+                args,
+                kwargs,
+                before,
+                static_infos=static_infos,
+                ckey=ckey,
+                full_tag_names=full_tag_names,
+                with_hook=with_hook,
+                timings=timings,
+            )
+        finally:
+            if timings is not None and ckey is not None:
+                service._safe_call_span_hook(ckey, timings, hook_userdata)
 
     return wrapper
@@ -1,29 +1,130 @@
-import base64
+import binascii
+import functools
 import hashlib
 import uuid
-from typing import Union
+from typing import Any, Callable, Dict, Union
 
 HASH_SIZE_IN_BYTES = 8
 
+MEMOIZED_HASHES_MAX_SIZE = 10000
+"""Maximum number of memoized hashes (of namespaces and tag names)."""
+
+# base64 (standard) => base64 (url variant) with ~ instead of -
+_B64_TRANSLATION = bytes.maketrans(b"+/", b"~_")
+
+
+def _md5(data: bytes) -> Any:
+    return hashlib.md5(data)
+
+
+def _blake2b(data: bytes) -> Any:
+    # digest_size is a blake2b parameter => no truncation needed
+    return hashlib.blake2b(data, digest_size=HASH_SIZE_IN_BYTES)
+
+
+HASH_BACKENDS: Dict[str, Callable[[bytes], Any]] = {
+    "md5": _md5,
+    "blake2b": _blake2b,
+}
+"""Available hash backends (name => hashlib-like constructor)."""
+
+_backend_name: str = "md5"
+_backend: Callable[[bytes], Any] = _md5
+
+
+def set_hash_backend(name: str) -> None:
+    """Set the hash backend used for all keys (process-wide).
+
+    Available backends are the keys of `HASH_BACKENDS`: `md5` (default) and
+    `blake2b` (faster, digest directly computed with the right size). You can
+    also register your own backend in `HASH_BACKENDS` (a function returning a
+    hashlib-like object with `update()`, `copy()` and `digest()` methods).
+
+    Warning:
+        All keys (and metadata hashes) depend on the hash backend. So changing
+        it is like starting with an empty cache and all processes sharing
+        the same cache must use the same backend. It must be set at startup,
+        before any cache usage.
+
+    Raises:
+        ValueError: if the backend is unknown.
+
+    """
+    global _backend_name, _backend
+    if name not in HASH_BACKENDS:
+        raise ValueError(
+            f"Unknown hash backend: {name} (available: {', '.join(HASH_BACKENDS)})"
+        )
+    _backend_name = name
+    _backend = HASH_BACKENDS[name]
+    short_hash_memoized.cache_clear()
+
+
+def get_hash_backend() -> str:
+    """Return the name of the hash backend in use."""
+    return _backend_name
+
 
 def _hash(data: Union[str, bytes]) -> bytes:
     """Generate a hash of the given string or bytes."""
     if isinstance(data, str):
         data = data.encode("utf-8")
-    return hashlib.md5(data).digest()
+    return _backend(data).digest()
 
 
 def short_hash(data: Union[str, bytes]) -> str:
     """Generate a short text hash of the given string or bytes.
 
     It is not a cryptographic hash function, but it is fast and suitable for our use case.
-    You can configure the hash size in bytes in the HASH_SIZE_IN_BYTES constant.
+    You can configure the hash size in bytes in the HASH_SIZE_IN_BYTES constant and the
+    hash backend with set_hash_backend().
 
     Returns:
         A base64 encoded string (url variant) of the hash (without padding and with ~ instead of -)
     """
-    h = _hash(data)[0:HASH_SIZE_IN_BYTES]
-    return base64.urlsafe_b64encode(h).decode("utf-8").rstrip("=").replace("-", "~")
+    return _encode(_hash(data))
+
+
+@functools.lru_cache(maxsize=MEMOIZED_HASHES_MAX_SIZE)
+def short_hash_memoized(data: str) -> str:
+    """Same than short_hash() but with a bounded memoization.
+
+    It must only be used for values with a low cardinality (namespaces, tag names...).
+
+    """
+    return short_hash(data)
+
+
+def _encode(digest: bytes) -> str:
+    if len(digest) > HASH_SIZE_IN_BYTES:
+        digest = digest[0:HASH_SIZE_IN_BYTES]
+    return (
+        binascii.b2a_base64(digest, newline=False)
+        .rstrip(b"=")
+        .translate(_B64_TRANSLATION)
+        .decode("ascii")
+    )
+
+
+def get_prefixed_short_hash(prefix: bytes) -> Callable[[bytes], str]:
+    """Return a function f such as f(data) == short_hash(prefix + data).
+
+    The prefix is hashed only once (here), so it's useful for hot paths where
+    the prefix is always the same.
+
+    """
+    backend = _backend
+    prefix_hasher = backend(prefix)
+
+    def _short_hash(data: bytes) -> str:
+        if backend is not _backend:
+            # the hash backend changed in the meantime
+            return short_hash(prefix + data)
+        hasher = prefix_hasher.copy()
+        hasher.update(data)
+        return _encode(hasher.digest())
+
+    return _short_hash
 
 
 def get_random_bytes() -> bytes:
@@ -0,0 +1,100 @@
+import logging
+import os
+import queue
+import threading
+from typing import Any, Iterable, Optional, Tuple
+
+from rtc.app.types import CacheHook, CacheInfo
+
+LOGGER = logging.getLogger("rtc.app.hooks")
+
+# sentinel event to stop the worker thread
+_STOP = object()
+
+
+class HookDispatcher:
+    """A cache hook which calls the given hook in a background worker thread.
+
+    Events are put in a bounded queue (without waiting): if the queue is full (the
+    hook is slower than the event rate), the event is dropped and counted in the
+    `dropped` attribute. So a slow hook can never add latency to cache calls.
+
+    The worker thread (daemon) is started on the first event (and restarted in
+    a child process after a fork). Exceptions raised by the hook are logged and
+    ignored.
+
+    Note: as the hook is called later, in another thread, mutable objects given to
+    the hook (decorated function arguments in `CacheInfo`) can have changed.
+
+    """
+
+    def __init__(self, hook: CacheHook, max_queue_size: int = 10000):
+        self.hook = hook
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        """Number of events dropped because the queue was full."""
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = 0
+
+    def __call__(
+        self,
+        cache_key: str,
+        cache_tags: Iterable[str],
+        cache_info: CacheInfo,
+        userdata: Any = None,
+    ) -> None:
+        if self._thread is None or self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait((cache_key, cache_tags, cache_info, userdata))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            pid = os.getpid()
+            if self._thread is not None and self._pid == pid:
+                return
+            if self._thread is not None:
+                # forked process => the worker thread doesn't exist here
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="rtc-hook-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                if event is _STOP:
+                    return
+                self._call(event)
+            finally:
+                self._queue.task_done()
+
+    def _call(self, event: Tuple[str, Iterable[str], CacheInfo, Any]) -> None:
+        cache_key, cache_tags, cache_info, userdata = event
+        try:
+            self.hook(cache_key, cache_tags, userdata=userdata, cache_info=cache_info)
+        except Exception:
+            LOGGER.warning(f"Error while calling hook {self.hook}", exc_info=True)
+
+    def flush(self) -> None:
+        """Wait for all queued events to be processed."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def stop(self) -> None:
+        """Process queued events and stop the worker thread (it's restarted by the next event)."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._thread = None
+        self._queue.put(_STOP)  # (blocking: after queued events)
+        thread.join()
@@ -2,11 +2,10 @@ import itertools
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional
 
 from rtc.app.hash import short_hash
-
-SPECIAL_ALL_TAG_NAME = "@@@all@@@"
+from rtc.app.tags import SPECIAL_ALL_TAG_NAME, get_sorted_tag_names
 
 DEFAULT_LIFETIME = 604800  # Default lifetime (in seconds)
 
@@ -63,8 +62,10 @@ class MetadataPort(ABC):
 
         This call is blocking (up to waiting seconds) until the lock is acquired.
 
-        If None is returned, the lock could not be acquired in the waiting delay.
-        Otherwise, the lock is acquired and a unique lock identifier is returned.
+        If None is returned, the lock could not be acquired in the waiting delay
+        (or the lock was released by its owner in the meantime: the caller should
+        check the cache again before retrying). Otherwise, the lock is acquired and
+        a unique lock identifier is returned.
 
         """
         pass  # pragma: no cover
@@ -83,10 +84,36 @@ class MetadataPort(ABC):
         pass  # pragma: no cover
 
 
+class AsyncMetadataPort(ABC):
+    """Interface for the async (asyncio) metadata port.
+
+    See MetadataPort for details about each method.
+
+    """
+
+    @abstractmethod
+    async def invalidate_tags(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> None:
+        """Invalidate the given tags (see MetadataPort.invalidate_tags)."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def get_or_set_tag_values(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> Iterable[bytes]:
+        """Get the values of the given tags (see MetadataPort.get_or_set_tag_values)."""
+        pass  # pragma: no cover
+
+
 def get_logger() -> logging.Logger:
     return logging.getLogger("rtc.app.metadata")
 
 
+def _get_metadata_hash_from_values(tags_values: Iterable[bytes]) -> str:
+    return short_hash(b" ".join(tags_values))
+
+
 @dataclass
 class MetadataService:
     namespace: str
@@ -106,15 +133,77 @@ class MetadataService:
             self.namespace, (SPECIAL_ALL_TAG_NAME,), self.default_lifetime
         )
 
+    def get_sorted_tag_names(self, tag_names: Iterable[str]) -> Iterable[str]:
+        """Return the sorted tag names (including the special "all" tag) used for the metadata hash.
+
+        If tag_names is a TagSet, a (precomputed) TagSet is returned.
+
+        """
+        return get_sorted_tag_names(tag_names)
+
     def get_metadata_hash(self, tag_names: Iterable[str]) -> str:
-        sorted_tag_names = sorted(itertools.chain(tag_names, (SPECIAL_ALL_TAG_NAME,)))
+        sorted_tag_names = self.get_sorted_tag_names(tag_names)
         tags_values = self.adapter.get_or_set_tag_values(
             self.namespace, sorted_tag_names, self.default_lifetime
         )
-        return short_hash(b" ".join(tags_values))
+        return _get_metadata_hash_from_values(tags_values)
+
+    def get_metadata_hashes(self, tag_names_list: Iterable[Iterable[str]]) -> List[str]:
+        """Compute the metadata hashes of many tag name lists with a single adapter call.
+
+        Tag names are de-duplicated across all lists before reading their values.
+
+        """
+        all_sorted_tag_names = [
+            self.get_sorted_tag_names(tag_names) for tag_names in tag_names_list
+        ]
+        unique_tag_names = sorted(set(itertools.chain(*all_sorted_tag_names)))
+        tags_values = dict(
+            zip(
+                unique_tag_names,
+                self.adapter.get_or_set_tag_values(
+                    self.namespace, unique_tag_names, self.default_lifetime
+                ),
+            )
+        )
+        return [
+            short_hash(
+                b" ".join(tags_values[tag_name] for tag_name in sorted_tag_names)
+            )
+            for sorted_tag_names in all_sorted_tag_names
+        ]
 
     def lock(self, key: str, metadata_hash: str, timeout: int = 5, waiting: int = 1):
         return self.adapter.lock(self.namespace, key, metadata_hash, timeout, waiting)
 
     def unlock(self, key: str, metadata_hash: str, lock_identifier: str) -> None:
         return self.adapter.unlock(self.namespace, key, metadata_hash, lock_identifier)
+
+
+@dataclass
+class AsyncMetadataService:
+    """Async (asyncio) version of MetadataService (same tag and hash layout)."""
+
+    namespace: str
+    adapter: AsyncMetadataPort
+    default_lifetime: int = DEFAULT_LIFETIME
+    logger: logging.Logger = field(default_factory=get_logger)
+
+    async def invalidate_tags(self, tag_names: Iterable[str]) -> None:
+        self.logger.debug("Invalidating tags: %s", ", ".join(tag_names))
+        return await self.adapter.invalidate_tags(
+            self.namespace, tag_names, self.default_lifetime
+        )
+
+    async def invalidate_all(self) -> None:
+        self.logger.debug("Invalidating all cache")
+        return await self.adapter.invalidate_tags(
+            self.namespace, (SPECIAL_ALL_TAG_NAME,), self.default_lifetime
+        )
+
+    async def get_metadata_hash(self, tag_names: Iterable[str]) -> str:
+        sorted_tag_names = get_sorted_tag_names(tag_names)
+        tags_values = await self.adapter.get_or_set_tag_values(
+            self.namespace, sorted_tag_names, self.default_lifetime
+        )
+        return _get_metadata_hash_from_values(tags_values)
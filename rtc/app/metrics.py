@@ -0,0 +1,364 @@
+import math
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rtc.app.types import CacheInfo
+
+HISTOGRAM_BUCKETS = 25
+"""Number of (finite) buckets of latency histograms: 1us, 2us, 4us... up to ~16.8s."""
+
+HISTOGRAM_BOUNDS: Tuple[float, ...] = tuple(
+    2**i * 1e-6 for i in range(HISTOGRAM_BUCKETS)
+)
+"""Upper bounds (in seconds) of the (finite) buckets of latency histograms."""
+
+# (filepath, class name, function name)
+FunctionKey = Tuple[str, str, str]
+
+
+def _bucket_index(value: float) -> int:
+    """Return the index of the bucket of the given value (in seconds)."""
+    if value <= HISTOGRAM_BOUNDS[0]:
+        return 0
+    mantissa, exponent = math.frexp(value / HISTOGRAM_BOUNDS[0])
+    # value / 1us in ]2**(exponent-1), 2**exponent] (exponent - 1 if exactly a bound)
+    index = exponent - 1 if mantissa == 0.5 else exponent
+    return min(index, HISTOGRAM_BUCKETS)  # (HISTOGRAM_BUCKETS means: +Inf)
+
+
+@dataclass(frozen=True)
+class Histogram:
+    """A latency histogram (with log buckets, see `HISTOGRAM_BOUNDS`)."""
+
+    counts: Tuple[int, ...] = (0,) * (HISTOGRAM_BUCKETS + 1)
+    """Number of values per bucket (not cumulative, the last one is the +Inf bucket)."""
+
+    sum: float = 0.0
+    """Sum of the values (in seconds)."""
+
+    @property
+    def count(self) -> int:
+        """Number of values."""
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> float:
+        """Return an estimation (upper bound of the bucket) of the given quantile (0 < q <= 1)."""
+        total = self.count
+        if total == 0:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+    def __add__(self, other: "Histogram") -> "Histogram":
+        return Histogram(
+            counts=tuple(a + b for a, b in zip(self.counts, other.counts)),
+            sum=self.sum + other.sum,
+        )
+
+
+@dataclass(frozen=True)
+class FunctionMetrics:
+    """Metrics of a decorated function (or of a whole namespace)."""
+
+    hits: int = 0
+    """Number of cache hits."""
+
+    misses: int = 0
+    """Number of cache misses."""
+
+    lock_full_hits: int = 0
+    """Number of lock full hits (see `CacheInfo.lock_full_hit`)."""
+
+    lock_full_misses: int = 0
+    """Number of lock full misses (see `CacheInfo.lock_full_miss`)."""
+
+    bytes_served: int = 0
+    """Total serialized size (in bytes) of the values served from the cache."""
+
+    elapsed: Histogram = field(default_factory=Histogram)
+    """Histogram of `CacheInfo.elapsed` (all calls)."""
+
+    decorated_elapsed: Histogram = field(default_factory=Histogram)
+    """Histogram of `CacheInfo.decorated_elapsed` (only cache misses)."""
+
+    lock_waiting: Histogram = field(default_factory=Histogram)
+    """Histogram of `CacheInfo.lock_waiting_ms` (in seconds, only calls with a lock)."""
+
+    @property
+    def hit_ratio(self) -> float:
+        """Ratio of cache hits (0.0 if there was no call)."""
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def __add__(self, other: "FunctionMetrics") -> "FunctionMetrics":
+        return FunctionMetrics(
+            hits=self.hits + other.hits,
+            misses=self.misses + other.misses,
+            lock_full_hits=self.lock_full_hits + other.lock_full_hits,
+            lock_full_misses=self.lock_full_misses + other.lock_full_misses,
+            bytes_served=self.bytes_served + other.bytes_served,
+            elapsed=self.elapsed + other.elapsed,
+            decorated_elapsed=self.decorated_elapsed + other.decorated_elapsed,
+            lock_waiting=self.lock_waiting + other.lock_waiting,
+        )
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    """A snapshot of the metrics collected by a `MetricsHook`."""
+
+    namespace: str = ""
+    """Namespace (label) of the metrics."""
+
+    functions: Dict[FunctionKey, FunctionMetrics] = field(default_factory=dict)
+    """Metrics per (filepath, class name, function name) of decorated functions."""
+
+    @property
+    def total(self) -> FunctionMetrics:
+        """Metrics of the whole namespace (all functions)."""
+        total = FunctionMetrics()
+        for metrics in self.functions.values():
+            total = total + metrics
+        return total
+
+
+class _Counters:
+    """Mutable counters of a function (only updated by a single thread)."""
+
+    __slots__ = (
+        "bytes_served",
+        "decorated_elapsed",
+        "elapsed",
+        "hits",
+        "lock_full_hits",
+        "lock_full_misses",
+        "lock_waiting",
+        "misses",
+    )
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.lock_full_hits = 0
+        self.lock_full_misses = 0
+        self.bytes_served = 0
+        # histograms: [counts per bucket..., sum]
+        self.elapsed: List[float] = [0] * (HISTOGRAM_BUCKETS + 2)
+        self.decorated_elapsed: List[float] = [0] * (HISTOGRAM_BUCKETS + 2)
+        self.lock_waiting: List[float] = [0] * (HISTOGRAM_BUCKETS + 2)
+
+    def to_metrics(self) -> FunctionMetrics:
+        return FunctionMetrics(
+            hits=self.hits,
+            misses=self.misses,
+            lock_full_hits=self.lock_full_hits,
+            lock_full_misses=self.lock_full_misses,
+            bytes_served=self.bytes_served,
+            elapsed=_to_histogram(self.elapsed),
+            decorated_elapsed=_to_histogram(self.decorated_elapsed),
+            lock_waiting=_to_histogram(self.lock_waiting),
+        )
+
+
+def _observe(histogram: List[float], value: float) -> None:
+    histogram[_bucket_index(value)] += 1
+    histogram[-1] += value
+
+
+def _to_histogram(histogram: List[float]) -> Histogram:
+    return Histogram(
+        counts=tuple(int(x) for x in histogram[:-1]), sum=float(histogram[-1])
+    )
+
+
+class MetricsHook:
+    """A ready-made cache hook which collects metrics (counters and latency histograms).
+
+    Counters are kept per decorated function in per-thread shards (so the hook
+    itself doesn't take any lock after the first call of a thread). Use
+    `snapshot()` to read them (all shards are merged) and `to_prometheus()` to
+    export them in the Prometheus text format.
+
+    A MetricsHook is meant to be used by a single cache (the namespace is only a
+    label), use one MetricsHook per cache if you have several namespaces (and
+    `rtc.app.metrics.to_prometheus()` to export all their snapshots at once).
+
+    Example:
+        ```python
+        metrics = MetricsHook(namespace="my-namespace")
+        cache = RedisTaggedCache(namespace="my-namespace", cache_hook=metrics)
+
+        (...)
+
+        print(metrics.snapshot().total.hit_ratio)
+        print(metrics.to_prometheus())
+        ```
+
+    Note: only calls of cache decorators are seen by hooks.
+
+    """
+
+    def __init__(self, namespace: str = "default"):
+        self.namespace = namespace
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (weak reference to the thread, shard of the thread)
+        self._shards: List[Tuple[Any, Dict[FunctionKey, _Counters]]] = []
+        # merged counters of dead threads
+        self._retired: Dict[FunctionKey, FunctionMetrics] = {}
+
+    def _get_shard(self) -> Dict[FunctionKey, _Counters]:
+        shard: Optional[Dict[FunctionKey, _Counters]] = getattr(
+            self._local, "shard", None
+        )
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def __call__(
+        self,
+        cache_key: str,
+        cache_tags: Iterable[str],
+        cache_info: CacheInfo,
+        userdata: Any = None,
+    ) -> None:
+        shard = self._get_shard()
+        function_key = (
+            cache_info.filepath,
+            cache_info.class_name,
+            cache_info.function_name,
+        )
+        counters = shard.get(function_key)
+        if counters is None:
+            counters = _Counters()
+            shard[function_key] = counters
+        if cache_info.hit:
+            counters.hits += 1
+            counters.bytes_served += cache_info.serialized_size
+        else:
+            counters.misses += 1
+            _observe(counters.decorated_elapsed, cache_info.decorated_elapsed)
+        _observe(counters.elapsed, cache_info.elapsed)
+        if cache_info.lock_full_hit:
+            counters.lock_full_hits += 1
+        if cache_info.lock_full_miss:
+            counters.lock_full_misses += 1
+        if (
+            cache_info.lock_full_hit
+            or cache_info.lock_full_miss
+            or cache_info.lock_waiting_ms > 0
+        ):
+            _observe(counters.lock_waiting, cache_info.lock_waiting_ms / 1000.0)
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Return a snapshot of the collected metrics (all threads merged)."""
+        with self._lock:
+            alive = []
+            for thread_ref, shard in self._shards:
+                thread = thread_ref()
+                if thread is not None and thread.is_alive():
+                    alive.append((thread_ref, shard))
+                    continue
+                # dead thread => its counters are merged once for all
+                for function_key, counters in shard.items():
+                    self._retired[function_key] = (
+                        self._retired.get(function_key, FunctionMetrics())
+                        + counters.to_metrics()
+                    )
+            self._shards = alive
+            functions = dict(self._retired)
+            for _, shard in alive:
+                # (list() as the shard can get new entries in the meantime)
+                for function_key, counters in list(shard.items()):
+                    metrics = counters.to_metrics()
+                    if function_key in functions:
+                        metrics = functions[function_key] + metrics
+                    functions[function_key] = metrics
+        return MetricsSnapshot(namespace=self.namespace, functions=functions)
+
+    def to_prometheus(self, prefix: str = "rtc") -> str:
+        """Export the collected metrics in the Prometheus text format."""
+        return to_prometheus([self.snapshot()], prefix=prefix)
+
+
+_COUNTERS = (
+    ("hits", "cache_hits_total", "Number of cache hits."),
+    ("misses", "cache_misses_total", "Number of cache misses."),
+    ("lock_full_hits", "cache_lock_full_hits_total", "Number of lock full hits."),
+    ("lock_full_misses", "cache_lock_full_misses_total", "Number of lock full misses."),
+    (
+        "bytes_served",
+        "cache_served_bytes_total",
+        "Total size of the values served from the cache.",
+    ),
+)
+
+_HISTOGRAMS = (
+    ("elapsed", "cache_elapsed_seconds", "Total elapsed time of cached calls."),
+    (
+        "decorated_elapsed",
+        "cache_decorated_elapsed_seconds",
+        "Elapsed time of the decorated function (cache misses).",
+    ),
+    (
+        "lock_waiting",
+        "cache_lock_waiting_seconds",
+        "Lock waiting time (calls with a lock).",
+    ),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(namespace: str, function_key: FunctionKey, extra: str = "") -> str:
+    filepath, class_name, function_name = function_key
+    function = f"{class_name}.{function_name}" if class_name else function_name
+    return (
+        f'namespace="{_escape(namespace)}",file="{_escape(filepath)}",'
+        f'function="{_escape(function)}"{extra}'
+    )
+
+
+def to_prometheus(snapshots: Iterable[MetricsSnapshot], prefix: str = "rtc") -> str:
+    """Export the given snapshots (for example one per namespace) in the Prometheus text format."""
+    snapshots = list(snapshots)
+    lines: List[str] = []
+    for attribute, name, description in _COUNTERS:
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for snapshot in snapshots:
+            for function_key, metrics in snapshot.functions.items():
+                labels = _labels(snapshot.namespace, function_key)
+                value = getattr(metrics, attribute)
+                lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+    for attribute, name, description in _HISTOGRAMS:
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} histogram")
+        for snapshot in snapshots:
+            for function_key, metrics in snapshot.functions.items():
+                histogram: Histogram = getattr(metrics, attribute)
+                cumulative = 0
+                for bound, count in zip(HISTOGRAM_BOUNDS, histogram.counts):
+                    cumulative += count
+                    labels = _labels(
+                        snapshot.namespace, function_key, f',le="{bound!r}"'
+                    )
+                    lines.append(f"{prefix}_{name}_bucket{{{labels}}} {cumulative}")
+                labels = _labels(snapshot.namespace, function_key, ',le="+Inf"')
+                lines.append(f"{prefix}_{name}_bucket{{{labels}}} {histogram.count}")
+                labels = _labels(snapshot.namespace, function_key)
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {histogram.sum!r}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {histogram.count}")
+    return "\n".join(lines) + "\n"
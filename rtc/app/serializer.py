@@ -1,6 +1,112 @@
 # Default serialization functions
+import bz2
+import lzma
 import pickle
-from typing import Any, Callable, Optional
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
 
 DEFAULT_SERIALIZER: Callable[[Any], Optional[bytes]] = pickle.dumps
 DEFAULT_UNSERIALIZER: Callable[[bytes], Any] = pickle.loads
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024  # in bytes
+
+# codec name => (1-byte header, compress function(data, level), decompress function)
+CODECS: Dict[
+    str, Tuple[bytes, Callable[[bytes, Optional[int]], bytes], Callable[[bytes], bytes]]
+] = {
+    "zlib": (
+        b"\x01",
+        lambda data, level: zlib.compress(data, -1 if level is None else level),
+        zlib.decompress,
+    ),
+    "lzma": (
+        b"\x02",
+        lambda data, level: lzma.compress(data, preset=level),
+        lzma.decompress,
+    ),
+    "bz2": (
+        b"\x03",
+        lambda data, level: bz2.compress(data, 9 if level is None else level),
+        bz2.decompress,
+    ),
+}
+RAW_HEADER = b"\x00"  # not compressed
+_DECOMPRESS_BY_HEADER: Dict[int, Callable[[bytes], bytes]] = {
+    header[0]: decompress for header, _, decompress in CODECS.values()
+}
+
+
+def get_compressing_serializer(
+    codec: str = "zlib",
+    level: Optional[int] = None,
+    threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    serializer: Callable[[Any], Optional[bytes]] = DEFAULT_SERIALIZER,
+) -> Callable[[Any], Optional[bytes]]:
+    """Return a serializer that compresses (big) serialized values.
+
+    The value is first serialized with the given serializer (pickle by default).
+    If the result is bigger than threshold (in bytes), it is compressed with the
+    given codec (`zlib`, `lzma` or `bz2`) and level (None means: codec default).
+
+    A 1-byte header (codec or "not compressed") is always prepended, so values
+    must be read with the unserializer returned by `get_compressing_unserializer()`
+    (which supports all codecs, so you can change the codec at any time).
+
+    Note: if the compressed value is not smaller, it's stored uncompressed.
+
+    Example:
+        ```python
+        cache = RedisTaggedCache(
+            serializer=get_compressing_serializer(codec="zlib", threshold=1024),
+            unserializer=get_compressing_unserializer(),
+        )
+        ```
+
+    Raises:
+        ValueError: if the codec is unknown.
+
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec: {codec} (available: {', '.join(CODECS)})")
+    header, compress, _ = CODECS[codec]
+
+    def _serializer(value: Any) -> Optional[bytes]:
+        serialized = serializer(value)
+        if serialized is None:
+            return None
+        if len(serialized) > threshold:
+            compressed = compress(serialized, level)
+            if len(compressed) < len(serialized):
+                return header + compressed
+        return RAW_HEADER + serialized
+
+    return _serializer
+
+
+def get_compressing_unserializer(
+    unserializer: Callable[[bytes], Any] = DEFAULT_UNSERIALIZER,
+) -> Callable[[bytes], Any]:
+    """Return an unserializer for values written by `get_compressing_serializer()`.
+
+    The codec is read from the 1-byte header (so values compressed with different
+    codecs can be mixed in the same namespace).
+
+    Values without a known header are given as is to the unserializer: so values
+    written by the default (pickle) serializer (before enabling the compression)
+    are still readable.
+
+    """
+
+    def _unserializer(data: bytes) -> Any:
+        if not data:
+            return unserializer(data)
+        header = data[0]
+        if header == RAW_HEADER[0]:
+            return unserializer(data[1:])
+        decompress = _DECOMPRESS_BY_HEADER.get(header)
+        if decompress is None:
+            # no header (value written by another serializer)
+            return unserializer(data)
+        return unserializer(decompress(data[1:]))
+
+    return _unserializer
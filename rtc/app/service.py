@@ -1,13 +1,23 @@
 import logging
+import random
 import time
 from dataclasses import dataclass, field
-from typing import Any, Callable, Iterable, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from rtc.app.combined import CombinedReadPort
 from rtc.app.exc import CacheException, CacheMiss
-from rtc.app.metadata import MetadataService
+from rtc.app.metadata import AsyncMetadataService, MetadataService
 from rtc.app.serializer import DEFAULT_SERIALIZER, DEFAULT_UNSERIALIZER
-from rtc.app.storage import StorageService
-from rtc.app.types import CacheHook, CacheInfo
+from rtc.app.storage import AsyncStorageService, StorageService
+from rtc.app.tags import TagSet
+from rtc.app.timings import (
+    PHASE_CALL,
+    PHASE_LOCK,
+    PHASE_STORAGE_GET,
+    PHASE_TAGS,
+    PhaseTimings,
+)
+from rtc.app.types import CacheHook, CacheInfo, SpanHook
 
 
 @dataclass(frozen=True)
@@ -36,6 +46,20 @@ def _tag_names(tag_names: Optional[Iterable[str]]) -> Iterable[str]:
     return tag_names
 
 
+def _reusable_tag_names(tag_names: Optional[Iterable[str]]) -> Iterable[str]:
+    """Same as _tag_names() but the result can be iterated several times.
+
+    (the given tag names can be a generator or an iterator, a TagSet is kept as
+    is to keep its memoized keys)
+
+    """
+    if tag_names is None:
+        return []
+    if isinstance(tag_names, TagSet):
+        return tag_names
+    return list(tag_names)
+
+
 @dataclass
 class Service:
     metadata_service: MetadataService
@@ -43,14 +67,82 @@ class Service:
     namespace: str = "default"
     cache_hook: Optional[CacheHook] = None
 
+    cache_hook_sample_rate: float = 1.0
+    """Ratio (between 0.0 and 1.0) of cache decorator calls given to the cache hook."""
+
+    span_hook: Optional[SpanHook] = None
+    """Optional hook called with each phase (span) of cache decorator calls."""
+
     serializer: Callable[[Any], Optional[bytes]] = DEFAULT_SERIALIZER
     """Serializer function to serialize data before storing it in the cache."""
 
     unserializer: Callable[[bytes], Any] = DEFAULT_UNSERIALIZER
     """Unserializer function to unserialize data after reading it from the cache."""
 
+    combined_read_adapter: Optional[CombinedReadPort] = None
+    """Optional adapter to read values in a single operation (metadata + storage)."""
+
     logger: logging.Logger = field(default_factory=get_logger)
 
+    def _should_call_hook(self) -> bool:
+        """Return True if the cache hook must be called for the current call (sampling).
+
+        Note: it must be checked before building the CacheInfo object (which is
+        not free).
+
+        """
+        if self.cache_hook is None:
+            return False
+        return (
+            self.cache_hook_sample_rate >= 1.0
+            or random.random() < self.cache_hook_sample_rate
+        )
+
+    def _get_phase_timings(self, with_hook: bool) -> Optional[PhaseTimings]:
+        """Return a PhaseTimings object if timings must be collected (None if not)."""
+        if self.span_hook is not None:
+            return PhaseTimings(with_spans=True)
+        if with_hook:
+            return PhaseTimings()
+        return None
+
+    def _safe_call_span_hook(
+        self,
+        cache_key: str,
+        timings: PhaseTimings,
+        userdata: Optional[Any] = None,
+    ) -> None:
+        """Call the span hook with each recorded phase (and the whole call).
+
+        Span start/end are given in nanoseconds since the epoch (as `time.time_ns()`).
+        If an exception is raised, it is caught and logged.
+
+        """
+        if self.span_hook is None or timings.spans is None:
+            return
+        end_ns = time.perf_counter_ns()
+        offset = time.time_ns() - end_ns
+        try:
+            self.span_hook(
+                cache_key,
+                PHASE_CALL,
+                timings.start_ns + offset,
+                end_ns + offset,
+                userdata=userdata,
+            )
+            for phase, start_ns, phase_end_ns in timings.spans:
+                self.span_hook(
+                    cache_key,
+                    phase,
+                    start_ns + offset,
+                    phase_end_ns + offset,
+                    userdata=userdata,
+                )
+        except Exception:
+            self.logger.warning(
+                f"Error while calling span hook {self.span_hook}", exc_info=True
+            )
+
     def _safe_call_hook(
         self,
         cache_key: str,
@@ -150,14 +242,52 @@ class Service:
             return False
         return self.set_bytes(key, value_bytes, tag_names, lifetime)
 
+    def _combined_get_bytes(
+        self, key: str, tag_names: Iterable[str]
+    ) -> Optional[Tuple[Optional[bytes], str]]:
+        """Read the value with the combined read adapter (if any).
+
+        None is returned if the combined read is not configured or not available.
+
+        """
+        if self.combined_read_adapter is None:
+            return None
+        res = self.combined_read_adapter.get_metadata_hash_and_value(
+            self.namespace,
+            key,
+            self.metadata_service.get_sorted_tag_names(tag_names),
+            self.metadata_service.default_lifetime,
+        )
+        if res is None:
+            return None
+        metadata_hash, value = res
+        return value, metadata_hash
+
     def _get_bytes(
-        self, key: str, tag_names: Optional[Iterable[str]] = None
+        self,
+        key: str,
+        tag_names: Optional[Iterable[str]] = None,
+        timings: Optional[PhaseTimings] = None,
     ) -> Tuple[Optional[bytes], Optional[str]]:
+        start_ns = time.perf_counter_ns() if timings is not None else 0
+        if self.combined_read_adapter is not None:
+            # (read twice if the combined read is not available)
+            tag_names = _reusable_tag_names(tag_names)
         try:
+            combined_res = self._combined_get_bytes(key, _tag_names(tag_names))
+            if combined_res is not None:
+                if timings is not None:
+                    timings.add(PHASE_STORAGE_GET, start_ns)
+                return combined_res
             metadata_hash = self.metadata_service.get_metadata_hash(
                 _tag_names(tag_names)
             )
-            return self.storage_service.get(key, metadata_hash), metadata_hash
+            if timings is not None:
+                start_ns = timings.add(PHASE_TAGS, start_ns)
+            res = self.storage_service.get(key, metadata_hash)
+            if timings is not None:
+                timings.add(PHASE_STORAGE_GET, start_ns)
+            return res, metadata_hash
         except CacheException:
             self.logger.warning(
                 "cache exception when reading a key => cache bypassed", exc_info=True
@@ -193,11 +323,158 @@ class Service:
             self.logger.warning("cache exception when deleting a key", exc_info=True)
             return False
 
+    def set_many_bytes(
+        self,
+        entries: Iterable[Tuple[str, bytes, Optional[Iterable[str]]]],
+        lifetime: Optional[int] = None,
+    ) -> bool:
+        """Set many (key, value, tag_names) entries.
+
+        Tag values are read with a single metadata call and all values are stored
+        with a single storage call.
+
+        Lifetime can be set (<=0 means:no expiration, None means "use default value")
+
+        """
+        entries = list(entries)
+        if not entries:
+            return True
+        try:
+            metadata_hashes = self.metadata_service.get_metadata_hashes(
+                _tag_names(tag_names) for _, _, tag_names in entries
+            )
+            self.storage_service.set_many(
+                (
+                    (key, metadata_hash, value)
+                    for (key, value, _), metadata_hash in zip(entries, metadata_hashes)
+                ),
+                lifetime,
+            )
+            return True
+        except CacheException:
+            self.logger.warning(
+                "cache exception when setting many keys => cache bypassed",
+                exc_info=True,
+            )
+            return False
+
+    def set_many(
+        self,
+        entries: Iterable[Tuple[str, Any, Optional[Iterable[str]]]],
+        lifetime: Optional[int] = None,
+    ) -> bool:
+        """Set many (key, value, tag_names) entries.
+
+        Entries that can't be serialized are bypassed (and False is returned).
+
+        """
+        res = True
+        entries_bytes: List[Tuple[str, bytes, Optional[Iterable[str]]]] = []
+        for key, value, tag_names in entries:
+            try:
+                value_bytes = self.serializer(value)
+            except Exception:
+                self.logger.warning(
+                    "error when serializing provided data => cache bypassed",
+                    exc_info=True,
+                )
+                res = False
+                continue
+            if value_bytes is None:
+                self.logger.warning(
+                    "serializer returned None => cache bypassed",
+                    exc_info=True,
+                )
+                res = False
+                continue
+            entries_bytes.append((key, value_bytes, tag_names))
+        return self.set_many_bytes(entries_bytes, lifetime) and res
+
+    def get_many_bytes(
+        self, entries: Iterable[Tuple[str, Optional[Iterable[str]]]]
+    ) -> List[Optional[bytes]]:
+        """Read many (key, tag_names) entries.
+
+        Tag values are read with a single metadata call and all values are read
+        with a single storage call.
+
+        Returns:
+            The values (same order than the given entries), None in case of cache miss.
+
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+        try:
+            metadata_hashes = self.metadata_service.get_metadata_hashes(
+                _tag_names(tag_names) for _, tag_names in entries
+            )
+            return self.storage_service.get_many(
+                (key, metadata_hash)
+                for (key, _), metadata_hash in zip(entries, metadata_hashes)
+            )
+        except CacheException:
+            self.logger.warning(
+                "cache exception when reading many keys => cache bypassed",
+                exc_info=True,
+            )
+            return [None] * len(entries)
+
+    def get_many(
+        self, entries: Iterable[Tuple[str, Optional[Iterable[str]]]]
+    ) -> Dict[str, Any]:
+        """Read many (key, tag_names) entries.
+
+        Returns:
+            A dict key => value with only cache hits (missing keys are cache misses).
+
+        """
+        entries = list(entries)
+        res: Dict[str, Any] = {}
+        for (key, _), value_bytes in zip(entries, self.get_many_bytes(entries)):
+            if value_bytes is None:
+                continue
+            try:
+                res[key] = self.unserializer(value_bytes)
+            except Exception:
+                self.logger.warning(
+                    "error when unserializing cached data => cache bypassed",
+                    exc_info=True,
+                )
+        return res
+
+    def delete_many(
+        self, entries: Iterable[Tuple[str, Optional[Iterable[str]]]]
+    ) -> int:
+        """Delete many (key, tag_names) entries.
+
+        Returns:
+            The number of really deleted entries.
+
+        """
+        entries = list(entries)
+        if not entries:
+            return 0
+        try:
+            metadata_hashes = self.metadata_service.get_metadata_hashes(
+                _tag_names(tag_names) for _, tag_names in entries
+            )
+            return self.storage_service.delete_many(
+                (key, metadata_hash)
+                for (key, _), metadata_hash in zip(entries, metadata_hashes)
+            )
+        except CacheException:
+            self.logger.warning(
+                "cache exception when deleting many keys", exc_info=True
+            )
+            return 0
+
     def __get_bytes_or_lock_id(
         self,
         key: str,
         tag_names: Iterable[str],
         lock_timeout: int = 5,
+        timings: Optional[PhaseTimings] = None,
     ) -> GetOrLockResult:
         """Read the value for the given key (with given invalidation tags).
 
@@ -209,13 +486,28 @@ class Service:
 
         """
         # first try without lock
-        res, metadata_hash = self._get_bytes(key, tag_names)
+        res, metadata_hash = self._get_bytes(key, tag_names, timings)
         if res is not None:
             # cache hit
             return GetOrLockResult(
                 value=res, metadata_hash=metadata_hash, full_hit=True
             )
         # cache miss => let's lock
+        if timings is None:
+            return self.__lock(key, tag_names, lock_timeout, metadata_hash)
+        start_ns = time.perf_counter_ns()
+        try:
+            return self.__lock(key, tag_names, lock_timeout, metadata_hash)
+        finally:
+            timings.add(PHASE_LOCK, start_ns)
+
+    def __lock(
+        self,
+        key: str,
+        tag_names: Iterable[str],
+        lock_timeout: int,
+        metadata_hash: Optional[str],
+    ) -> GetOrLockResult:
         before = time.perf_counter()
         while True:
             if metadata_hash is None:
@@ -228,8 +520,9 @@ class Service:
             res, metadata_hash = self._get_bytes(key, tag_names)
             if res is not None and metadata_hash is not None:
                 # cache hit
-                # let's unlock
-                self.metadata_service.unlock(key, metadata_hash, lock_id)
+                if lock_id:
+                    # let's unlock
+                    self.metadata_service.unlock(key, metadata_hash, lock_id)
                 return GetOrLockResult(
                     value=res,
                     metadata_hash=metadata_hash,
@@ -251,9 +544,10 @@ class Service:
         key: str,
         tag_names: Iterable[str],
         lock_timeout: int = 5,
+        timings: Optional[PhaseTimings] = None,
     ) -> GetOrLockResult:
         try:
-            return self.__get_bytes_or_lock_id(key, tag_names, lock_timeout)
+            return self.__get_bytes_or_lock_id(key, tag_names, lock_timeout, timings)
         except CacheException:
             self.logger.warning(
                 "cache exception when getting or locking a key", exc_info=True
@@ -267,3 +561,128 @@ class Service:
         except CacheException:
             self.logger.warning("cache exception when unlocking a key", exc_info=True)
             return False
+
+
+@dataclass
+class AsyncService:
+    """Async (asyncio) version of Service (same key layout)."""
+
+    metadata_service: AsyncMetadataService
+    storage_service: AsyncStorageService
+    namespace: str = "default"
+
+    serializer: Callable[[Any], Optional[bytes]] = DEFAULT_SERIALIZER
+    """Serializer function to serialize data before storing it in the cache."""
+
+    unserializer: Callable[[bytes], Any] = DEFAULT_UNSERIALIZER
+    """Unserializer function to unserialize data after reading it from the cache."""
+
+    logger: logging.Logger = field(default_factory=get_logger)
+
+    async def invalidate_tags(self, tag_names: Iterable[str]) -> bool:
+        """Invalidate a list of tag names."""
+        try:
+            await self.metadata_service.invalidate_tags(tag_names)
+            return True
+        except CacheException:
+            self.logger.warning(
+                "cache exception during a tag invalidation => operation bypassed",
+                exc_info=True,
+            )
+            return False
+
+    async def invalidate_all(self) -> bool:
+        """Invalidate all entries."""
+        try:
+            await self.metadata_service.invalidate_all()
+            return True
+        except CacheException:
+            self.logger.warning(
+                "cache exception during a tag invalidation => operation bypassed",
+                exc_info=True,
+            )
+            return False
+
+    async def set_bytes(
+        self,
+        key: str,
+        value: bytes,
+        tag_names: Optional[Iterable[str]] = None,
+        lifetime: Optional[int] = None,
+    ) -> bool:
+        """Set a value for the given key (with given invalidation tags).
+
+        Lifetime can be set (<=0 means:no expiration, None means "use default value")
+
+        """
+        try:
+            metadata_hash = await self.metadata_service.get_metadata_hash(
+                _tag_names(tag_names)
+            )
+            await self.storage_service.set(key, metadata_hash, value, lifetime)
+            return True
+        except CacheException:
+            self.logger.warning(
+                "cache exception when setting a key => cache bypassed", exc_info=True
+            )
+            return False
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tag_names: Optional[Iterable[str]] = None,
+        lifetime: Optional[int] = None,
+    ) -> bool:
+        try:
+            value_bytes = self.serializer(value)
+        except Exception:
+            self.logger.warning(
+                "error when serializing provided data => cache bypassed",
+                exc_info=True,
+            )
+            return False
+        if value_bytes is None:
+            self.logger.warning(
+                "serializer returned None => cache bypassed",
+                exc_info=True,
+            )
+            return False
+        return await self.set_bytes(key, value_bytes, tag_names, lifetime)
+
+    async def get_bytes(
+        self, key: str, tag_names: Optional[Iterable[str]] = None
+    ) -> Optional[bytes]:
+        try:
+            metadata_hash = await self.metadata_service.get_metadata_hash(
+                _tag_names(tag_names)
+            )
+            return await self.storage_service.get(key, metadata_hash)
+        except CacheException:
+            self.logger.warning(
+                "cache exception when reading a key => cache bypassed", exc_info=True
+            )
+            return None
+
+    async def get(self, key: str, tag_names: Optional[Iterable[str]] = None) -> Any:
+        value_bytes = await self.get_bytes(key, tag_names)
+        if value_bytes is None:
+            raise CacheMiss()
+        try:
+            return self.unserializer(value_bytes)
+        except Exception:
+            self.logger.warning(
+                "error when unserializing cached data => cache bypassed",
+                exc_info=True,
+            )
+            raise CacheMiss()
+
+    async def delete(self, key: str, tag_names: Optional[Iterable[str]] = None) -> bool:
+        try:
+            metadata_hash = await self.metadata_service.get_metadata_hash(
+                _tag_names(tag_names)
+            )
+            return await self.storage_service.delete(key, metadata_hash)
+        except CacheException:
+            self.logger.warning("cache exception when deleting a key", exc_info=True)
+            return False
@@ -1,7 +1,7 @@
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
 DEFAULT_LIFETIME = 86400  # Default lifetime (in seconds)
 
@@ -55,6 +55,110 @@ class StoragePort(ABC):
         """
         pass  # pragma: no cover
 
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        """Set many (key, metadata_hash, value) items for the given lifetime (in seconds).
+
+        Note: the default implementation calls set() for each item, adapters should
+        override it to set all items in a single operation.
+
+        Raises:
+            StorageException: if we can't store the values.
+
+        """
+        for key, metadata_hash, value in items:
+            self.set(namespace, key, metadata_hash, value, lifetime)
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        """Read the values under the given (key, metadata_hash) items.
+
+        Note: the default implementation calls get() for each item, adapters should
+        override it to get all values in a single operation.
+
+        Returns:
+            The values (same order than the given items), None if the key does not exist.
+
+        Raises:
+            StorageException: if we had an excepted error (not if a key does not exist).
+
+        """
+        return [self.get(namespace, key, metadata_hash) for key, metadata_hash in keys]
+
+    def get_many_with_lifetime(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        """Read the values under the given (key, metadata_hash) items with their remaining lifetime.
+
+        The remaining lifetime is in seconds, 0.0 means "no expiration" and None means
+        "unknown" (or no value). It's used to copy values into another cache (process
+        memory, shared memory...) without extending their lifetime.
+
+        Note: the default implementation calls get_many() and returns unknown
+        lifetimes, adapters should override it.
+
+        Raises:
+            StorageException: if we had an excepted error (not if a key does not exist).
+
+        """
+        return [(value, None) for value in self.get_many(namespace, keys)]
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        """Delete the entries under the given (key, metadata_hash) items.
+
+        Note: the default implementation calls delete() for each item, adapters should
+        override it to delete all entries in a single operation.
+
+        Returns:
+            the number of really deleted entries.
+
+        Raises:
+            StorageException: if we had an excepted error (not if a key does not exist).
+
+        """
+        return sum(
+            1
+            for key, metadata_hash in keys
+            if self.delete(namespace, key, metadata_hash)
+        )
+
+
+class AsyncStoragePort(ABC):
+    """Interface for the async (asyncio) cache storage.
+
+    See StoragePort for details about each method.
+
+    """
+
+    @abstractmethod
+    async def set(
+        self,
+        namespace: str,
+        key: str,
+        metadata_hash: str,
+        value: bytes,
+        lifetime: int,
+    ) -> None:
+        """Set a value under the given key (see StoragePort.set)."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def get(
+        self, namespace: str, key: str, metadata_hash: str
+    ) -> Optional[bytes]:
+        """Read the value under the given key (see StoragePort.get)."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        """Delete the entry under the given key (see StoragePort.delete)."""
+        pass  # pragma: no cover
+
 
 def get_logger() -> logging.Logger:
     return logging.getLogger("rtc.app.storage")
@@ -101,3 +205,61 @@ class StorageService:
     def delete(self, key: str, metadata_hash: str) -> bool:
         self.logger.debug("Deleting value for key: %s", key)
         return self.adapter.delete(self.namespace, key, metadata_hash)
+
+    def set_many(
+        self,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: Optional[int] = None,
+    ) -> None:
+        items = list(items)
+        self.logger.debug("Setting %i values", len(items))
+        self.adapter.set_many(self.namespace, items, self._resolve_lifetime(lifetime))
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> List[Optional[bytes]]:
+        keys = list(keys)
+        self.logger.debug("Getting %i values", len(keys))
+        return self.adapter.get_many(self.namespace, keys)
+
+    def delete_many(self, keys: Iterable[Tuple[str, str]]) -> int:
+        keys = list(keys)
+        self.logger.debug("Deleting %i values", len(keys))
+        return self.adapter.delete_many(self.namespace, keys)
+
+
+@dataclass
+class AsyncStorageService:
+    """Async (asyncio) version of StorageService."""
+
+    namespace: str
+    adapter: AsyncStoragePort
+    default_lifetime: int = DEFAULT_LIFETIME
+    logger: logging.Logger = field(default_factory=get_logger)
+
+    def _resolve_lifetime(self, lifetime: Optional[int]) -> int:
+        if lifetime is not None:
+            return lifetime
+        return self.default_lifetime
+
+    async def set(
+        self, key: str, metadata_hash: str, value: bytes, lifetime: Optional[int] = None
+    ) -> None:
+        self.logger.debug(
+            "Setting value for key: %s (metadata_hash: %s)", key, metadata_hash
+        )
+        await self.adapter.set(
+            self.namespace,
+            key,
+            metadata_hash,
+            value,
+            self._resolve_lifetime(lifetime),
+        )
+
+    async def get(self, key: str, metadata_hash: str) -> Optional[bytes]:
+        self.logger.debug(
+            "Getting value for key: %s (metadata_hash: %s)", key, metadata_hash
+        )
+        return await self.adapter.get(self.namespace, key, metadata_hash)
+
+    async def delete(self, key: str, metadata_hash: str) -> bool:
+        self.logger.debug("Deleting value for key: %s", key)
+        return await self.adapter.delete(self.namespace, key, metadata_hash)
@@ -0,0 +1,130 @@
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SPECIAL_ALL_TAG_NAME = "@@@all@@@"
+
+TAG_SET_MAX_KEYS = 16
+"""Maximum number of memoized key lists per TagSet (one per namespace and adapter)."""
+
+
+class TagSet:
+    """An immutable list of tag names which memoizes what is derived from it.
+
+    The sorted tag names (with the special "all" tag) used to compute the metadata
+    hash are computed once (in the constructor) and the keys built by adapters from
+    them are memoized (see `get_keys()`). So a TagSet built once (for example at
+    import time) and used for many cache operations saves the sorting and the key
+    building of each call.
+
+    A TagSet can be used everywhere an iterable of tag names is expected.
+
+    Note: duplicate tag names are kept (as for any other iterable of tag names).
+
+    """
+
+    __slots__ = ("_hash", "_keys", "_names", "_sorted")
+
+    def __init__(self, tag_names: Iterable[str] = (), _sorted: bool = False):
+        self._names: Tuple[str, ...] = tuple(tag_names)
+        self._hash = hash(self._names)
+        self._keys: Dict[Tuple[str, Any], Tuple[str, ...]] = {}
+        self._sorted: Optional[TagSet] = None
+        if _sorted:
+            self._sorted = self
+        else:
+            self._sorted = TagSet(
+                sorted(itertools.chain(self._names, (SPECIAL_ALL_TAG_NAME,))),
+                _sorted=True,
+            )
+
+    @property
+    def sorted_tag_names(self) -> "TagSet":
+        """The sorted tag names (including the special "all" tag) as a TagSet."""
+        return self._sorted  # type: ignore
+
+    def get_keys(
+        self, namespace: str, get_key: Callable[[str, str], str]
+    ) -> Tuple[str, ...]:
+        """Return the keys `get_key(namespace, tag_name)` of the tag names (memoized).
+
+        Note: for a bound method, keys must not depend on the instance (they are
+        memoized by the underlying function).
+
+        """
+        memo_key = (namespace, getattr(get_key, "__func__", get_key))
+        keys = self._keys.get(memo_key)
+        if keys is None:
+            keys = tuple(get_key(namespace, tag_name) for tag_name in self._names)
+            if len(self._keys) >= TAG_SET_MAX_KEYS:
+                self._keys.clear()
+            self._keys[memo_key] = keys
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, TagSet):
+            return self._names == other._names
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TagSet({list(self._names)!r})"
+
+
+def get_sorted_tag_names(tag_names: Iterable[str]) -> Iterable[str]:
+    """Return the sorted tag names (including the special "all" tag) of the given ones.
+
+    If tag_names is a TagSet, its precomputed sorted tag names are returned.
+
+    """
+    if isinstance(tag_names, TagSet):
+        return tag_names.sorted_tag_names
+    return sorted(itertools.chain(tag_names, (SPECIAL_ALL_TAG_NAME,)))
+
+
+def get_tag_keys(
+    namespace: str, tag_names: Iterable[str], get_key: Callable[[str, str], str]
+) -> List[str]:
+    """Return the keys `get_key(namespace, tag_name)` of the given tag names.
+
+    If tag_names is a TagSet, memoized keys are used (see `TagSet.get_keys()`).
+
+    """
+    if isinstance(tag_names, TagSet):
+        return list(tag_names.get_keys(namespace, get_key))
+    return [get_key(namespace, tag_name) for tag_name in tag_names]
+
+
+class TagSetMemo:
+    """A bounded (LRU) memo of TagSet objects for dynamic tag names."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._tag_sets: OrderedDict[Tuple[str, ...], TagSet] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tag_names: Iterable[str]) -> TagSet:
+        """Return the TagSet of the given tag names (built on the first use)."""
+        if isinstance(tag_names, TagSet):
+            return tag_names
+        names = tuple(tag_names)
+        with self._lock:
+            tag_set = self._tag_sets.get(names)
+            if tag_set is not None:
+                self._tag_sets.move_to_end(names)
+                return tag_set
+        tag_set = TagSet(names)
+        with self._lock:
+            self._tag_sets[names] = tag_set
+            while len(self._tag_sets) > self.max_size:
+                self._tag_sets.popitem(last=False)
+        return tag_set
@@ -0,0 +1,60 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+PHASE_KEY = "key"
+"""Cache key computation (arguments JSON encoding + hash) and dynamic tag names."""
+
+PHASE_TAGS = "tags"
+"""Tag values read (metadata hash)."""
+
+PHASE_STORAGE_GET = "storage_get"
+"""Value read (with single round trip reads, it includes the tag values read)."""
+
+PHASE_LOCK = "lock"
+"""Lock waiting (including reads done while waiting), only with lock=True."""
+
+PHASE_UNSERIALIZE = "unserialize"
+"""Unserialization of the cached value (cache hit)."""
+
+PHASE_DECORATED = "decorated"
+"""Decorated function call (cache miss)."""
+
+PHASE_SERIALIZE = "serialize"
+"""Serialization of the computed value (cache miss)."""
+
+PHASE_STORAGE_SET = "storage_set"
+"""Value write (including the tag values read for the metadata hash)."""
+
+PHASE_CALL = "call"
+"""Whole cache decorator call (only given to span hooks)."""
+
+
+class PhaseTimings:
+    """Per-phase timings of a cache decorator call (with `time.perf_counter_ns()`).
+
+    This object is only built when a cache hook (for a sampled call) or a span hook
+    is configured. Durations of a phase done several times (for example two storage
+    writes with stale_while_revalidate) are added.
+
+    """
+
+    __slots__ = ("durations", "spans", "start_ns")
+
+    def __init__(self, with_spans: bool = False):
+        self.start_ns = time.perf_counter_ns()
+        self.durations: Dict[str, int] = {}
+        """Phase => total duration (in ns)."""
+        self.spans: Optional[List[Tuple[str, int, int]]] = [] if with_spans else None
+        """(phase, start, end) list (perf_counter_ns values), None if not recorded."""
+
+    def add(self, phase: str, start_ns: int) -> int:
+        """Record the given phase (started at start_ns and ended now), return now."""
+        end_ns = time.perf_counter_ns()
+        self.durations[phase] = self.durations.get(phase, 0) + end_ns - start_ns
+        if self.spans is not None:
+            self.spans.append((phase, start_ns, end_ns))
+        return end_ns
+
+    def get(self, phase: str) -> int:
+        """Return the total duration (in ns) of the given phase (0 if not recorded)."""
+        return self.durations.get(phase, 0)
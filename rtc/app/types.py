@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Tuple
 
 PROTOCOL_AVAILABLE = False
 try:
@@ -57,12 +57,87 @@ class CacheInfo:
     serialized_size: int = 0
     """Serialized size of the value (in bytes)."""
 
+    stale: bool = False
+    """The returned value was a stale one (only with stale_while_revalidate), a refresh was scheduled in background."""
+
+    early_refresh: bool = False
+    """The cached value was close to its expiration and was (probabilistically) refreshed before (only with early_refresh_beta)."""
+
+    coalesced: bool = False
+    """The value was obtained from a concurrent identical call in the same process (only with single_flight)."""
+
+    key_elapsed_ns: int = 0
+    """Cache key computation time (in ns), including dynamic tag names."""
+
+    tags_elapsed_ns: int = 0
+    """Tag values read time (in ns), 0 with single round trip reads (included in storage_get_elapsed_ns)."""
+
+    storage_get_elapsed_ns: int = 0
+    """Value read time (in ns)."""
+
+    lock_elapsed_ns: int = 0
+    """Lock waiting time (in ns), including reads done while waiting, only when used with cache decorators and lock=True."""
+
+    unserialize_elapsed_ns: int = 0
+    """Unserialization time (in ns), only in case of cache hit."""
+
+    serialize_elapsed_ns: int = 0
+    """Serialization time (in ns), only in case of cache miss."""
+
+    storage_set_elapsed_ns: int = 0
+    """Value write time (in ns), only in case of cache miss."""
+
     # extra note: if lock_full_hit = False and lock_full_miss = False (when used with cache decorators and lock=True),
     # it means that the value was initially not here, so we acquired a lock but the value was cached after that (anti-dogpile effect)
 
-    def _dump(self) -> List[str]:
-        # Special method for cache decorators
-        return [self.filepath, self.class_name, self.function_name]
+
+@dataclass(frozen=True)
+class LocalCacheStats:
+    """Statistics about a process-local cache layer."""
+
+    hits: int = 0
+    """Number of lookups served by the local cache."""
+
+    misses: int = 0
+    """Number of lookups not served by the local cache."""
+
+    evictions: int = 0
+    """Number of entries evicted because the local cache was full."""
+
+    expired: int = 0
+    """Number of entries removed because they were expired (0 if not tracked)."""
+
+    entries: int = 0
+    """Current number of entries in the local cache."""
+
+    size_in_bytes: int = 0
+    """Current size (in bytes) of the cached values (0 if the size is not tracked)."""
+
+
+@dataclass(frozen=True)
+class ConnectionPoolStats:
+    """Statistics about a Redis connection pool."""
+
+    max_connections: int = 0
+    """Maximum number of connections of the pool."""
+
+    created_connections: int = 0
+    """Current number of connections created by the pool."""
+
+    in_use_connections: int = 0
+    """Current number of connections in use."""
+
+    idle_connections: int = 0
+    """Current number of connections created but not in use."""
+
+    checkouts: int = 0
+    """Total number of connections checked out from the pool."""
+
+    total_wait_time: float = 0.0
+    """Total time (in seconds) spent getting connections from the pool (including connection time)."""
+
+    wait_time: float = 0.0
+    """Time (in seconds) spent getting the connection (only when given to the connection pool hook)."""
 
 
 if PROTOCOL_AVAILABLE:
@@ -78,5 +153,18 @@ if PROTOCOL_AVAILABLE:
             """Signature of cache hooks."""
             pass
 
+    class SpanHook(Protocol):
+        def __call__(
+            self,
+            cache_key: str,
+            phase: str,
+            start_ns: int,
+            end_ns: int,
+            userdata: Any = None,
+        ) -> None:
+            """Signature of span hooks."""
+            pass
+
 else:
     CacheHook = Callable  # type: ignore
+    SpanHook = Callable  # type: ignore
@@ -0,0 +1,289 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis
+
+from rtc.app.combined import CombinedReadPort
+from rtc.app.exc import StorageCacheException
+from rtc.app.hash import HASH_SIZE_IN_BYTES, get_hash_backend, get_random_bytes
+from rtc.app.tags import get_tag_keys
+from rtc.infra.adapters.metadata.redis import get_tag_key
+from rtc.infra.adapters.storage.redis import get_storage_key_prefix
+
+# Lua port of rtc.app.hash.short_hash (md5 + truncation + base64 urlsafe without
+# padding and with ~ instead of -) as redis does not provide md5 to scripts.
+# It relies on the "bit" library which is always available in redis scripts.
+SHORT_HASH_LUA = """
+local band, bor, bxor, bnot = bit.band, bit.bor, bit.bxor, bit.bnot
+local lshift, rshift, rol, tobit = bit.lshift, bit.rshift, bit.rol, bit.tobit
+local MD5_K = {
+    0xd76aa478, 0xe8c7b756, 0x242070db, 0xc1bdceee,
+    0xf57c0faf, 0x4787c62a, 0xa8304613, 0xfd469501,
+    0x698098d8, 0x8b44f7af, 0xffff5bb1, 0x895cd7be,
+    0x6b901122, 0xfd987193, 0xa679438e, 0x49b40821,
+    0xf61e2562, 0xc040b340, 0x265e5a51, 0xe9b6c7aa,
+    0xd62f105d, 0x02441453, 0xd8a1e681, 0xe7d3fbc8,
+    0x21e1cde6, 0xc33707d6, 0xf4d50d87, 0x455a14ed,
+    0xa9e3e905, 0xfcefa3f8, 0x676f02d9, 0x8d2a4c8a,
+    0xfffa3942, 0x8771f681, 0x6d9d6122, 0xfde5380c,
+    0xa4beea44, 0x4bdecfa9, 0xf6bb4b60, 0xbebfbc70,
+    0x289b7ec6, 0xeaa127fa, 0xd4ef3085, 0x04881d05,
+    0xd9d4d039, 0xe6db99e5, 0x1fa27cf8, 0xc4ac5665,
+    0xf4292244, 0x432aff97, 0xab9423a7, 0xfc93a039,
+    0x655b59c3, 0x8f0ccc92, 0xffeff47d, 0x85845dd1,
+    0x6fa87e4f, 0xfe2ce6e0, 0xa3014314, 0x4e0811a1,
+    0xf7537e82, 0xbd3af235, 0x2ad7d2bb, 0xeb86d391,
+}
+local MD5_S = {
+    7, 12, 17, 22, 7, 12, 17, 22, 7, 12, 17, 22, 7, 12, 17, 22,
+    5, 9, 14, 20, 5, 9, 14, 20, 5, 9, 14, 20, 5, 9, 14, 20,
+    4, 11, 16, 23, 4, 11, 16, 23, 4, 11, 16, 23, 4, 11, 16, 23,
+    6, 10, 15, 21, 6, 10, 15, 21, 6, 10, 15, 21, 6, 10, 15, 21,
+}
+local B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789~_"
+
+local function md5_bytes(msg)
+    local len = #msg
+    local bits = len * 8
+    local tail = {}
+    for i = 0, 7 do
+        tail[#tail + 1] = string.char(math.floor(bits / 2 ^ (8 * i)) % 256)
+    end
+    msg = msg .. "\\128" .. string.rep("\\0", (55 - len) % 64) .. table.concat(tail)
+    local a0, b0 = tobit(0x67452301), tobit(0xefcdab89)
+    local c0, d0 = tobit(0x98badcfe), tobit(0x10325476)
+    local m = {}
+    for chunk = 1, #msg, 64 do
+        for i = 0, 15 do
+            local b1, b2, b3, b4 = string.byte(msg, chunk + i * 4, chunk + i * 4 + 3)
+            m[i] = bor(b1, lshift(b2, 8), lshift(b3, 16), lshift(b4, 24))
+        end
+        local a, b, c, d = a0, b0, c0, d0
+        for i = 0, 63 do
+            local f, g
+            if i < 16 then
+                f = bor(band(b, c), band(bnot(b), d))
+                g = i
+            elseif i < 32 then
+                f = bor(band(d, b), band(bnot(d), c))
+                g = (5 * i + 1) % 16
+            elseif i < 48 then
+                f = bxor(b, c, d)
+                g = (3 * i + 5) % 16
+            else
+                f = bxor(c, bor(b, bnot(d)))
+                g = (7 * i) % 16
+            end
+            f = tobit(f + a + MD5_K[i + 1] + m[g])
+            a = d
+            d = c
+            c = b
+            b = tobit(b + rol(f, MD5_S[i + 1]))
+        end
+        a0 = tobit(a0 + a)
+        b0 = tobit(b0 + b)
+        c0 = tobit(c0 + c)
+        d0 = tobit(d0 + d)
+    end
+    local res = {}
+    for _, word in ipairs({a0, b0, c0, d0}) do
+        for i = 0, 3 do
+            res[#res + 1] = band(rshift(word, 8 * i), 0xff)
+        end
+    end
+    return res
+end
+
+local function short_hash(data, size)
+    local bytes = md5_bytes(data)
+    local out = {}
+    for i = 1, size, 3 do
+        local b1, b2, b3 = bytes[i], bytes[i + 1], bytes[i + 2]
+        if i + 1 > size then b2 = nil end
+        if i + 2 > size then b3 = nil end
+        local n = b1 * 65536 + (b2 or 0) * 256 + (b3 or 0)
+        local c1 = math.floor(n / 262144) % 64
+        local c2 = math.floor(n / 4096) % 64
+        out[#out + 1] = string.sub(B64, c1 + 1, c1 + 1)
+        out[#out + 1] = string.sub(B64, c2 + 1, c2 + 1)
+        if b2 then
+            local c3 = math.floor(n / 64) % 64
+            out[#out + 1] = string.sub(B64, c3 + 1, c3 + 1)
+        end
+        if b3 then
+            local c4 = n % 64
+            out[#out + 1] = string.sub(B64, c4 + 1, c4 + 1)
+        end
+    end
+    return table.concat(out)
+end
+"""
+
+# KEYS[1...n-1]: the tag keys (sorted by tag names)
+# KEYS[n]: the expected storage key (storage key prefix + expected metadata hash)
+# ARGV[1]: expected metadata hash (can be empty)
+# ARGV[2]: lifetime of created tags (in seconds, <=0 means "no expiration")
+# ARGV[3]: hash size in bytes
+# ARGV[4...]: random values to use for missing tags (one per tag key)
+#
+# The value is read only if the metadata hash is the expected one (all keys
+# accessed by a script must be given in KEYS), else only the metadata hash is
+# returned.
+COMBINED_READ_LUA_SCRIPT = (
+    SHORT_HASH_LUA
+    + """
+local lifetime = tonumber(ARGV[2])
+local tags = #KEYS - 1
+local values = redis.call("MGET", unpack(KEYS, 1, tags))
+for i = 1, tags do
+    if not values[i] then
+        values[i] = ARGV[3 + i]
+        if lifetime > 0 then
+            redis.call("SET", KEYS[i], values[i], "EX", lifetime)
+        else
+            redis.call("SET", KEYS[i], values[i])
+        end
+    end
+end
+local metadata_hash = short_hash(table.concat(values, " "), tonumber(ARGV[3]))
+if metadata_hash == ARGV[1] then
+    return {metadata_hash, redis.call("GET", KEYS[#KEYS])}
+end
+return {metadata_hash}
+"""
+)
+
+
+def get_logger() -> logging.Logger:
+    return logging.getLogger("rtc.infra.adapters.combined.redis")
+
+
+SCRIPTING_UNAVAILABLE_ERROR_MARKERS = (
+    "NOSCRIPT",
+    "NOPERM",
+    "no permissions",
+    "unknown command",
+)
+"""Markers (lowercase compared) of errors which mean that scripting is not available."""
+
+
+def is_scripting_unavailable(error: Exception) -> bool:
+    """Return True if the given error (raised by the script call) means that scripting is not available."""
+    message = str(error).lower()
+    return any(
+        marker.lower() in message for marker in SCRIPTING_UNAVAILABLE_ERROR_MARKERS
+    )
+
+
+@dataclass
+class RedisCombinedReadAdapter(CombinedReadPort):
+    """Redis adapter for the combined read port.
+
+    A single EVALSHA call resolves the tag values, computes the metadata hash
+    server-side and reads the stored value.
+
+    As the storage key depends on the metadata hash, the script can only read the
+    value of an expected storage key (declared in KEYS): the one of the last
+    metadata hash seen (by this adapter) for the key. If the metadata hash is not
+    the expected one (first read of the key, invalidated tags), a second call
+    (GET) reads the value.
+
+    If scripting is not available (disabled commands, ACL...), the adapter
+    returns None forever (so the caller falls back to the classic two-step read).
+    Other script errors (OOM, BUSY, WRONGTYPE...) make the adapter return None
+    for this call only. It's the same if the hash backend is not md5 (the only
+    one ported in Lua).
+
+    """
+
+    redis_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    expected_metadata_hashes_max_size: int = 10000
+    """Maximum number of memoized (expected) metadata hashes (one per key)."""
+
+    _expected_metadata_hashes: Dict[str, str] = field(
+        default_factory=dict, init=False, repr=False
+    )  # storage key prefix => last seen metadata hash
+    _redis_client: Optional[redis.Redis] = None
+    _redis_client_lock: threading.Lock = field(default_factory=threading.Lock)
+    _redis_combined_read_cmd: Any = field(default=None, init=False, repr=False)
+    _redis_combined_read_cmd_lock: threading.Lock = field(
+        default_factory=threading.Lock
+    )
+    _unavailable: bool = field(default=False, init=False)
+    logger: logging.Logger = field(default_factory=get_logger)
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        with self._redis_client_lock:
+            if self._redis_client is None:
+                self._redis_client = redis.Redis(**self.redis_kwargs)
+            return self._redis_client
+
+    @property
+    def redis_combined_read_cmd(self) -> Any:
+        with self._redis_combined_read_cmd_lock:
+            if self._redis_combined_read_cmd is None:
+                self._redis_combined_read_cmd = self.redis_client.register_script(
+                    COMBINED_READ_LUA_SCRIPT
+                )
+            return self._redis_combined_read_cmd
+
+    def get_metadata_hash_and_value(
+        self,
+        namespace: str,
+        key: str,
+        sorted_tag_names: Iterable[str],
+        tags_lifetime: Optional[int],
+    ) -> Optional[Tuple[str, Optional[bytes]]]:
+        if self._unavailable or get_hash_backend() != "md5":
+            return None
+        tag_keys = get_tag_keys(namespace, sorted_tag_names, get_tag_key)
+        prefix = get_storage_key_prefix(namespace, key)
+        expected_metadata_hash = self._expected_metadata_hashes.get(prefix, "")
+        args = [
+            expected_metadata_hash,
+            tags_lifetime or 0,
+            HASH_SIZE_IN_BYTES,
+        ] + [get_random_bytes() for _ in tag_keys]
+        try:
+            res = self.redis_combined_read_cmd(
+                keys=[*tag_keys, prefix + expected_metadata_hash], args=args
+            )
+        except redis.exceptions.ResponseError as e:
+            if not is_scripting_unavailable(e):
+                # (OOM, BUSY, WRONGTYPE... => fallback for this call only)
+                self.logger.warning(
+                    "combined read script error => fallback to classic read",
+                    exc_info=True,
+                )
+                return None
+            self.logger.warning(
+                "combined read script is not available => fallback to classic reads",
+                exc_info=True,
+            )
+            self._unavailable = True
+            return None
+        except Exception as e:
+            raise StorageCacheException(
+                f"Failed to get value (combined read) from Redis: {e}"
+            ) from e
+        metadata_hash = res[0].decode("utf-8")
+        if len(res) > 1:
+            return metadata_hash, res[1]
+        # (not the expected metadata hash => the value is not read by the script)
+        try:
+            value: Optional[bytes] = self.redis_client.get(prefix + metadata_hash)  # type: ignore
+        except Exception as e:
+            raise StorageCacheException(
+                f"Failed to get value (combined read) from Redis: {e}"
+            ) from e
+        if (
+            len(self._expected_metadata_hashes)
+            >= self.expected_metadata_hashes_max_size
+        ):
+            self._expected_metadata_hashes.clear()
+        self._expected_metadata_hashes[prefix] = metadata_hash
+        return metadata_hash, value
@@ -0,0 +1,18 @@
+from typing import Iterable, Optional
+
+from rtc.app.hash import get_random_bytes
+from rtc.app.metadata import AsyncMetadataPort
+
+
+class AsyncBlackHoleMetadataAdapter(AsyncMetadataPort):
+    """Async blackhole metadata adapter that does nothing."""
+
+    async def invalidate_tags(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> None:
+        return
+
+    async def get_or_set_tag_values(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> Iterable[bytes]:
+        return [get_random_bytes() for _ in tag_names]
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from rtc.app.metadata import AsyncMetadataPort
+from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
+
+
+@dataclass
+class AsyncDictMetadataAdapter(AsyncMetadataPort):
+    """Async version of DictMetadataAdapter (for unit-testing).
+
+    As everything is in local memory, the sync adapter is called directly.
+
+    """
+
+    adapter: DictMetadataAdapter = field(default_factory=DictMetadataAdapter)
+
+    async def invalidate_tags(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> None:
+        return self.adapter.invalidate_tags(namespace, tag_names, lifetime)
+
+    async def get_or_set_tag_values(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> Iterable[bytes]:
+        return list(self.adapter.get_or_set_tag_values(namespace, tag_names, lifetime))
@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from rtc.app.exc import MetadataCacheException
+from rtc.app.hash import get_random_bytes
+from rtc.app.metadata import AsyncMetadataPort
+from rtc.app.tags import get_tag_keys
+from rtc.infra.adapters.metadata.redis import get_tag_key
+
+ASYNC_REDIS_AVAILABLE = False
+try:
+    import redis.asyncio as aioredis
+
+    ASYNC_REDIS_AVAILABLE = True
+except Exception:  # pragma: no cover
+    pass
+
+
+@dataclass
+class AsyncRedisMetadataAdapter(AsyncMetadataPort):
+    """Async Redis adapter (based on redis.asyncio) for the async metadata port.
+
+    Note: the key layout is the same than RedisMetadataAdapter.
+
+    """
+
+    redis_kwargs: Dict[str, Any] = field(default_factory=dict)
+    _redis_client: Optional[Any] = None
+
+    @property
+    def redis_client(self) -> "aioredis.Redis":
+        if self._redis_client is None:
+            if not ASYNC_REDIS_AVAILABLE:
+                raise MetadataCacheException(
+                    "redis.asyncio is not available (redis>=4.2.0 is required)"
+                )
+            self._redis_client = aioredis.Redis(**self.redis_kwargs)
+        return self._redis_client
+
+    async def get_or_set_tag_values(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> Iterable[bytes]:
+        tag_keys = get_tag_keys(namespace, tag_names, get_tag_key)
+        try:
+            values: List[bytes] = await self.redis_client.mget(tag_keys)  # type: ignore
+        except Exception as e:
+            raise MetadataCacheException(
+                f"Failed to get tag values from Redis: {e}"
+            ) from e
+        empty_tag_keys = [
+            (i, tag_key)
+            for i, (tag_key, value) in enumerate(zip(tag_keys, values))
+            if value is None
+        ]
+        if empty_tag_keys:
+            try:
+                pipe = self.redis_client.pipeline()
+                for i, tag_key in empty_tag_keys:
+                    values[i] = get_random_bytes()
+                    pipe.set(tag_key, values[i], ex=lifetime or None)
+                await pipe.execute()
+            except Exception as e:
+                raise MetadataCacheException(
+                    f"Failed to set tag values in Redis: {e}"
+                ) from e
+        return values
+
+    async def invalidate_tags(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> None:
+        tag_keys = [get_tag_key(namespace, tag_name) for tag_name in tag_names]
+        try:
+            pipe = self.redis_client.pipeline()
+            for tag_key in tag_keys:
+                if lifetime:
+                    pipe.set(tag_key, get_random_bytes(), ex=lifetime)
+                else:
+                    pipe.set(tag_key, get_random_bytes())
+            await pipe.execute()
+        except Exception as e:
+            raise MetadataCacheException(
+                f"Failed to set tag values in Redis: {e}"
+            ) from e
+
+    async def aclose(self) -> None:
+        """Close the underlying Redis connections (if any)."""
+        if self._redis_client is not None:
+            # aclose() is only available with redis>=5.0.1
+            close = getattr(self._redis_client, "aclose", self._redis_client.close)
+            await close()
+            self._redis_client = None
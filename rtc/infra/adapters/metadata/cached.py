@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from rtc.app.metadata import MetadataPort
+from rtc.app.types import LocalCacheStats
+
+
+@dataclass
+class CachedMetadataAdapter(MetadataPort):
+    """Metadata adapter that caches tag values of another adapter in process memory.
+
+    Tag values are kept (at most) max_staleness seconds before being read again
+    from the wrapped adapter. So an invalidation made by another process can be
+    seen up to max_staleness seconds later (invalidations made through this
+    adapter are seen immediately by this process).
+
+    The number of cached tag values is bounded by max_size (LRU eviction).
+
+    """
+
+    adapter: MetadataPort
+    max_staleness: float = 0.2
+    """Maximum staleness (in seconds) of a cached tag value."""
+
+    max_size: int = 10000
+    """Maximum number of cached tag values."""
+
+    _entries: "OrderedDict[Tuple[str, str], Tuple[bytes, float]]" = field(
+        init=False, default_factory=OrderedDict
+    )  # (namespace, tag_name) -> (value, fetched_at)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _hits: int = field(init=False, default=0)
+    _misses: int = field(init=False, default=0)
+    _evictions: int = field(init=False, default=0)
+
+    @property
+    def stats(self) -> LocalCacheStats:
+        with self._lock:
+            return LocalCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+            )
+
+    def _set(self, cache_key: Tuple[str, str], value: bytes, fetched_at: float):
+        # must be called with self._lock acquired
+        self._entries[cache_key] = (value, fetched_at)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get_or_set_tag_values(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> Iterable[bytes]:
+        tag_names = list(tag_names)
+        values: List[Optional[bytes]] = []
+        missing_indexes: List[int] = []
+        now = time.monotonic()
+        with self._lock:
+            for i, tag_name in enumerate(tag_names):
+                cache_key = (namespace, tag_name)
+                entry = self._entries.get(cache_key)
+                if entry is not None and now - entry[1] <= self.max_staleness:
+                    self._entries.move_to_end(cache_key)
+                    values.append(entry[0])
+                    self._hits += 1
+                else:
+                    values.append(None)
+                    missing_indexes.append(i)
+                    self._misses += 1
+        if missing_indexes:
+            fetched_at = time.monotonic()
+            fetched_values = self.adapter.get_or_set_tag_values(
+                namespace, [tag_names[i] for i in missing_indexes], lifetime
+            )
+            with self._lock:
+                for i, value in zip(missing_indexes, fetched_values):
+                    values[i] = value
+                    self._set((namespace, tag_names[i]), value, fetched_at)
+        return values  # type: ignore
+
+    def invalidate_tags(
+        self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
+    ) -> None:
+        tag_names = list(tag_names)
+        with self._lock:
+            for tag_name in tag_names:
+                self._entries.pop((namespace, tag_name), None)
+        self.adapter.invalidate_tags(namespace, tag_names, lifetime)
+        with self._lock:
+            # in case of a concurrent read during the invalidation
+            for tag_name in tag_names:
+                self._entries.pop((namespace, tag_name), None)
+
+    def lock(
+        self,
+        namespace: str,
+        key: str,
+        metadata_hash: str,
+        timeout: int = 5,
+        waiting: int = 1,
+    ) -> Optional[str]:
+        return self.adapter.lock(namespace, key, metadata_hash, timeout, waiting)
+
+    def unlock(
+        self, namespace: str, key: str, metadata_hash: str, lock_identifier: str
+    ) -> None:
+        return self.adapter.unlock(namespace, key, metadata_hash, lock_identifier)
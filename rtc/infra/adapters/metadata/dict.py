@@ -1,105 +1,121 @@
+import threading
 import time
 from dataclasses import dataclass, field
-from threading import Lock, Thread
-from typing import Dict, Iterable, Optional, Tuple
-
-import wrapt
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from rtc.app.hash import get_random_bytes
 from rtc.app.metadata import MetadataPort
+from rtc.infra.adapters.sweeper import get_shared_sweeper
+
+TagKey = Tuple[str, str]  # (namespace, tag_name)
+LockKey = Tuple[str, str, str]  # (namespace, key, metadata_hash)
+
+
+class _Shard:
+    """A part of the tags and locks (with its own lock)."""
+
+    __slots__ = ("condition", "lock", "locks", "tags")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        """Notified when a lock of this shard is released."""
+        self.tags: Dict[TagKey, Tuple[bytes, float]] = {}
+        # (value, expiration: monotonic time, 0.0 means no expiration)
+        self.locks: Dict[LockKey, Tuple[str, float]] = {}
+        # (lock identifier, expiration: monotonic time)
+
+    def sweep(self, now: float) -> None:
+        # must be called with self.lock acquired
+        expired_tags = [
+            tag_key
+            for tag_key, (_, expiration) in self.tags.items()
+            if 0.0 < expiration < now
+        ]
+        for tag_key in expired_tags:
+            del self.tags[tag_key]
+        expired_locks = [
+            lock_key
+            for lock_key, (_, expiration) in self.locks.items()
+            if expiration < now
+        ]
+        for lock_key in expired_locks:
+            del self.locks[lock_key]
+        if expired_locks:
+            self.condition.notify_all()
 
 
-@wrapt.decorator
-def locked(wrapped, instance, args, kwargs):
-    with instance._internal_lock:
-        return wrapped(*args, **kwargs)
-
-
-class LockWithId:
-    _lock: Lock
-    _id: Optional[str]
-    _expiration: float
-
-    def __init__(self, lifetime: int):
-        self._lock = Lock()
-        self._id = None
-        self._expiration = time.perf_counter() + lifetime
-
-    def acquire(self, wait_timeout: int) -> Optional[str]:
-        acquired = self._lock.acquire(blocking=True, timeout=wait_timeout)
-        if acquired:
-            self._id = get_random_bytes().hex()
-            return self._id
-        return None
-
-    def release(self):
-        self._id = None
-        try:
-            self._lock.release()
-        except RuntimeError:
-            pass
-
-    @property
-    def is_expired(self) -> bool:
-        return time.perf_counter() > self._expiration
+@dataclass
+class DictMetadataAdapter(MetadataPort):
+    """Metadata adapter that keeps tags and locks in process memory.
 
+    Tags and locks are split into shards (with their own lock) to limit lock
+    contention between threads. Tag lifetimes are honored (an expired tag gets a
+    new value, as with Redis) and expired tags and locks are removed by the
+    shared sweeper thread (one shard at each sweep, see `rtc.infra.adapters.sweeper`).
 
-@dataclass
-class Item:
-    value: bytes
-    lifetime: int
-    _expiration: float = field(default=0.0)
+    As with the Redis adapter, a waiter woken up by the release of the lock by
+    its owner gets None (so it can read the value computed by the owner).
 
-    def __post_init__(self):
-        if self.lifetime > 0:
-            self._expiration = time.perf_counter() + self.lifetime
+    """
 
-    @property
-    def is_expired(self) -> bool:
-        if self._expiration < 0.1:
-            return False
-        return time.perf_counter() > self._expiration
+    shards: int = 16
+    """Number of shards (each one with its own lock)."""
 
+    expiry_sweep: bool = True
+    """If True, expired tags and locks are removed in background (by the shared sweeper)."""
 
-@dataclass
-class DictMetadataAdapter(MetadataPort):
-    _internal_lock: Lock = field(init=False, repr=False, default_factory=Lock)
-    _tags: Dict[Tuple[str, str], Item] = field(
-        default_factory=dict
-    )  # (namespace, tag_name) -> value
-    _locks: Dict[Tuple[str, str, str], LockWithId] = field(
-        default_factory=dict
-    )  # (namespace, key, metadata_hash) -> LockWithId
-    _expiration_thread: Optional[Thread] = None
+    _shards: List[_Shard] = field(init=False, default_factory=list)
+    _sweep_index: int = field(init=False, default=0)
 
     def __post_init__(self):
-        self._expiration_thread = Thread(target=self.expiration_thread_run, daemon=True)
-        self._expiration_thread.start()
+        if self.shards < 1:
+            raise ValueError("shards must be >= 1")
+        self._shards = [_Shard() for _ in range(self.shards)]
+        if self.expiry_sweep:
+            get_shared_sweeper().register(self)
+
+    def _get_shard(self, key: Tuple[str, ...]) -> _Shard:
+        return self._shards[hash(key) % self.shards]
+
+    def sweep(self) -> None:
+        """Remove expired tags and locks of the next shard (called by the shared sweeper)."""
+        shard = self._shards[self._sweep_index % self.shards]
+        self._sweep_index += 1
+        now = time.monotonic()
+        with shard.lock:
+            shard.sweep(now)
+
+    def close(self) -> None:
+        """Stop the background expiry sweep of this adapter."""
+        get_shared_sweeper().unregister(self)
 
-    @locked
     def invalidate_tags(
         self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
     ) -> None:
+        expiration = time.monotonic() + lifetime if lifetime else 0.0
         for tag_name in tag_names:
-            print("invalidate_tags", namespace, tag_name)
-            self._tags[(namespace, tag_name)] = Item(
-                value=get_random_bytes(), lifetime=lifetime or 0
-            )
+            tag_key = (namespace, tag_name)
+            shard = self._get_shard(tag_key)
+            with shard.lock:
+                shard.tags[tag_key] = (get_random_bytes(), expiration)
 
-    @locked
     def get_or_set_tag_values(
         self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
     ) -> Iterable[bytes]:
+        now = time.monotonic()
+        expiration = now + lifetime if lifetime else 0.0
+        values: List[bytes] = []
         for tag_name in tag_names:
-            item = self._tags.get((namespace, tag_name))
-            if item is None:
-                new_value = get_random_bytes()
-                self._tags[(namespace, tag_name)] = Item(
-                    value=new_value, lifetime=lifetime or 0
-                )
-                yield new_value
-            else:
-                yield item.value
+            tag_key = (namespace, tag_name)
+            shard = self._get_shard(tag_key)
+            with shard.lock:
+                entry = shard.tags.get(tag_key)
+                if entry is None or 0.0 < entry[1] < now:
+                    entry = (get_random_bytes(), expiration)
+                    shard.tags[tag_key] = entry
+            values.append(entry[0])
+        return values
 
     def lock(
         self,
@@ -109,32 +125,34 @@ class DictMetadataAdapter(MetadataPort):
         timeout: int = 5,
         waiting: int = 1,
     ) -> Optional[str]:
-        with self._internal_lock:
-            lock_with_id = self._locks.get((namespace, key, metadata_hash))
-            if lock_with_id is None:
-                lock_with_id = LockWithId(timeout)
-                self._locks[(namespace, key, metadata_hash)] = lock_with_id
-                return lock_with_id.acquire(waiting)  # Can't block
-        return lock_with_id.acquire(waiting)
+        lock_key = (namespace, key, metadata_hash)
+        shard = self._get_shard(lock_key)
+        lock_id = get_random_bytes().hex()
+        deadline = time.monotonic() + waiting
+        with shard.condition:
+            awaited: Optional[Tuple[str, float]] = None  # (the lock we wait for)
+            while True:
+                now = time.monotonic()
+                entry = shard.locks.get(lock_key)
+                if awaited is not None and entry != awaited and awaited[1] >= now:
+                    # released by its owner while we were waiting
+                    return None
+                if entry is None or entry[1] < now:
+                    shard.locks[lock_key] = (lock_id, now + timeout)
+                    return lock_id
+                if now >= deadline:
+                    return None
+                awaited = entry
+                shard.condition.wait(min(deadline, entry[1]) - now)
 
     def unlock(
         self, namespace: str, key: str, metadata_hash: str, lock_identifier: str
     ) -> None:
-        with self._internal_lock:
-            try:
-                lock_with_id = self._locks.pop((namespace, key, metadata_hash))
-            except KeyError:
+        lock_key = (namespace, key, metadata_hash)
+        shard = self._get_shard(lock_key)
+        with shard.condition:
+            entry = shard.locks.get(lock_key)
+            if entry is None or entry[0] != lock_identifier:
                 return
-            lock_with_id.release()
-
-    def expiration_thread_run(self):
-        while True:
-            with self._internal_lock:
-                new_locks: Dict[Tuple[str, str, str], LockWithId] = {}
-                for k, lock_with_id in self._locks.items():
-                    if lock_with_id.is_expired:
-                        lock_with_id.release()
-                    else:
-                        new_locks[k] = lock_with_id
-                self._locks = new_locks
-            time.sleep(0.5)
+            del shard.locks[lock_key]
+            shard.condition.notify_all()
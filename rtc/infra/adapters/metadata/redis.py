@@ -1,45 +1,126 @@
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import redis
 
 from rtc.app.exc import MetadataCacheException
-from rtc.app.hash import get_random_bytes, short_hash
+from rtc.app.hash import get_random_bytes, short_hash, short_hash_memoized
 from rtc.app.metadata import MetadataPort
+from rtc.app.tags import get_tag_keys
+from rtc.app.types import LocalCacheStats
+from rtc.infra.adapters.metadata.redis_tracking import RedisTagsTracker
+from rtc.infra.adapters.redis_replicas import RedisReplicaRouter
 
-LOCK_LUA_SCRIPT = """
+MAX_WOKEN_WAITERS = 10000
+"""Maximum number of lock waiters woken by a single unlock."""
+
+# KEYS: lock key, waiters counter key
+# ARGV: lock id, lock timeout (in seconds)
+# => try to acquire the lock, if it's already taken, register as a waiter
+# (atomically, so we can't miss the wake-up of the unlock)
+# => return the lock owner id (ARGV[1] if we acquired the lock)
+TRY_LOCK_LUA_SCRIPT = """
+if redis.call("set",KEYS[1],ARGV[1],"EX",ARGV[2],"NX")
+then
+    return ARGV[1]
+end
+redis.call("incr",KEYS[2])
+redis.call("expire",KEYS[2],ARGV[2])
+return redis.call("get",KEYS[1])
+"""
+
+# KEYS: lock key, waiting list key, waiters counter key
+# ARGV: lock id, max number of woken waiters
+# => release the lock (if we own it) and wake up all registered waiters at once
+# (one token per waiter in the waiting list, the token is the released lock id
+# so waiters can ignore the tokens of another lock owner)
+UNLOCK_LUA_SCRIPT = """
+local res = 0
 if redis.call("get",KEYS[1]) == ARGV[1]
 then
-    return redis.call("del",KEYS[1])
-else
-    return 0
+    res = redis.call("del",KEYS[1])
 end
+local waiters = math.min(tonumber(redis.call("get",KEYS[3]) or "0"),tonumber(ARGV[2]))
+redis.call("del",KEYS[3])
+for _ = 1,waiters do
+    redis.call("rpush",KEYS[2],ARGV[1])
+end
+if waiters > 0 then
+    redis.call("expire",KEYS[2],3)
+end
+return res
 """
 
 
+def get_tag_key_prefix(namespace: str) -> str:
+    return f"rtc:{short_hash_memoized(namespace)}:t:"
+
+
 def get_tag_key(namespace: str, tag_name: str) -> str:
-    return f"rtc:{short_hash(namespace)}:t:{short_hash(tag_name)}"
+    return f"{get_tag_key_prefix(namespace)}{short_hash_memoized(tag_name)}"
 
 
 def get_lock_key(namespace: str, key: str, metadata_hash: str) -> str:
-    return f"rtc:{short_hash(namespace)}:l:{short_hash(key)}:{metadata_hash}"
+    return f"rtc:{short_hash_memoized(namespace)}:l:{short_hash(key)}:{metadata_hash}"
 
 
 def get_waiting_key(namespace: str, key: str, metadata_hash: str) -> str:
-    return f"rtc:{short_hash(namespace)}:w:{short_hash(key)}:{metadata_hash}"
+    return f"rtc:{short_hash_memoized(namespace)}:w:{short_hash(key)}:{metadata_hash}"
+
+
+def get_waiters_key(namespace: str, key: str, metadata_hash: str) -> str:
+    return f"rtc:{short_hash_memoized(namespace)}:n:{short_hash(key)}:{metadata_hash}"
 
 
 @dataclass
 class RedisMetadataAdapter(MetadataPort):
-    """Redis adapter for the metadata port."""
+    """Redis adapter for the metadata port.
+
+    If client_tracking is True, tag values are also kept in a local map
+    invalidated by Redis itself (server-assisted client-side caching with
+    `CLIENT TRACKING`, Redis >= 6 is required). See `RedisTagsTracker`.
+
+    If replica_router is set, tag values are read from replicas and invalidations
+    wait for their acknowledgment (see `RedisReplicaRouter`). Locks stay on the
+    primary.
+
+    Note: replica_router can't be used with client_tracking (an invalidation message
+    can be received before the replica is up-to-date).
+
+    """
 
     redis_kwargs: Dict[str, Any] = field(default_factory=dict)
+    client_tracking: bool = False
+    client_tracking_max_size: int = 100000
+    replica_router: Optional[RedisReplicaRouter] = None
     _redis_client: Optional[redis.Redis] = None
     _redis_client_lock: threading.Lock = field(default_factory=threading.Lock)
-    _redis_lock_del_cmd: Any = field(default=None, init=False, repr=False)
-    _redis_lock_del_cmd_lock: threading.Lock = field(default_factory=threading.Lock)
+    _redis_try_lock_cmd: Any = field(default=None, init=False, repr=False)
+    _redis_unlock_cmd: Any = field(default=None, init=False, repr=False)
+    _redis_scripts_lock: threading.Lock = field(default_factory=threading.Lock)
+    _tracker: Optional[RedisTagsTracker] = field(default=None, init=False)
+
+    def __post_init__(self):
+        if self.client_tracking and self.replica_router is not None:
+            raise ValueError("client tracking can't be used with replicas")
+        if self.client_tracking:
+            self._tracker = RedisTagsTracker(
+                redis_kwargs=self.redis_kwargs, max_size=self.client_tracking_max_size
+            )
+
+    @property
+    def tracker_stats(self) -> Optional[LocalCacheStats]:
+        """Statistics of the client tracking local map (None if not enabled)."""
+        if self._tracker is None:
+            return None
+        return self._tracker.stats
+
+    def close(self) -> None:
+        """Stop the client tracking background thread (if any)."""
+        if self._tracker is not None:
+            self._tracker.stop()
 
     @property
     def redis_client(self) -> redis.Redis:
@@ -49,20 +130,67 @@ class RedisMetadataAdapter(MetadataPort):
             return self._redis_client
 
     @property
-    def redis_lock_del_cmd(self) -> Any:
-        with self._redis_lock_del_cmd_lock:
-            if self._redis_lock_del_cmd is None:
-                self._redis_lock_del_cmd = self.redis_client.register_script(
-                    LOCK_LUA_SCRIPT
+    def redis_try_lock_cmd(self) -> Any:
+        with self._redis_scripts_lock:
+            if self._redis_try_lock_cmd is None:
+                self._redis_try_lock_cmd = self.redis_client.register_script(
+                    TRY_LOCK_LUA_SCRIPT
+                )
+            return self._redis_try_lock_cmd
+
+    @property
+    def redis_unlock_cmd(self) -> Any:
+        with self._redis_scripts_lock:
+            if self._redis_unlock_cmd is None:
+                self._redis_unlock_cmd = self.redis_client.register_script(
+                    UNLOCK_LUA_SCRIPT
                 )
-            return self._redis_lock_del_cmd
+            return self._redis_unlock_cmd
+
+    def _get_tag_key(self, namespace: str, tag_name: str) -> str:
+        return get_tag_key(namespace, tag_name)
+
+    def _get_lock_keys(
+        self, namespace: str, key: str, metadata_hash: str
+    ) -> Tuple[str, str, str]:
+        """Return the (lock key, waiting list key, waiters counter key) tuple."""
+        return (
+            get_lock_key(namespace, key, metadata_hash),
+            get_waiting_key(namespace, key, metadata_hash),
+            get_waiters_key(namespace, key, metadata_hash),
+        )
 
     def get_or_set_tag_values(
         self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
     ) -> Iterable[bytes]:
-        tag_keys = [get_tag_key(namespace, tag_name) for tag_name in tag_names]
+        tag_keys = get_tag_keys(namespace, tag_names, self._get_tag_key)
+        if self._tracker is None:
+            return self._get_or_set_tag_values(tag_keys, lifetime)
+        local_values, generation = self._tracker.get(
+            get_tag_key_prefix(namespace), tag_keys
+        )
+        missing_indexes = [i for i, value in enumerate(local_values) if value is None]
+        if not missing_indexes:
+            return local_values  # type: ignore
+        missing_tag_keys = [tag_keys[i] for i in missing_indexes]
+        missing_values = self._get_or_set_tag_values(missing_tag_keys, lifetime)
+        self._tracker.set(missing_tag_keys, missing_values, generation)
+        for i, value in zip(missing_indexes, missing_values):
+            local_values[i] = value
+        return local_values  # type: ignore
+
+    def _get_or_set_tag_values(
+        self, tag_keys: List[str], lifetime: Optional[int]
+    ) -> List[bytes]:
         try:
-            values: List[bytes] = self.redis_client.mget(tag_keys)  # type: ignore
+            values: List[bytes]
+            if self.replica_router is None:
+                values = self.redis_client.mget(tag_keys)  # type: ignore
+            else:
+                # (a tag missing on a lagging replica is set/read on the primary below)
+                values = self.replica_router.read(
+                    lambda client: client.mget(tag_keys), self.redis_client
+                )
         except Exception as e:
             raise MetadataCacheException(
                 f"Failed to get tag values from Redis: {e}"
@@ -74,11 +202,15 @@ class RedisMetadataAdapter(MetadataPort):
         ]
         if empty_tag_keys:
             try:
+                # NX + GET: if another client set the value in the meantime, we
+                # use its value (so all clients get the same metadata hash)
                 pipe = self.redis_client.pipeline()
-                for i, tag_key in empty_tag_keys:
-                    values[i] = get_random_bytes()
-                    pipe.set(tag_key, values[i], ex=lifetime)
-                pipe.execute()
+                for _, tag_key in empty_tag_keys:
+                    pipe.set(tag_key, get_random_bytes(), ex=lifetime or None, nx=True)
+                    pipe.get(tag_key)
+                results = pipe.execute()
+                for j, (i, _) in enumerate(empty_tag_keys):
+                    values[i] = results[2 * j + 1]
             except Exception as e:
                 raise MetadataCacheException(
                     f"Failed to set tag values in Redis: {e}"
@@ -88,19 +220,31 @@ class RedisMetadataAdapter(MetadataPort):
     def invalidate_tags(
         self, namespace: str, tag_names: Iterable[str], lifetime: Optional[int]
     ) -> None:
-        tag_keys = [get_tag_key(namespace, tag_name) for tag_name in tag_names]
+        tag_keys = [self._get_tag_key(namespace, tag_name) for tag_name in tag_names]
         try:
             pipe = self.redis_client.pipeline()
             for tag_key in tag_keys:
                 if lifetime:
-                    pipe.set(tag_key, get_random_bytes())
-                else:
                     pipe.set(tag_key, get_random_bytes(), ex=lifetime)
+                else:
+                    pipe.set(tag_key, get_random_bytes())
             pipe.execute()
+            if self.replica_router is not None:
+                # (out of the transaction, WAIT doesn't block in MULTI)
+                acks = self.redis_client.execute_command(
+                    "WAIT", *self.replica_router.wait_args()
+                )
+                if not self.replica_router.acknowledged(acks):
+                    raise MetadataCacheException(
+                        "invalidation not acknowledged by all replicas in time"
+                    )
         except Exception as e:
             raise MetadataCacheException(
                 f"Failed to set tag values in Redis: {e}"
             ) from e
+        if self._tracker is not None:
+            # don't wait for the invalidation message for our own writes
+            self._tracker.invalidate(key.encode("utf-8") for key in tag_keys)
 
     def lock(
         self,
@@ -111,20 +255,28 @@ class RedisMetadataAdapter(MetadataPort):
         waiting: int = 1,
     ) -> Optional[str]:
         lock_id = get_random_bytes().hex()
-        lock_storage_key = get_lock_key(namespace, key, metadata_hash)
-        lock_waiting_key = get_waiting_key(namespace, key, metadata_hash)
+        lock_storage_key, lock_waiting_key, lock_waiters_key = self._get_lock_keys(
+            namespace, key, metadata_hash
+        )
         before = time.perf_counter()
         while (time.perf_counter() - before) < waiting:
             try:
-                res = self.redis_client.set(
-                    lock_storage_key, lock_id, ex=timeout, nx=True
+                owner = self.redis_try_lock_cmd(
+                    keys=[lock_storage_key, lock_waiters_key], args=[lock_id, timeout]
                 )
-                if res is not None:
+                if isinstance(owner, bytes):
+                    owner = owner.decode("ascii")
+                if owner == lock_id:
                     # we have the lock
                     return lock_id
-                # lock is already taken
+                # lock is already taken (and we are registered as a waiter)
                 # => let's wait unlock() to be called (or up to 1s)
-                self.redis_client.blpop([lock_waiting_key], timeout=1)
+                popped = self.redis_client.blpop([lock_waiting_key], timeout=1)
+                if popped is not None and popped[1] in (owner, owner.encode("ascii")):
+                    # woken up by the owner unlock() => the value is probably
+                    # available => let the caller read it (instead of racing
+                    # for the lock)
+                    return None
             except Exception as e:
                 raise MetadataCacheException(
                     f"Failed to lock tag values in Redis: {e}"
@@ -134,18 +286,11 @@ class RedisMetadataAdapter(MetadataPort):
     def unlock(
         self, namespace: str, key: str, metadata_hash: str, lock_identifier: str
     ) -> None:
-        lock_storage_key = get_lock_key(namespace, key, metadata_hash)
-        lock_waiting_key = get_waiting_key(namespace, key, metadata_hash)
         try:
-            pipe = self.redis_client.pipeline(transaction=True)
-            self.redis_lock_del_cmd(
-                keys=[lock_storage_key],
-                args=[lock_identifier],
-                client=pipe,
+            self.redis_unlock_cmd(
+                keys=list(self._get_lock_keys(namespace, key, metadata_hash)),
+                args=[lock_identifier, MAX_WOKEN_WAITERS],
             )
-            pipe.rpush(lock_waiting_key, "x")
-            pipe.expire(lock_waiting_key, time=3)
-            pipe.execute()
         except Exception as e:
             raise MetadataCacheException(
                 f"Failed to unlock tag values in Redis: {e}"
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from rtc.app.exc import MetadataCacheException
+from rtc.app.hash import short_hash, short_hash_memoized
+from rtc.infra.adapters.metadata.redis import RedisMetadataAdapter
+
+REDIS_CLUSTER_AVAILABLE = False
+try:
+    from redis.cluster import RedisCluster
+
+    REDIS_CLUSTER_AVAILABLE = True
+except Exception:  # pragma: no cover
+    pass
+
+
+# note: only the part between the first {} (hash tag) is used to compute the slot
+
+
+def get_cluster_tag_key(namespace: str, tag_name: str) -> str:
+    # all tags of a namespace are in the same slot (for MGET and pipelines)
+    return f"rtc:{{{short_hash_memoized(namespace)}}}:t:{short_hash_memoized(tag_name)}"
+
+
+def get_cluster_lock_keys(
+    namespace: str, key: str, metadata_hash: str
+) -> Tuple[str, str, str]:
+    # lock keys of an entry are in the same slot (for Lua scripts)
+    # but different entries are spread over the cluster
+    hash_tag = f"{{{short_hash(key)}:{metadata_hash}}}"
+    prefix = f"rtc:{short_hash_memoized(namespace)}"
+    return (
+        f"{prefix}:l:{hash_tag}",
+        f"{prefix}:w:{hash_tag}",
+        f"{prefix}:n:{hash_tag}",
+    )
+
+
+@dataclass
+class RedisClusterMetadataAdapter(RedisMetadataAdapter):
+    """Redis Cluster adapter for the metadata port.
+
+    Tag keys of a namespace share the same hash tag (so they are in the same slot
+    and can be read with a single MGET), lock keys of an entry share another one
+    (so lock scripts can run).
+
+    redis_kwargs are given to `redis.cluster.RedisCluster` (redis>=4.1.0 is required).
+
+    Note: the key layout is not the same than RedisMetadataAdapter and the client
+    tracking is not supported.
+
+    """
+
+    _redis_client: Optional[Any] = None  # (RedisCluster object)
+
+    def __post_init__(self):
+        if self.client_tracking:
+            raise ValueError("client tracking is not supported with Redis Cluster")
+
+    @property
+    def redis_client(self) -> Any:
+        with self._redis_client_lock:
+            if self._redis_client is None:
+                if not REDIS_CLUSTER_AVAILABLE:
+                    raise MetadataCacheException(
+                        "redis.cluster is not available (redis>=4.1.0 is required)"
+                    )
+                self._redis_client = RedisCluster(**self.redis_kwargs)
+            return self._redis_client
+
+    def _get_tag_key(self, namespace: str, tag_name: str) -> str:
+        return get_cluster_tag_key(namespace, tag_name)
+
+    def _get_lock_keys(
+        self, namespace: str, key: str, metadata_hash: str
+    ) -> Tuple[str, str, str]:
+        return get_cluster_lock_keys(namespace, key, metadata_hash)
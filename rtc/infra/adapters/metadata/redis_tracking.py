@@ -0,0 +1,328 @@
+import inspect
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import redis
+
+from rtc.app.types import LocalCacheStats
+
+INVALIDATION_CHANNEL = b"__redis__:invalidate"
+
+# recent redis-py versions can default to RESP3 (our connections must use RESP2)
+PROTOCOL_SUPPORTED = "protocol" in inspect.signature(redis.Redis.__init__).parameters
+
+
+def get_logger() -> logging.Logger:
+    return logging.getLogger("rtc.infra.adapters.metadata.redis_tracking")
+
+
+@dataclass
+class RedisTagsTracker:
+    """Local map of tag values kept consistent with Redis server-assisted client-side caching.
+
+    Two dedicated connections are used:
+
+    - a "subscriber" connection subscribed to the `__redis__:invalidate` channel,
+    - a "tracking" connection with `CLIENT TRACKING ON REDIRECT <subscriber id> BCAST PREFIX <tag keys prefix>`
+      (one prefix per namespace, added on first use).
+
+    So Redis (>= 6) pushes an invalidation message to the subscriber connection each
+    time a tag key is modified (by any client). A background thread reads these
+    messages and removes the corresponding entries from the local map.
+
+    If something goes wrong (connection lost, health check failure, flush...), the
+    whole local map is dropped and the tracker is not "ready" until the connections
+    are successfully re-established (callers must fall back to Redis reads in the
+    meantime).
+
+    After a fork, the child process starts from an empty (not ready) local map and
+    re-establishes its own connections (and background thread) on first use (if
+    `os.register_at_fork()` is available): the parent thread doesn't exist in the
+    child, so copied tag values would never be invalidated.
+
+    Note: both connections use RESP2 (redirect mode) so this works whatever the
+    protocol of the main client is.
+
+    """
+
+    redis_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    max_size: int = 100000
+    """Maximum number of tag values in the local map (LRU eviction)."""
+
+    health_check_interval: float = 1.0
+    """Interval (in seconds) between two health checks of the tracking connections."""
+
+    logger: logging.Logger = field(default_factory=get_logger)
+
+    _values: "OrderedDict[bytes, bytes]" = field(
+        init=False, default_factory=OrderedDict
+    )  # tag_key => tag_value
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    # (serializes commands sent on the tracking connection, without self._lock
+    # for the health check)
+    _tracking_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _ready: bool = field(init=False, default=False)
+    _generation: int = field(init=False, default=0)
+    _prefixes: Set[str] = field(init=False, default_factory=set)
+    _subscriber_connection: Any = field(init=False, default=None)
+    _tracking_connection: Any = field(init=False, default=None)
+    _subscriber_id: Optional[int] = field(init=False, default=None)
+    _last_pong: float = field(init=False, default=0.0)
+    _thread: Optional[threading.Thread] = field(init=False, default=None)
+    _stopped: threading.Event = field(init=False, default_factory=threading.Event)
+    _hits: int = field(init=False, default=0)
+    _misses: int = field(init=False, default=0)
+    _evictions: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: _after_fork_in_child(ref))
+
+    def _after_fork_in_child(self) -> None:
+        # (locks can have been held by another thread of the parent and the
+        # parent thread doesn't exist in the child: let's rebuild everything,
+        # connections will be re-established by the next start())
+        self._lock = threading.Lock()
+        self._tracking_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._reset()
+
+    @property
+    def stats(self) -> LocalCacheStats:
+        with self._lock:
+            return LocalCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._values),
+            )
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def start(self) -> None:
+        """Start the background thread (if not already started)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and close the connections."""
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._thread = None
+            self._reset()
+
+    def _make_connection(self) -> Any:
+        # dedicated connection (never taken from a shared pool)
+        redis_kwargs = self.redis_kwargs
+        pool = redis_kwargs.get("connection_pool")
+        if pool is not None:
+            if not hasattr(pool, "redis_kwargs"):
+                # external pool (best effort: with its protocol)
+                connection = pool.connection_class(**pool.connection_kwargs)
+                connection.connect()
+                return connection
+            # pool made by make_connection_pool()
+            redis_kwargs = pool.redis_kwargs
+        kwargs = {k: v for k, v in redis_kwargs.items() if k != "protocol"}
+        if PROTOCOL_SUPPORTED:
+            kwargs["protocol"] = 2
+        connection = redis.Redis(**kwargs).connection_pool.make_connection()
+        connection.connect()
+        return connection
+
+    def _reset(self) -> None:
+        # must be called with self._lock acquired
+        self._ready = False
+        self._generation += 1
+        self._values.clear()
+        self._prefixes.clear()
+        for connection in (self._subscriber_connection, self._tracking_connection):
+            if connection is not None:
+                try:
+                    connection.disconnect()
+                except Exception:
+                    pass
+        self._subscriber_connection = None
+        self._tracking_connection = None
+        self._subscriber_id = None
+
+    def _connect(self) -> None:
+        subscriber_connection = self._make_connection()
+        subscriber_connection.send_command("CLIENT", "ID")
+        subscriber_id = int(subscriber_connection.read_response())
+        subscriber_connection.send_command("SUBSCRIBE", INVALIDATION_CHANNEL)
+        subscriber_connection.read_response()
+        tracking_connection = self._make_connection()
+        with self._lock:
+            self._reset()
+            self._subscriber_connection = subscriber_connection
+            self._tracking_connection = tracking_connection
+            self._subscriber_id = subscriber_id
+            self._last_pong = time.monotonic()
+            self._ready = True
+
+    def _health_check(self) -> None:
+        # (without self._lock: readers must not wait for a network round trip)
+        connection = self._tracking_connection
+        if connection is None:
+            raise ConnectionError("no tracking connection")
+        with self._tracking_lock:
+            if connection is not self._tracking_connection:
+                raise ConnectionError("tracking connection reset")
+            connection.send_command("PING")
+            connection.read_response()
+        if time.monotonic() - self._last_pong > 3 * self.health_check_interval:
+            raise ConnectionError("no pong received on the subscriber connection")
+        self._subscriber_connection.send_command("PING")
+
+    def _handle_message(self, message: Any) -> None:
+        # RESP2 messages on a subscribed connection: [b"pong", b""] or
+        # [b"message", channel, payload] (payload is None after a FLUSHALL/FLUSHDB)
+        if not isinstance(message, list) or not message:
+            return
+        if message[0] == b"pong":
+            self._last_pong = time.monotonic()
+        elif (
+            len(message) == 3
+            and message[0] == b"message"
+            and message[1] == INVALIDATION_CHANNEL
+        ):
+            self.invalidate(message[2])
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if not self._ready:
+                try:
+                    self._connect()
+                except Exception:
+                    self.logger.warning(
+                        "can't connect tracking connections => retrying in %s seconds",
+                        self.health_check_interval,
+                        exc_info=True,
+                    )
+                    self._stopped.wait(self.health_check_interval)
+                    continue
+            try:
+                connection = self._subscriber_connection
+                if connection.can_read(timeout=self.health_check_interval):
+                    self._handle_message(connection.read_response())
+                else:
+                    self._health_check()
+            except Exception:
+                if self._stopped.is_set():
+                    break
+                self.logger.warning(
+                    "error with tracking connections => local tag values dropped",
+                    exc_info=True,
+                )
+                with self._lock:
+                    self._reset()
+
+    def invalidate(self, tag_keys: Optional[Iterable[bytes]]) -> None:
+        """Remove the given tag keys from the local map (None means: all keys)."""
+        with self._lock:
+            self._generation += 1
+            if tag_keys is None:
+                self._values.clear()
+                return
+            for tag_key in tag_keys:
+                self._values.pop(tag_key, None)
+
+    def _track_prefix(self, prefix: str) -> bool:
+        # must be called with self._lock acquired
+        if prefix in self._prefixes:
+            return True
+        try:
+            with self._tracking_lock:
+                self._tracking_connection.send_command(
+                    "CLIENT",
+                    "TRACKING",
+                    "ON",
+                    "REDIRECT",
+                    self._subscriber_id,
+                    "BCAST",
+                    "PREFIX",
+                    prefix,
+                )
+                self._tracking_connection.read_response()
+        except Exception:
+            self.logger.warning(
+                "can't enable client tracking => local tag values dropped",
+                exc_info=True,
+            )
+            self._reset()
+            return False
+        self._prefixes.add(prefix)
+        return True
+
+    def get(
+        self, prefix: str, tag_keys: List[str]
+    ) -> Tuple[List[Optional[bytes]], Optional[int]]:
+        """Get the local values of the given tag keys (all starting with prefix).
+
+        Returns:
+            A (values, generation) tuple. Values are None for unknown keys. The
+            generation must be given back to set() after reading missing values
+            from Redis (None means that the values must not be stored).
+
+        """
+        self.start()
+        with self._lock:
+            if not self._ready or not self._track_prefix(prefix):
+                self._misses += len(tag_keys)
+                return [None] * len(tag_keys), None
+            values: List[Optional[bytes]] = []
+            for tag_key in tag_keys:
+                encoded = tag_key.encode("utf-8")
+                value = self._values.get(encoded)
+                if value is None:
+                    self._misses += 1
+                else:
+                    self._values.move_to_end(encoded)
+                    self._hits += 1
+                values.append(value)
+            return values, self._generation
+
+    def set(
+        self, tag_keys: List[str], values: List[bytes], generation: Optional[int]
+    ) -> None:
+        """Store the given values read from Redis.
+
+        Nothing is stored if an invalidation (or a reset) occurred since the
+        corresponding get() call.
+
+        """
+        with self._lock:
+            if generation is None or generation != self._generation:
+                return
+            for tag_key, value in zip(tag_keys, values):
+                encoded = tag_key.encode("utf-8")
+                self._values[encoded] = value
+                self._values.move_to_end(encoded)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+                self._evictions += 1
+
+
+def _after_fork_in_child(ref: "weakref.ref[RedisTagsTracker]") -> None:
+    tracker = ref()
+    if tracker is not None:
+        tracker._after_fork_in_child()
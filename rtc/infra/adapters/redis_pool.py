@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import redis
+
+from rtc.app.types import ConnectionPoolStats
+
+LOGGER = logging.getLogger("rtc.infra.adapters.redis_pool")
+
+
+class _PoolStatsMixin:
+    """Mixin for redis-py connection pools to collect usage statistics."""
+
+    _rtc_hook: Optional[Callable[[ConnectionPoolStats], None]] = None
+
+    def reset(self) -> None:
+        # note: reset() is called by the pool constructor (and after a fork)
+        super().reset()  # type: ignore
+        self._rtc_lock = threading.Lock()
+        self._rtc_created = 0
+        self._rtc_in_use = 0
+        self._rtc_checkouts = 0
+        self._rtc_total_wait_time = 0.0
+
+    def make_connection(self) -> Any:
+        connection = super().make_connection()  # type: ignore
+        with self._rtc_lock:
+            self._rtc_created += 1
+        return connection
+
+    def get_connection(self, *args, **kwargs) -> Any:
+        before = time.perf_counter()
+        connection = super().get_connection(*args, **kwargs)  # type: ignore
+        wait_time = time.perf_counter() - before
+        with self._rtc_lock:
+            self._rtc_in_use += 1
+            self._rtc_checkouts += 1
+            self._rtc_total_wait_time += wait_time
+        if self._rtc_hook is not None:
+            try:
+                self._rtc_hook(self.get_stats(wait_time))
+            except Exception:
+                LOGGER.warning(
+                    "error while calling the connection pool hook", exc_info=True
+                )
+        return connection
+
+    def release(self, connection: Any) -> None:
+        super().release(connection)  # type: ignore
+        with self._rtc_lock:
+            # (connections created before a fork are ignored by the pool)
+            self._rtc_in_use = max(0, self._rtc_in_use - 1)
+
+    def get_stats(self, wait_time: float = 0.0) -> ConnectionPoolStats:
+        with self._rtc_lock:
+            return ConnectionPoolStats(
+                max_connections=self.max_connections,  # type: ignore
+                created_connections=self._rtc_created,
+                in_use_connections=self._rtc_in_use,
+                idle_connections=max(0, self._rtc_created - self._rtc_in_use),
+                checkouts=self._rtc_checkouts,
+                total_wait_time=self._rtc_total_wait_time,
+                wait_time=wait_time,
+            )
+
+
+class InstrumentedConnectionPool(_PoolStatsMixin, redis.ConnectionPool):
+    """redis-py connection pool with usage statistics."""
+
+
+class InstrumentedBlockingConnectionPool(_PoolStatsMixin, redis.BlockingConnectionPool):
+    """redis-py blocking connection pool (waits for a free connection) with usage statistics."""
+
+
+def make_connection_pool(
+    redis_kwargs: Dict[str, Any],
+    max_connections: Optional[int] = None,
+    blocking_timeout: Optional[float] = None,
+    hook: Optional[Callable[[ConnectionPoolStats], None]] = None,
+) -> redis.ConnectionPool:
+    """Make an instrumented connection pool from redis.Redis() keyword arguments.
+
+    If blocking_timeout is set, the pool blocks (up to blocking_timeout seconds) when
+    max_connections are already in use (instead of raising a ConnectionError).
+
+    The pool can be shared by several adapters with `{"connection_pool": pool}`
+    as redis_kwargs. The given redis_kwargs are kept in the `redis_kwargs` attribute
+    of the pool (to make dedicated connections, see `RedisTagsTracker`).
+
+    """
+    # let redis-py resolve the connection class and arguments (unix socket, ssl,
+    # defaults...) as it does for its own pools
+    template = redis.Redis(**redis_kwargs).connection_pool
+    pool: Any
+    if blocking_timeout is not None:
+        pool = InstrumentedBlockingConnectionPool(
+            max_connections=max_connections or 50,
+            timeout=blocking_timeout,
+            connection_class=template.connection_class,
+            **template.connection_kwargs,
+        )
+    else:
+        pool = InstrumentedConnectionPool(
+            connection_class=template.connection_class,
+            max_connections=max_connections,
+            **template.connection_kwargs,
+        )
+    pool._rtc_hook = hook
+    pool.redis_kwargs = dict(redis_kwargs)
+    return pool
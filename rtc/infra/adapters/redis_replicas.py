@@ -0,0 +1,180 @@
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+
+LOGGER = logging.getLogger("rtc.infra.adapters.redis_replicas")
+
+REPLICA_STRATEGIES = ("round_robin", "least_latency")
+
+LATENCY_SMOOTHING = 0.3
+"""Weight of the last measure in the (exponentially smoothed) latency of a replica."""
+
+
+@dataclass
+class _Replica:
+    name: str  # (for logs)
+    client: redis.Redis
+    healthy: bool = False
+    latency: float = 0.0  # smoothed, in seconds
+
+
+@dataclass
+class RedisReplicaRouter:
+    """Route reads to Redis replicas (writes, invalidations and locks stay on the primary).
+
+    As storage keys embed the metadata hash (computed from up-to-date tag values), a
+    replica which lags behind can only miss a value: it can't return a value for
+    another version of the tags. To make sure that deletes, overwrites and (if tag
+    values are also read from replicas) invalidations are never seen late:
+
+    - every write on the primary is followed by a `WAIT` for all replicas (see
+    `wait_args()` and `acknowledged()`), the write is reported as failed if all
+    replicas did not acknowledge it in time,
+    - a replica is used only if its last check (every `check_interval` seconds) was
+    successful: link with the primary up and replication offset not behind the
+    primary one (read just before).
+
+    Reads on a replica which fail are retried on the primary (and the replica is not
+    used anymore until its next successful check).
+
+    Warning: the health state is local to the process. When a `WAIT` times out, only
+    the process which did the write stops using the lagging replicas: other processes
+    keep reading from them until their next check (up to `check_interval` seconds),
+    so they can see the write late during this window. For storage reads, it can only
+    be a stale miss or a value deleted/overwritten on the primary. For tag reads (see
+    `read_replicas_for_tags`), an invalidation can be missed, which means stale hits.
+
+    Note: all replicas of the primary must be given (as `WAIT` counts acknowledgments
+    of any replica).
+
+    """
+
+    redis_kwargs: Dict[str, Any]
+    """redis.Redis() keyword arguments for the primary."""
+
+    replicas_redis_kwargs: List[Dict[str, Any]]
+    """redis.Redis() keyword arguments for each replica."""
+
+    strategy: str = "round_robin"
+    """Replica selection strategy: round_robin or least_latency."""
+
+    check_interval: float = 1.0
+    """Interval (in seconds) between two checks of the replicas."""
+
+    wait_timeout: int = 100
+    """Maximum time (in milliseconds) to wait for replicas acknowledgment of a write."""
+
+    _primary_client: Optional[redis.Redis] = field(default=None, init=False)
+    _replicas: List[_Replica] = field(default_factory=list, init=False)
+    _counter: Any = field(default_factory=itertools.count, init=False)
+    _next_check: float = field(default=0.0, init=False)
+    _check_lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        if self.strategy not in REPLICA_STRATEGIES:
+            raise ValueError(
+                f"unknown replica strategy: {self.strategy} "
+                f"(must be one of {', '.join(REPLICA_STRATEGIES)})"
+            )
+        if not self.replicas_redis_kwargs:
+            raise ValueError("at least one replica is required")
+        self._primary_client = redis.Redis(**self.redis_kwargs)
+        self._replicas = [
+            _Replica(
+                name=f"{kwargs.get('host')}:{kwargs.get('port')}",
+                client=redis.Redis(**kwargs),
+            )
+            for kwargs in self.replicas_redis_kwargs
+        ]
+
+    def get_client(self) -> Optional[redis.Redis]:
+        """Return the replica client to use for the next read (None means: use the primary)."""
+        self._maybe_check()
+        healthy = [replica for replica in self._replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.strategy == "least_latency":
+            return min(healthy, key=lambda replica: replica.latency).client
+        return healthy[next(self._counter) % len(healthy)].client
+
+    def mark_failed(self, client: redis.Redis) -> None:
+        """Don't use the given replica client anymore (until its next successful check)."""
+        for replica in self._replicas:
+            if replica.client is client:
+                replica.healthy = False
+
+    def read(self, func: Callable[[redis.Redis], Any], primary: redis.Redis) -> Any:
+        """Call func with a replica client (or with the primary one if it fails)."""
+        client = self.get_client()
+        if client is not None:
+            try:
+                return func(client)
+            except Exception:
+                LOGGER.warning("read failed on a replica", exc_info=True)
+                self.mark_failed(client)
+        return func(primary)
+
+    def wait_args(self) -> List[int]:
+        """Return the `WAIT` command arguments to add after writes on the primary."""
+        return [len(self._replicas), self.wait_timeout]
+
+    def acknowledged(self, acks: int) -> bool:
+        """Return True if the given `WAIT` result covers all replicas.
+
+        If not, replicas are not used anymore until their next successful check.
+
+        """
+        if acks >= len(self._replicas):
+            return True
+        for replica in self._replicas:
+            replica.healthy = False
+        return False
+
+    def _maybe_check(self) -> None:
+        if time.monotonic() < self._next_check:
+            return
+        if not self._check_lock.acquire(blocking=False):
+            # another thread is checking (we use the previous state)
+            return
+        try:
+            self._check()
+        finally:
+            self._next_check = time.monotonic() + self.check_interval
+            self._check_lock.release()
+
+    def _check(self) -> None:
+        assert self._primary_client is not None
+        try:
+            infos = self._primary_client.info("replication")
+            primary_offset = int(infos.get("master_repl_offset", 0))
+        except Exception:
+            LOGGER.warning("can't get the replication offset of the primary")
+            for replica in self._replicas:
+                replica.healthy = False
+            return
+        for replica in self._replicas:
+            before = time.perf_counter()
+            try:
+                infos = replica.client.info("replication")
+            except Exception:
+                LOGGER.warning("can't check the replica: %s", replica.name)
+                replica.healthy = False
+                continue
+            latency = time.perf_counter() - before
+            if replica.latency == 0.0:
+                replica.latency = latency
+            else:
+                replica.latency = (
+                    LATENCY_SMOOTHING * latency
+                    + (1.0 - LATENCY_SMOOTHING) * replica.latency
+                )
+            replica.healthy = (
+                infos.get("role") == "slave"
+                and infos.get("master_link_status") == "up"
+                and int(infos.get("slave_repl_offset", -1)) >= primary_offset
+            )
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from rtc.app.storage import AsyncStoragePort
+
+
+@dataclass
+class AsyncBlackHoleStorageAdapter(AsyncStoragePort):
+    """Async blackHole storage adapter that stores nothing.
+
+    Note: used when disabled=True in the async controller.
+
+    """
+
+    async def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        pass
+
+    async def get(
+        self, namespace: str, key: str, metadata_hash: str
+    ) -> Optional[bytes]:
+        return None
+
+    async def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        return False
@@ -0,0 +1,29 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from rtc.app.storage import AsyncStoragePort
+from rtc.infra.adapters.storage.dict import DictStorageAdapter
+
+
+@dataclass
+class AsyncDictStorageAdapter(AsyncStoragePort):
+    """Async version of DictStorageAdapter (for unit-testing).
+
+    As everything is in local memory, the sync adapter is called directly.
+
+    """
+
+    adapter: DictStorageAdapter = field(default_factory=DictStorageAdapter)
+
+    async def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        return self.adapter.set(namespace, key, metadata_hash, value, lifetime)
+
+    async def get(
+        self, namespace: str, key: str, metadata_hash: str
+    ) -> Optional[bytes]:
+        return self.adapter.get(namespace, key, metadata_hash)
+
+    async def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        return self.adapter.delete(namespace, key, metadata_hash)
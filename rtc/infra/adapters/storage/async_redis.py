@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from rtc.app.exc import StorageCacheException
+from rtc.app.storage import AsyncStoragePort
+from rtc.infra.adapters.storage.redis import get_storage_key
+
+ASYNC_REDIS_AVAILABLE = False
+try:
+    import redis.asyncio as aioredis
+
+    ASYNC_REDIS_AVAILABLE = True
+except Exception:  # pragma: no cover
+    pass
+
+
+@dataclass
+class AsyncRedisStorageAdapter(AsyncStoragePort):
+    """Async Redis adapter (based on redis.asyncio) for the async storage port.
+
+    Note: the key layout is the same than RedisStorageAdapter.
+
+    """
+
+    redis_kwargs: Dict[str, Any] = field(default_factory=dict)
+    _redis_client: Optional[Any] = None
+
+    @property
+    def redis_client(self) -> "aioredis.Redis":
+        if self._redis_client is None:
+            if not ASYNC_REDIS_AVAILABLE:
+                raise StorageCacheException(
+                    "redis.asyncio is not available (redis>=4.2.0 is required)"
+                )
+            self._redis_client = aioredis.Redis(**self.redis_kwargs)
+        return self._redis_client
+
+    async def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        storage_key = get_storage_key(namespace, key, metadata_hash)
+        try:
+            if lifetime:
+                await self.redis_client.set(storage_key, value, ex=lifetime)
+            else:
+                await self.redis_client.set(storage_key, value)
+        except Exception as e:
+            raise StorageCacheException(f"Failed to set value in Redis: {e}") from e
+
+    async def get(
+        self, namespace: str, key: str, metadata_hash: str
+    ) -> Optional[bytes]:
+        storage_key = get_storage_key(namespace, key, metadata_hash)
+        try:
+            return await self.redis_client.get(storage_key)  # type: ignore
+        except Exception as e:
+            raise StorageCacheException(f"Failed to get value from Redis: {e}") from e
+
+    async def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        storage_key = get_storage_key(namespace, key, metadata_hash)
+        try:
+            deleted = await self.redis_client.delete(storage_key)
+            return deleted > 0
+        except Exception as e:
+            raise StorageCacheException(
+                f"Failed to delete value from Redis: {e}"
+            ) from e
+
+    async def aclose(self) -> None:
+        """Close the underlying Redis connections (if any)."""
+        if self._redis_client is not None:
+            # aclose() is only available with redis>=5.0.1
+            close = getattr(self._redis_client, "aclose", self._redis_client.close)
+            await close()
+            self._redis_client = None
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
 from rtc.app.exc import StorageCacheException
 from rtc.infra.adapters.storage.blackhole import BlackHoleStorageAdapter
@@ -33,3 +33,25 @@ class BadStorageAdapter(BlackHoleStorageAdapter):
         if self.fail:
             raise StorageCacheException("Bad storage adapter")
         return super().delete(namespace, key, metadata_hash)
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        if self.fail:
+            raise StorageCacheException("Bad storage adapter")
+        return super().set_many(namespace, items, lifetime)
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        if self.fail:
+            raise StorageCacheException("Bad storage adapter")
+        return super().get_many(namespace, keys)
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        if self.fail:
+            raise StorageCacheException("Bad storage adapter")
+        return super().delete_many(namespace, keys)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
 from rtc.app.storage import StoragePort
 
@@ -22,3 +22,19 @@ class BlackHoleStorageAdapter(StoragePort):
 
     def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
         return False
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        pass
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        return [None for _ in keys]
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        return 0
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from rtc.app.storage import StoragePort
+from rtc.app.types import LocalCacheStats
+
+
+@dataclass
+class CachedStorageAdapter(StoragePort):
+    """Storage adapter that caches values of another adapter in process memory (L1).
+
+    As storage keys embed the metadata hash, a stored value is not supposed to
+    change (it can only disappear: expiration, eviction, explicit delete...). So
+    values read from (or written to) the wrapped adapter are kept in process
+    memory (at most ttl seconds) and served without any round trip.
+
+    Values are never kept longer than their remaining lifetime in the wrapped
+    adapter (when it's known, see `StoragePort.get_many_with_lifetime()`).
+
+    Writes and deletes made through this adapter are seen immediately by this
+    process. A delete (or an overwrite of the same key with the same tags) made by
+    another process can be seen up to ttl seconds later.
+
+    The cache is bounded by max_entries and max_bytes (LRU eviction). Values bigger
+    than max_bytes are never cached.
+
+    """
+
+    adapter: StoragePort
+    max_bytes: int = 64 * 1024 * 1024
+    """Maximum size (sum of values lengths, in bytes) of cached values."""
+
+    max_entries: int = 10000
+    """Maximum number of cached values."""
+
+    ttl: float = 60.0
+    """Maximum time (in seconds) a value is kept in process memory."""
+
+    _entries: "OrderedDict[Tuple[str, str, str], Tuple[bytes, float]]" = field(
+        init=False, default_factory=OrderedDict
+    )  # (namespace, key, metadata_hash) -> (value, expiration)
+    _size_in_bytes: int = field(init=False, default=0)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _hits: int = field(init=False, default=0)
+    _misses: int = field(init=False, default=0)
+    _evictions: int = field(init=False, default=0)
+
+    @property
+    def stats(self) -> LocalCacheStats:
+        with self._lock:
+            return LocalCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_in_bytes=self._size_in_bytes,
+            )
+
+    def _pop(self, cache_key: Tuple[str, str, str]) -> None:
+        # must be called with self._lock acquired
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._size_in_bytes -= len(entry[0])
+
+    def _set(
+        self, cache_key: Tuple[str, str, str], value: bytes, lifetime: float
+    ) -> None:
+        # must be called with self._lock acquired
+        self._pop(cache_key)
+        if len(value) > self.max_bytes:
+            return
+        ttl = min(self.ttl, lifetime) if lifetime > 0 else self.ttl
+        self._entries[cache_key] = (value, time.monotonic() + ttl)
+        self._size_in_bytes += len(value)
+        while (
+            len(self._entries) > self.max_entries
+            or self._size_in_bytes > self.max_bytes
+        ):
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._size_in_bytes -= len(evicted)
+            self._evictions += 1
+
+    def _get(self, cache_key: Tuple[str, str, str], now: float) -> Optional[bytes]:
+        # must be called with self._lock acquired
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if now > entry[1]:
+            self._pop(cache_key)
+            self._misses += 1
+            return None
+        self._entries.move_to_end(cache_key)
+        self._hits += 1
+        return entry[0]
+
+    def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        with self._lock:
+            self._pop((namespace, key, metadata_hash))
+        self.adapter.set(namespace, key, metadata_hash, value, lifetime)
+        with self._lock:
+            self._set((namespace, key, metadata_hash), value, lifetime)
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        items = list(items)
+        with self._lock:
+            for key, metadata_hash, _ in items:
+                self._pop((namespace, key, metadata_hash))
+        self.adapter.set_many(namespace, items, lifetime)
+        with self._lock:
+            for key, metadata_hash, value in items:
+                self._set((namespace, key, metadata_hash), value, lifetime)
+
+    def get(self, namespace: str, key: str, metadata_hash: str) -> Optional[bytes]:
+        cache_key = (namespace, key, metadata_hash)
+        with self._lock:
+            value = self._get(cache_key, time.monotonic())
+        if value is not None:
+            return value
+        ((value, lifetime),) = self.adapter.get_many_with_lifetime(
+            namespace, [(key, metadata_hash)]
+        )
+        if value is not None:
+            with self._lock:
+                # (not longer than its remaining lifetime in the wrapped adapter)
+                self._set(cache_key, value, lifetime or 0.0)
+        return value
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        keys = list(keys)
+        now = time.monotonic()
+        with self._lock:
+            values = [
+                self._get((namespace, key, metadata_hash), now)
+                for key, metadata_hash in keys
+            ]
+        missing_indexes = [i for i, value in enumerate(values) if value is None]
+        if missing_indexes:
+            fetched_values = self.adapter.get_many_with_lifetime(
+                namespace, [keys[i] for i in missing_indexes]
+            )
+            with self._lock:
+                for i, (value, lifetime) in zip(missing_indexes, fetched_values):
+                    if value is not None:
+                        key, metadata_hash = keys[i]
+                        values[i] = value
+                        self._set(
+                            (namespace, key, metadata_hash), value, lifetime or 0.0
+                        )
+        return values
+
+    def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        with self._lock:
+            self._pop((namespace, key, metadata_hash))
+        res = self.adapter.delete(namespace, key, metadata_hash)
+        with self._lock:
+            # in case of a concurrent read during the delete
+            self._pop((namespace, key, metadata_hash))
+        return res
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        keys = list(keys)
+        with self._lock:
+            for key, metadata_hash in keys:
+                self._pop((namespace, key, metadata_hash))
+        res = self.adapter.delete_many(namespace, keys)
+        with self._lock:
+            # in case of a concurrent read during the delete
+            for key, metadata_hash in keys:
+                self._pop((namespace, key, metadata_hash))
+        return res
@@ -1,66 +1,243 @@
 import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Tuple
-
-import wrapt
+from typing import Iterable, List, Optional, Tuple
 
 from rtc.app.storage import StoragePort
+from rtc.app.types import LocalCacheStats
+from rtc.infra.adapters.sweeper import get_shared_sweeper
 
+StorageKey = Tuple[str, str, str]  # (namespace, key, metadata_hash)
 
-@wrapt.decorator
-def locked(wrapped, instance, args, kwargs):
-    with instance._internal_lock:
-        return wrapped(*args, **kwargs)
 
+class _Shard:
+    """A part of the stored values (with its own lock and LRU order)."""
 
-@dataclass
-class Item:
-    value: bytes
-    lifetime: int
-    _expiration: float = field(default=0.0)
+    __slots__ = (
+        "entries",
+        "evictions",
+        "expired",
+        "hits",
+        "lock",
+        "max_bytes",
+        "max_entries",
+        "misses",
+        "size_in_bytes",
+    )
 
-    def __post_init__(self):
-        if self.lifetime > 0:
-            self._expiration = time.perf_counter() + self.lifetime
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[StorageKey, Tuple[bytes, float]] = OrderedDict()
+        # (value, expiration: monotonic time, 0.0 means no expiration)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
 
-    @property
-    def is_expired(self) -> bool:
-        if self._expiration < 0.1:
+    def pop(self, storage_key: StorageKey) -> bool:
+        # must be called with self.lock acquired
+        entry = self.entries.pop(storage_key, None)
+        if entry is None:
             return False
-        return time.perf_counter() > self._expiration
+        self.size_in_bytes -= len(entry[0])
+        return True
+
+    def set(self, storage_key: StorageKey, value: bytes, expiration: float) -> None:
+        # must be called with self.lock acquired
+        self.pop(storage_key)
+        if self.max_bytes > 0 and len(value) > self.max_bytes:
+            return
+        self.entries[storage_key] = (value, expiration)
+        self.size_in_bytes += len(value)
+        while (self.max_entries > 0 and len(self.entries) > self.max_entries) or (
+            self.max_bytes > 0 and self.size_in_bytes > self.max_bytes
+        ):
+            _, (evicted, _) = self.entries.popitem(last=False)
+            self.size_in_bytes -= len(evicted)
+            self.evictions += 1
+
+    def get(self, storage_key: StorageKey, now: float) -> Optional[bytes]:
+        # must be called with self.lock acquired
+        entry = self.entries.get(storage_key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if 0.0 < entry[1] < now:
+            self.pop(storage_key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(storage_key)
+        self.hits += 1
+        return entry[0]
+
+    def get_with_lifetime(
+        self, storage_key: StorageKey, now: float
+    ) -> Tuple[Optional[bytes], Optional[float]]:
+        # must be called with self.lock acquired
+        value = self.get(storage_key, now)
+        if value is None:
+            return None, None
+        expiration = self.entries[storage_key][1]
+        return value, expiration - now if expiration > 0.0 else 0.0
+
+    def sweep(self, now: float) -> None:
+        # must be called with self.lock acquired
+        expired_keys = [
+            storage_key
+            for storage_key, (_, expiration) in self.entries.items()
+            if 0.0 < expiration < now
+        ]
+        for storage_key in expired_keys:
+            self.pop(storage_key)
+        self.expired += len(expired_keys)
 
 
 @dataclass
 class DictStorageAdapter(StoragePort):
-    _data: Dict[Tuple[str, str, str], Item] = field(
-        default_factory=dict
-    )  # (namespace, key, metadata_hash) -> value
-    _internal_lock: threading.Lock = field(default_factory=threading.Lock)
+    """Storage adapter that keeps values in process memory (bounded, LRU eviction).
+
+    Values are split into shards (with their own lock) to limit lock contention
+    between threads. Each shard gets an equal part of max_entries and max_bytes
+    (so the LRU eviction is done per shard and values bigger than
+    `max_bytes / shards` are never stored).
+
+    Expired values are removed when they are read and by the shared sweeper
+    thread (one shard at each sweep, see `rtc.infra.adapters.sweeper`). Values
+    which are never read again (for example after an invalidation of their tags)
+    are removed when they expire or by the LRU eviction.
+
+    """
+
+    max_entries: int = 100000
+    """Maximum number of stored values (0 means: no limit)."""
+
+    max_bytes: int = 256 * 1024 * 1024
+    """Maximum size (sum of values lengths, in bytes) of stored values (0 means: no limit)."""
+
+    shards: int = 16
+    """Number of shards (each one with its own lock)."""
+
+    expiry_sweep: bool = True
+    """If True, expired values are removed in background (by the shared sweeper)."""
+
+    _shards: List[_Shard] = field(init=False, default_factory=list)
+    _sweep_index: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        if self.shards < 1:
+            raise ValueError("shards must be >= 1")
+        self._shards = [
+            _Shard(
+                max_entries=-(-self.max_entries // self.shards),
+                max_bytes=-(-self.max_bytes // self.shards),
+            )
+            for _ in range(self.shards)
+        ]
+        if self.expiry_sweep:
+            get_shared_sweeper().register(self)
+
+    def _get_shard(self, storage_key: StorageKey) -> _Shard:
+        return self._shards[hash(storage_key) % self.shards]
+
+    @property
+    def stats(self) -> LocalCacheStats:
+        hits = misses = evictions = expired = entries = size_in_bytes = 0
+        for shard in self._shards:
+            with shard.lock:
+                hits += shard.hits
+                misses += shard.misses
+                evictions += shard.evictions
+                expired += shard.expired
+                entries += len(shard.entries)
+                size_in_bytes += shard.size_in_bytes
+        return LocalCacheStats(
+            hits=hits,
+            misses=misses,
+            evictions=evictions,
+            expired=expired,
+            entries=entries,
+            size_in_bytes=size_in_bytes,
+        )
+
+    def sweep(self) -> None:
+        """Remove expired values of the next shard (called by the shared sweeper)."""
+        shard = self._shards[self._sweep_index % self.shards]
+        self._sweep_index += 1
+        now = time.monotonic()
+        with shard.lock:
+            shard.sweep(now)
+
+    def close(self) -> None:
+        """Stop the background expiry sweep of this adapter."""
+        get_shared_sweeper().unregister(self)
 
-    @locked
     def set(
         self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
     ) -> None:
-        self._data[(namespace, key, metadata_hash)] = Item(value, lifetime)
+        storage_key = (namespace, key, metadata_hash)
+        expiration = time.monotonic() + lifetime if lifetime > 0 else 0.0
+        shard = self._get_shard(storage_key)
+        with shard.lock:
+            shard.set(storage_key, value, expiration)
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        expiration = time.monotonic() + lifetime if lifetime > 0 else 0.0
+        for key, metadata_hash, value in items:
+            storage_key = (namespace, key, metadata_hash)
+            shard = self._get_shard(storage_key)
+            with shard.lock:
+                shard.set(storage_key, value, expiration)
 
-    @locked
     def get(self, namespace: str, key: str, metadata_hash: str) -> Optional[bytes]:
-        item = self._data.get((namespace, key, metadata_hash))
-        if item is None:
-            return None
-        if item.is_expired:
-            self._delete(namespace, key, metadata_hash)
-            return None
-        return item.value
+        storage_key = (namespace, key, metadata_hash)
+        shard = self._get_shard(storage_key)
+        now = time.monotonic()
+        with shard.lock:
+            return shard.get(storage_key, now)
 
-    def _delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
-        try:
-            self._data.pop((namespace, key, metadata_hash))
-            return True
-        except KeyError:
-            return False
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        res: List[Optional[bytes]] = []
+        for key, metadata_hash in keys:
+            storage_key = (namespace, key, metadata_hash)
+            shard = self._get_shard(storage_key)
+            with shard.lock:
+                res.append(shard.get(storage_key, now))
+        return res
+
+    def get_many_with_lifetime(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        now = time.monotonic()
+        res: List[Tuple[Optional[bytes], Optional[float]]] = []
+        for key, metadata_hash in keys:
+            storage_key = (namespace, key, metadata_hash)
+            shard = self._get_shard(storage_key)
+            with shard.lock:
+                res.append(shard.get_with_lifetime(storage_key, now))
+        return res
 
-    @locked
     def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
-        return self._delete(namespace, key, metadata_hash)
+        storage_key = (namespace, key, metadata_hash)
+        shard = self._get_shard(storage_key)
+        with shard.lock:
+            return shard.pop(storage_key)
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        return sum(
+            1
+            for key, metadata_hash in keys
+            if self.delete(namespace, key, metadata_hash)
+        )
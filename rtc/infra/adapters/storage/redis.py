@@ -1,23 +1,34 @@
 import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import redis
 
 from rtc.app.exc import StorageCacheException
-from rtc.app.hash import short_hash
+from rtc.app.hash import short_hash, short_hash_memoized
 from rtc.app.storage import StoragePort
+from rtc.infra.adapters.redis_replicas import RedisReplicaRouter
+
+
+def get_storage_key_prefix(namespace: str, key: str) -> str:
+    return f"rtc:{short_hash_memoized(namespace)}:s:{short_hash(key)}:"
 
 
 def get_storage_key(namespace: str, key: str, metadata_hash: str) -> str:
-    return f"rtc:{short_hash(namespace)}:s:{short_hash(key)}:{metadata_hash}"
+    return f"{get_storage_key_prefix(namespace, key)}{metadata_hash}"
 
 
 @dataclass
 class RedisStorageAdapter(StoragePort):
-    """Redis adapter for the storage port."""
+    """Redis adapter for the storage port.
+
+    If replica_router is set, reads are routed to replicas and writes wait for
+    their acknowledgment (see `RedisReplicaRouter`).
+
+    """
 
     redis_kwargs: Dict[str, Any] = field(default_factory=dict)
+    replica_router: Optional[RedisReplicaRouter] = None
     _redis_client: Optional[redis.Redis] = None
     _lock: threading.Lock = field(default_factory=threading.Lock)
 
@@ -28,12 +39,37 @@ class RedisStorageAdapter(StoragePort):
                 self._redis_client = redis.Redis(**self.redis_kwargs)
             return self._redis_client
 
+    def _read(self, func: Callable[[redis.Redis], Any]) -> Any:
+        """Call func with a replica client (if any) or with the primary one."""
+        if self.replica_router is None:
+            return func(self.redis_client)
+        return self.replica_router.read(func, self.redis_client)
+
+    def _execute_write(self, pipe: Any) -> List[Any]:
+        """Execute the given write pipeline (and wait for replicas if needed)."""
+        if self.replica_router is None:
+            return pipe.execute()
+        pipe.execute_command("WAIT", *self.replica_router.wait_args())
+        results = pipe.execute()
+        if not self.replica_router.acknowledged(results[-1]):
+            raise StorageCacheException(
+                "write not acknowledged by all replicas in time"
+            )
+        return results[:-1]
+
+    def _mget(self, storage_keys: List[str]) -> List[Optional[bytes]]:
+        return self._read(lambda client: client.mget(storage_keys))
+
     def set(
         self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
     ) -> None:
         storage_key = get_storage_key(namespace, key, metadata_hash)
         try:
-            if lifetime:
+            if self.replica_router is not None:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.set(storage_key, value, ex=lifetime or None)
+                self._execute_write(pipe)
+            elif lifetime:
                 self.redis_client.set(storage_key, value, ex=lifetime)
             else:
                 self.redis_client.set(storage_key, value)
@@ -43,16 +79,101 @@ class RedisStorageAdapter(StoragePort):
     def get(self, namespace: str, key: str, metadata_hash: str) -> Optional[bytes]:
         storage_key = get_storage_key(namespace, key, metadata_hash)
         try:
-            return self.redis_client.get(storage_key)  # type: ignore
+            return self._read(lambda client: client.get(storage_key))
         except Exception as e:
             raise StorageCacheException(f"Failed to get value from Redis: {e}") from e
 
     def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
         storage_key = get_storage_key(namespace, key, metadata_hash)
         try:
-            deleted = self.redis_client.delete(storage_key)
+            if self.replica_router is None:
+                deleted = self.redis_client.delete(storage_key)
+            else:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.delete(storage_key)
+                deleted = self._execute_write(pipe)[0]
             return deleted > 0  # type: ignore
         except Exception as e:
             raise StorageCacheException(
                 f"Failed to delete value from Redis: {e}"
             ) from e
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, metadata_hash, value in items:
+                storage_key = get_storage_key(namespace, key, metadata_hash)
+                if lifetime:
+                    pipe.set(storage_key, value, ex=lifetime)
+                else:
+                    pipe.set(storage_key, value)
+            self._execute_write(pipe)
+        except Exception as e:
+            raise StorageCacheException(f"Failed to set values in Redis: {e}") from e
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        storage_keys = [
+            get_storage_key(namespace, key, metadata_hash)
+            for key, metadata_hash in keys
+        ]
+        if not storage_keys:
+            return []
+        try:
+            return self._mget(storage_keys)
+        except Exception as e:
+            raise StorageCacheException(f"Failed to get values from Redis: {e}") from e
+
+    def get_many_with_lifetime(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        storage_keys = [
+            get_storage_key(namespace, key, metadata_hash)
+            for key, metadata_hash in keys
+        ]
+        if not storage_keys:
+            return []
+
+        def _get_with_pttl(client: Any) -> List[Any]:
+            pipe = client.pipeline(transaction=False)
+            for storage_key in storage_keys:
+                pipe.get(storage_key)
+                pipe.pttl(storage_key)
+            return pipe.execute()
+
+        try:
+            results = self._read(_get_with_pttl)
+        except Exception as e:
+            raise StorageCacheException(f"Failed to get values from Redis: {e}") from e
+        res: List[Tuple[Optional[bytes], Optional[float]]] = []
+        for value, pttl in zip(results[::2], results[1::2]):
+            if value is None or pttl == -2:
+                # (-2: expired between the GET and the PTTL)
+                res.append((None, None))
+            else:
+                res.append((value, 0.0 if pttl < 0 else pttl / 1000.0))
+        return res
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        storage_keys = [
+            get_storage_key(namespace, key, metadata_hash)
+            for key, metadata_hash in keys
+        ]
+        if not storage_keys:
+            return 0
+        try:
+            if self.replica_router is None:
+                return self.redis_client.delete(*storage_keys)  # type: ignore
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(*storage_keys)
+            return self._execute_write(pipe)[0]
+        except Exception as e:
+            raise StorageCacheException(
+                f"Failed to delete values from Redis: {e}"
+            ) from e
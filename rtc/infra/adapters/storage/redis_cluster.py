@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from rtc.app.exc import StorageCacheException
+from rtc.infra.adapters.storage.redis import RedisStorageAdapter
+
+REDIS_CLUSTER_AVAILABLE = False
+try:
+    from redis.cluster import RedisCluster
+
+    REDIS_CLUSTER_AVAILABLE = True
+except Exception:  # pragma: no cover
+    pass
+
+
+@dataclass
+class RedisClusterStorageAdapter(RedisStorageAdapter):
+    """Redis Cluster adapter for the storage port.
+
+    The key layout is the same than RedisStorageAdapter (no hash tag): values are
+    spread over the whole cluster. Multi-keys reads and deletes are split by slot.
+
+    redis_kwargs are given to `redis.cluster.RedisCluster` (redis>=4.1.0 is required).
+
+    """
+
+    _redis_client: Optional[Any] = None  # (RedisCluster object)
+
+    @property
+    def redis_client(self) -> Any:
+        with self._lock:
+            if self._redis_client is None:
+                if not REDIS_CLUSTER_AVAILABLE:
+                    raise StorageCacheException(
+                        "redis.cluster is not available (redis>=4.1.0 is required)"
+                    )
+                self._redis_client = RedisCluster(**self.redis_kwargs)
+            return self._redis_client
+
+    def _mget(self, storage_keys: List[str]) -> List[Optional[bytes]]:
+        # (one MGET per slot, batched by node)
+        return self.redis_client.mget_nonatomic(storage_keys)
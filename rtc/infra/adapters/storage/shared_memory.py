@@ -0,0 +1,619 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from rtc.app.exc import StorageCacheException
+from rtc.app.storage import StoragePort
+from rtc.app.types import LocalCacheStats
+
+FCNTL_AVAILABLE = False
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except Exception:
+    pass
+
+MAGIC = b"RTCSHM01"
+# magic, stripes, groups per stripe, pages per stripe, page size
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 4096
+
+WAYS = 8
+"""Number of entries per group of the hash table (set-associative)."""
+
+MIN_CHUNK_SIZE = 64
+MAX_PAGE_SIZE = MIN_CHUNK_SIZE * 65536  # (chunk index stored on 16 bits)
+NONE = 0xFFFFFFFF
+UNASSIGNED_PAGE = 0xFF
+
+# digest, expiration (time.time(), 0.0 means no expiration), value length,
+# chunk id, state, referenced (CLOCK bit)
+ENTRY = struct.Struct("<16sdIIBB6x")
+ENTRY_STATE_OFFSET = 32
+ENTRY_REFERENCED_OFFSET = 33
+ENTRY_EMPTY = 0
+ENTRY_VALID = 1
+
+CHUNK_HEADER = struct.Struct("<II")  # owner entry (NONE: free), next free chunk
+STRIPE_STATE = struct.Struct("<BxxxI")  # dirty flag, page hand
+STATS_FIELDS = 6
+STATS = struct.Struct("<" + "Q" * STATS_FIELDS)
+STAT_HITS, STAT_MISSES, STAT_EVICTIONS, STAT_EXPIRED, STAT_ENTRIES, STAT_SIZE = range(
+    STATS_FIELDS
+)
+CLASS_STATE = struct.Struct("<II")  # free list head, CLOCK hand
+
+
+def _align(size: int, alignment: int = 64) -> int:
+    return -(-size // alignment) * alignment
+
+
+def get_digest(namespace: str, key: str, metadata_hash: str) -> bytes:
+    return hashlib.blake2b(
+        f"{namespace}\x00{key}\x00{metadata_hash}".encode(), digest_size=16
+    ).digest()
+
+
+class _Stripe:
+    """A part of the segment (hash table groups + slab pages) protected by one lock.
+
+    All methods must be called with the stripe lock acquired.
+
+    Values are stored in chunks (slab allocation): chunk sizes are powers of 2
+    (from MIN_CHUNK_SIZE to the page size), a page is assigned to a chunk size
+    (class) on demand. When a class has no free chunk and there is no unassigned
+    page left, a chunk of the class is evicted (CLOCK algorithm) or (if the class
+    has no page at all) a page is taken from another class (all its values are
+    evicted).
+
+    A chunk id is `page << 16 | chunk index in the page`.
+
+    """
+
+    def __init__(
+        self,
+        mm: mmap.mmap,
+        base: int,
+        groups: int,
+        pages: int,
+        page_size: int,
+    ):
+        self.mm = mm
+        self.groups = groups
+        self.pages = pages
+        self.page_size = page_size
+        self.classes = (page_size // MIN_CHUNK_SIZE).bit_length()
+        self.state_offset = base
+        self.stats_offset = base + STRIPE_STATE.size
+        self.classes_offset = self.stats_offset + STATS.size
+        self.page_classes_offset = self.classes_offset + self.classes * CLASS_STATE.size
+        self.index_offset = _align(self.page_classes_offset + pages)
+        self.data_offset = _align(self.index_offset + groups * WAYS * ENTRY.size)
+        self.size = _align(self.data_offset + pages * page_size - base)
+
+    # --- stripe state and stats ---
+
+    @property
+    def dirty(self) -> bool:
+        return self.mm[self.state_offset] != 0
+
+    def set_dirty(self, dirty: bool) -> None:
+        self.mm[self.state_offset] = 1 if dirty else 0
+
+    def add_stat(self, stat: int, delta: int) -> None:
+        offset = self.stats_offset + stat * 8
+        (value,) = struct.unpack_from("<Q", self.mm, offset)
+        struct.pack_into("<Q", self.mm, offset, max(0, value + delta))
+
+    def get_stats(self) -> Tuple[int, ...]:
+        return STATS.unpack_from(self.mm, self.stats_offset)
+
+    def reset(self) -> None:
+        """Drop all values of the stripe (and reset its allocator)."""
+        STRIPE_STATE.pack_into(self.mm, self.state_offset, 0, 0)
+        STATS.pack_into(self.mm, self.stats_offset, *([0] * STATS_FIELDS))
+        for cls in range(self.classes):
+            self._set_class_state(cls, NONE, NONE)
+        start = self.page_classes_offset
+        self.mm[start : start + self.pages] = bytes([UNASSIGNED_PAGE]) * self.pages
+        start = self.index_offset
+        length = self.groups * WAYS * ENTRY.size
+        self.mm[start : start + length] = bytes(length)
+
+    # --- slab allocator ---
+
+    def get_class(self, length: int) -> Optional[int]:
+        """Return the class of a value of the given length (None if too big)."""
+        size = length + CHUNK_HEADER.size
+        cls = max(0, (size - 1).bit_length() - (MIN_CHUNK_SIZE - 1).bit_length())
+        return cls if cls < self.classes else None
+
+    def _get_class_state(self, cls: int) -> Tuple[int, int]:
+        return CLASS_STATE.unpack_from(
+            self.mm, self.classes_offset + cls * CLASS_STATE.size
+        )
+
+    def _set_class_state(self, cls: int, free_head: int, hand: int) -> None:
+        CLASS_STATE.pack_into(
+            self.mm, self.classes_offset + cls * CLASS_STATE.size, free_head, hand
+        )
+
+    def _get_page_class(self, page: int) -> int:
+        return self.mm[self.page_classes_offset + page]
+
+    def _find_page(self, cls: int, start: int = 0) -> int:
+        """Return the first page (>= start, wrapping) of the given class (-1 if none)."""
+        begin = self.page_classes_offset
+        end = begin + self.pages
+        needle = bytes([cls])
+        found = self.mm.find(needle, begin + start, end)
+        if found < 0 and start > 0:
+            found = self.mm.find(needle, begin, begin + start)
+        return found - begin if found >= 0 else -1
+
+    def _chunk_offset(self, chunk: int) -> int:
+        page, index = divmod(chunk, 65536)
+        chunk_size = MIN_CHUNK_SIZE << self._get_page_class(page)
+        return self.data_offset + page * self.page_size + index * chunk_size
+
+    def _free_chunk(self, chunk: int) -> None:
+        cls = self._get_page_class(chunk >> 16)
+        free_head, hand = self._get_class_state(cls)
+        CHUNK_HEADER.pack_into(self.mm, self._chunk_offset(chunk), NONE, free_head)
+        self._set_class_state(cls, chunk, hand)
+
+    def _assign_page(self, page: int, cls: int) -> None:
+        self.mm[self.page_classes_offset + page] = cls
+        chunks = self.page_size // (MIN_CHUNK_SIZE << cls)
+        for index in range(chunks - 1, -1, -1):
+            self._free_chunk((page << 16) | index)
+
+    def _next_chunk(self, cls: int, chunk: int) -> int:
+        chunks_per_page = self.page_size // (MIN_CHUNK_SIZE << cls)
+        if chunk != NONE:
+            page, index = divmod(chunk, 65536)
+            if index + 1 < chunks_per_page and self._get_page_class(page) == cls:
+                return chunk + 1
+            start = (page + 1) % self.pages
+        else:
+            start = 0
+        return self._find_page(cls, start) << 16
+
+    def _evict_chunk(self, cls: int) -> int:
+        """Evict a value of the given class (CLOCK), return its (reserved) chunk."""
+        _, hand = self._get_class_state(cls)
+        chunks_per_page = self.page_size // (MIN_CHUNK_SIZE << cls)
+        # (at most two turns: the first one can only clear referenced bits)
+        for _ in range(2 * self.pages * chunks_per_page + 1):
+            hand = self._next_chunk(cls, hand)
+            owner, _ = CHUNK_HEADER.unpack_from(self.mm, self._chunk_offset(hand))
+            entry = self._get_entry(owner) if owner != NONE else None
+            if entry is not None and entry[4] == ENTRY_VALID and entry[3] == hand:
+                if entry[5]:
+                    self.mm[self._entry_offset(owner) + ENTRY_REFERENCED_OFFSET] = 0
+                    continue
+                self._drop_entry(owner, entry)
+                self.add_stat(STAT_EVICTIONS, 1)
+            break
+        free_head, _ = self._get_class_state(cls)
+        self._set_class_state(cls, free_head, hand)
+        return hand
+
+    def _steal_page(self) -> int:
+        """Evict all values of the next page (page hand) and return it (unassigned)."""
+        (_, page_hand) = STRIPE_STATE.unpack_from(self.mm, self.state_offset)
+        page = page_hand % self.pages
+        STRIPE_STATE.pack_into(self.mm, self.state_offset, 1, page + 1)
+        cls = self._get_page_class(page)
+        chunks = self.page_size // (MIN_CHUNK_SIZE << cls)
+        for index in range(chunks):
+            chunk = (page << 16) | index
+            owner, _ = CHUNK_HEADER.unpack_from(self.mm, self._chunk_offset(chunk))
+            if owner == NONE:
+                continue
+            entry = self._get_entry(owner)
+            if entry[4] == ENTRY_VALID and entry[3] == chunk:
+                self._drop_entry(owner, entry)
+                self.add_stat(STAT_EVICTIONS, 1)
+        # let's rebuild the free list of the class without the chunks of the page
+        free_head, hand = self._get_class_state(cls)
+        kept: List[int] = []
+        chunk = free_head
+        while chunk != NONE:
+            _, next_chunk = CHUNK_HEADER.unpack_from(self.mm, self._chunk_offset(chunk))
+            if chunk >> 16 != page:
+                kept.append(chunk)
+            chunk = next_chunk
+        free_head = NONE
+        for chunk in reversed(kept):
+            CHUNK_HEADER.pack_into(self.mm, self._chunk_offset(chunk), NONE, free_head)
+            free_head = chunk
+        self._set_class_state(cls, free_head, NONE if hand >> 16 == page else hand)
+        self.mm[self.page_classes_offset + page] = UNASSIGNED_PAGE
+        return page
+
+    def _alloc(self, cls: int) -> int:
+        free_head, hand = self._get_class_state(cls)
+        if free_head == NONE:
+            page = self._find_page(UNASSIGNED_PAGE)
+            if page < 0:
+                if self._find_page(cls) >= 0:
+                    return self._evict_chunk(cls)
+                page = self._steal_page()
+            self._assign_page(page, cls)
+            free_head, hand = self._get_class_state(cls)
+        _, next_chunk = CHUNK_HEADER.unpack_from(self.mm, self._chunk_offset(free_head))
+        self._set_class_state(cls, next_chunk, hand)
+        return free_head
+
+    # --- hash table ---
+
+    def _entry_offset(self, entry: int) -> int:
+        return self.index_offset + entry * ENTRY.size
+
+    def _get_entry(self, entry: int) -> Tuple:
+        return ENTRY.unpack_from(self.mm, self._entry_offset(entry))
+
+    def _drop_entry(self, entry: int, values: Tuple) -> None:
+        """Empty the given entry (without freeing its chunk)."""
+        self.mm[self._entry_offset(entry) + ENTRY_STATE_OFFSET] = ENTRY_EMPTY
+        self.add_stat(STAT_ENTRIES, -1)
+        self.add_stat(STAT_SIZE, -values[2])
+
+    def _free_entry(self, entry: int, values: Tuple) -> None:
+        """Empty the given entry and free its chunk."""
+        self._drop_entry(entry, values)
+        self._free_chunk(values[3])
+
+    def _find(self, digest: bytes, group: int) -> Tuple[int, Optional[Tuple]]:
+        first = group * WAYS
+        for entry in range(first, first + WAYS):
+            values = self._get_entry(entry)
+            if values[4] == ENTRY_VALID and values[0] == digest:
+                return entry, values
+        return -1, None
+
+    def _choose_entry(self, group: int, now: float) -> int:
+        """Return an empty entry of the group (evict a value if necessary)."""
+        first = group * WAYS
+        victim = -1
+        for entry in range(first, first + WAYS):
+            values = self._get_entry(entry)
+            if values[4] != ENTRY_VALID:
+                return entry
+            if 0.0 < values[1] < now:
+                self._free_entry(entry, values)
+                self.add_stat(STAT_EXPIRED, 1)
+                return entry
+            if victim < 0 and not values[5]:
+                victim = entry
+        if victim < 0:
+            # (all entries were referenced => second chance for all of them)
+            for entry in range(first, first + WAYS):
+                self.mm[self._entry_offset(entry) + ENTRY_REFERENCED_OFFSET] = 0
+            victim = first
+        self._free_entry(victim, self._get_entry(victim))
+        self.add_stat(STAT_EVICTIONS, 1)
+        return victim
+
+    def get(
+        self, digest: bytes, group: int, now: float
+    ) -> Tuple[Optional[bytes], float]:
+        """Return the value (None if not found) and its expiration (0.0: none)."""
+        entry, values = self._find(digest, group)
+        if values is None:
+            self.add_stat(STAT_MISSES, 1)
+            return None, 0.0
+        if 0.0 < values[1] < now:
+            self._free_entry(entry, values)
+            self.add_stat(STAT_EXPIRED, 1)
+            self.add_stat(STAT_MISSES, 1)
+            return None, 0.0
+        if not values[5]:
+            self.mm[self._entry_offset(entry) + ENTRY_REFERENCED_OFFSET] = 1
+        self.add_stat(STAT_HITS, 1)
+        offset = self._chunk_offset(values[3]) + CHUNK_HEADER.size
+        return self.mm[offset : offset + values[2]], values[1]
+
+    def set(
+        self, digest: bytes, group: int, value: bytes, expiration: float, now: float
+    ) -> bool:
+        entry, values = self._find(digest, group)
+        if values is not None:
+            self._free_entry(entry, values)
+        cls = self.get_class(len(value))
+        if cls is None:
+            return False
+        if values is None:
+            entry = self._choose_entry(group, now)
+        chunk = self._alloc(cls)
+        offset = self._chunk_offset(chunk)
+        CHUNK_HEADER.pack_into(self.mm, offset, entry, NONE)
+        offset += CHUNK_HEADER.size
+        self.mm[offset : offset + len(value)] = value
+        ENTRY.pack_into(
+            self.mm,
+            self._entry_offset(entry),
+            digest,
+            expiration,
+            len(value),
+            chunk,
+            ENTRY_VALID,
+            0,
+        )
+        self.add_stat(STAT_ENTRIES, 1)
+        self.add_stat(STAT_SIZE, len(value))
+        return True
+
+    def delete(self, digest: bytes, group: int) -> bool:
+        entry, values = self._find(digest, group)
+        if values is None:
+            return False
+        self._free_entry(entry, values)
+        return True
+
+
+class _Segment:
+    """The mapping of a shared file (with its locks), shared by all adapters of the process."""
+
+    def __init__(self, path: str, header: Tuple, stripe_size: int):
+        self.path = path
+        self.header = header
+        self.references = 0
+        _, stripes, groups, pages, page_size = header
+        total_size = HEADER_SIZE + stripes * stripe_size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX, 1, 0, os.SEEK_SET)
+            try:
+                size = os.fstat(fd).st_size
+                if size == 0:
+                    os.ftruncate(fd, total_size)
+                    size = total_size
+                if size != total_size:
+                    raise ValueError(
+                        f"{path} exists with different settings (size: {size})"
+                    )
+                mm = mmap.mmap(fd, total_size)
+                self.stripes = [
+                    _Stripe(mm, HEADER_SIZE + i * stripe_size, groups, pages, page_size)
+                    for i in range(stripes)
+                ]
+                existing = HEADER.unpack_from(mm, 0)
+                if existing[0] != MAGIC:
+                    # new file (or initialization interrupted) => let's initialize it
+                    for stripe in self.stripes:
+                        stripe.reset()
+                    HEADER.pack_into(mm, 0, *header)
+                elif existing != header:
+                    mm.close()
+                    raise ValueError(f"{path} exists with different settings")
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, 0, os.SEEK_SET)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.fd = fd
+        self.mm = mm
+        self.reset_locks()
+
+    def reset_locks(self) -> None:
+        # (locks must be rebuilt after a fork: they can be held by a parent thread)
+        self.locks = [threading.Lock() for _ in self.stripes]
+        self.pid = os.getpid()
+
+    def close(self) -> None:
+        # note: closing the file descriptor releases all fcntl locks of the process
+        # on this file, so it must be done only when nobody uses the segment anymore
+        self.mm.close()
+        os.close(self.fd)
+
+    def run(self, stripe_index: int, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pid != os.getpid():
+            self.reset_locks()
+        stripe = self.stripes[stripe_index]
+        with self.locks[stripe_index]:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, stripe_index + 1, os.SEEK_SET)
+            try:
+                if stripe.dirty:
+                    # the previous owner died (or failed) while modifying the stripe
+                    stripe.reset()
+                stripe.set_dirty(True)
+                res = func(*args)
+                stripe.set_dirty(False)
+                return res
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, stripe_index + 1, os.SEEK_SET)
+
+
+_SEGMENTS: Dict[str, _Segment] = {}  # real path => segment
+_SEGMENTS_LOCK = threading.Lock()
+
+
+def _open_segment(path: str, header: Tuple, stripe_size: int) -> _Segment:
+    real_path = os.path.realpath(path)
+    with _SEGMENTS_LOCK:
+        segment = _SEGMENTS.get(real_path)
+        if segment is None:
+            segment = _Segment(real_path, header, stripe_size)
+            _SEGMENTS[real_path] = segment
+        elif segment.header != header:
+            raise ValueError(f"{path} is already used with different settings")
+        segment.references += 1
+        return segment
+
+
+def _close_segment(segment: _Segment) -> None:
+    with _SEGMENTS_LOCK:
+        segment.references -= 1
+        if segment.references > 0:
+            return
+        if _SEGMENTS.get(segment.path) is segment:
+            del _SEGMENTS[segment.path]
+        segment.close()
+
+
+@dataclass
+class SharedMemoryStorageAdapter(StoragePort):
+    """Storage adapter that keeps values in a memory-mapped file shared by all processes of a host.
+
+    All processes using the same `path` (for example all workers of a gunicorn
+    server) share the same values. On Linux, the default directory `/dev/shm` is
+    a memory filesystem (so nothing is written to disk).
+
+    The segment is a fixed-size hash table (groups of 8 entries, keyed by a 128 bits
+    digest of the storage key) and fixed-size data pages (slab allocation of chunks
+    of 64 bytes to `page_size` bytes). Both are split into stripes, each one with
+    its own lock: an in-process lock and a `fcntl.lockf()` lock on a byte of the
+    file (released by the kernel if the process dies). If a process dies while
+    modifying a stripe, the stripe is reset by the next process locking it.
+
+    When the segment is full, values are evicted (approximate LRU: CLOCK). Values
+    bigger than `page_size` minus 8 bytes are never stored.
+
+    Reads are not zero-copy: a value is copied once (under the stripe lock) from
+    the shared mapping to the returned bytes object. A view of the mapping can't
+    be returned as its chunk can be reused by another process as soon as the lock
+    is released (and the storage port returns bytes).
+
+    Adapters of the same process using the same path share the same mapping and
+    locks (`fcntl.lockf()` locks belong to the process, so they can't protect
+    threads of the same process from each other).
+
+    Note: POSIX only (fcntl). All processes must use the same settings for a given
+    path (a ValueError is raised otherwise).
+
+    """
+
+    path: str = "/dev/shm/rtc-storage"
+    """Path of the shared file (created if it doesn't exist)."""
+
+    size_in_bytes: int = 64 * 1024 * 1024
+    """Size (in bytes) of the data pages (the index is added to the file size)."""
+
+    max_entries: int = 65536
+    """Maximum number of values (size of the hash table)."""
+
+    page_size: int = 256 * 1024
+    """Size (in bytes) of a data page (power of 2), it's also the maximum value size."""
+
+    stripes: int = 16
+    """Number of stripes (each one with its own lock)."""
+
+    _segment: Optional[_Segment] = field(init=False, default=None)
+    _groups: int = field(init=False, default=1)  # (groups per stripe)
+
+    def __post_init__(self):
+        if not FCNTL_AVAILABLE:
+            raise ValueError("SharedMemoryStorageAdapter requires fcntl (POSIX)")
+        if self.page_size & (self.page_size - 1) or not (
+            MIN_CHUNK_SIZE <= self.page_size <= MAX_PAGE_SIZE
+        ):
+            raise ValueError(
+                f"page_size must be a power of 2 between {MIN_CHUNK_SIZE} and {MAX_PAGE_SIZE}"
+            )
+        if self.stripes < 1:
+            raise ValueError("stripes must be >= 1")
+        self._groups = max(1, -(-self.max_entries // (self.stripes * WAYS)))
+        pages = max(1, self.size_in_bytes // (self.stripes * self.page_size))
+        # (a stripe without mapping, only to compute the layout)
+        stripe_size = _Stripe(None, 0, self._groups, pages, self.page_size).size  # type: ignore
+        header = (MAGIC, self.stripes, self._groups, pages, self.page_size)
+        self._segment = _open_segment(self.path, header, stripe_size)
+
+    def close(self) -> None:
+        """Stop using the shared file (the file itself is kept for other processes)."""
+        if self._segment is not None:
+            segment, self._segment = self._segment, None
+            _close_segment(segment)
+
+    def _run(self, stripe_index: int, func_name: str, *args: Any) -> Any:
+        segment = self._segment
+        if segment is None:
+            raise StorageCacheException(f"{self.path} adapter is closed")
+        try:
+            return segment.run(
+                stripe_index, getattr(segment.stripes[stripe_index], func_name), *args
+            )
+        except Exception as e:
+            # (if it failed while modifying the stripe, the stripe is still marked
+            # as dirty, so it will be reset by the next operation)
+            raise StorageCacheException(f"Failed to use {self.path}: {e}") from e
+
+    def _locate(self, namespace: str, key: str, metadata_hash: str):
+        digest = get_digest(namespace, key, metadata_hash)
+        position = int.from_bytes(digest[:8], "little")
+        stripe, position = position % self.stripes, position // self.stripes
+        return digest, stripe, position % self._groups
+
+    @property
+    def stats(self) -> LocalCacheStats:
+        totals = [0] * STATS_FIELDS
+        for i in range(self.stripes):
+            for j, value in enumerate(self._run(i, "get_stats")):
+                totals[j] += value
+        return LocalCacheStats(
+            hits=totals[STAT_HITS],
+            misses=totals[STAT_MISSES],
+            evictions=totals[STAT_EVICTIONS],
+            expired=totals[STAT_EXPIRED],
+            entries=totals[STAT_ENTRIES],
+            size_in_bytes=totals[STAT_SIZE],
+        )
+
+    def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        digest, stripe, group = self._locate(namespace, key, metadata_hash)
+        now = time.time()
+        expiration = now + lifetime if lifetime > 0 else 0.0
+        self._run(stripe, "set", digest, group, value, expiration, now)
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        for key, metadata_hash, value in items:
+            self.set(namespace, key, metadata_hash, value, lifetime)
+
+    def get(self, namespace: str, key: str, metadata_hash: str) -> Optional[bytes]:
+        digest, stripe, group = self._locate(namespace, key, metadata_hash)
+        return self._run(stripe, "get", digest, group, time.time())[0]
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        return [self.get(namespace, key, metadata_hash) for key, metadata_hash in keys]
+
+    def get_many_with_lifetime(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        res: List[Tuple[Optional[bytes], Optional[float]]] = []
+        for key, metadata_hash in keys:
+            digest, stripe, group = self._locate(namespace, key, metadata_hash)
+            now = time.time()
+            value, expiration = self._run(stripe, "get", digest, group, now)
+            if value is None:
+                res.append((None, None))
+            else:
+                res.append((value, max(expiration - now, 0.001) if expiration else 0.0))
+        return res
+
+    def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        digest, stripe, group = self._locate(namespace, key, metadata_hash)
+        return self._run(stripe, "delete", digest, group)
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        return sum(
+            1
+            for key, metadata_hash in keys
+            if self.delete(namespace, key, metadata_hash)
+        )
@@ -0,0 +1,335 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from rtc.app.exc import StorageCacheException
+from rtc.app.storage import StoragePort
+from rtc.app.types import LocalCacheStats
+from rtc.infra.adapters.sweeper import get_shared_sweeper
+
+ACCESS_UPDATE_INTERVAL = 60.0
+"""Minimum interval (in seconds) between two updates of the access time of a value.
+
+(the access time is only used to choose the values to evict when the database
+is full, so it doesn't need to be exact and we avoid a write at each read)
+"""
+
+# note: the value is the last column, so other columns can be read without
+# reading the (possibly big) value
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rtc_values (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    metadata_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expiration REAL NOT NULL,
+    accessed REAL NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key, metadata_hash)
+);
+CREATE INDEX IF NOT EXISTS rtc_values_expiration
+    ON rtc_values (expiration) WHERE expiration > 0;
+CREATE INDEX IF NOT EXISTS rtc_values_accessed ON rtc_values (accessed);
+CREATE TABLE IF NOT EXISTS rtc_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO rtc_totals (id, entries, size) VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS rtc_values_insert AFTER INSERT ON rtc_values BEGIN
+    UPDATE rtc_totals SET entries = entries + 1, size = size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS rtc_values_delete AFTER DELETE ON rtc_values BEGIN
+    UPDATE rtc_totals SET entries = entries - 1, size = size - OLD.size WHERE id = 0;
+END;
+"""
+
+
+@dataclass
+class SQLiteStorageAdapter(StoragePort):
+    """Storage adapter that keeps values in a local SQLite database (WAL mode).
+
+    It's intended for big (or cold) values which are expensive to keep in Redis
+    memory but still cheaper to read from a local disk than to recompute. It can
+    be used alone or as a lower tier behind Redis (see `TieredStorageAdapter`).
+    The database can be shared by several processes of the host (and survives
+    restarts).
+
+    Lifetimes are honored (expired values are never returned). Expired values are
+    deleted in batches by the shared sweeper thread (see `rtc.infra.adapters.sweeper`).
+    When the size of stored values exceeds `max_bytes`, the least recently
+    accessed values are deleted.
+
+    Each thread uses its own connection (opened on first use, closed by `close()`).
+
+    """
+
+    path: str
+    """Path of the SQLite database (created if it doesn't exist)."""
+
+    max_bytes: int = 1024 * 1024 * 1024
+    """Maximum size (sum of values lengths, in bytes) of stored values (0 means: no limit)."""
+
+    batch_size: int = 500
+    """Maximum number of values deleted by a single statement (expiry and eviction)."""
+
+    timeout: float = 5.0
+    """Maximum time (in seconds) to wait for the database lock (held by another writer)."""
+
+    expiry_sweep: bool = True
+    """If True, expired values are deleted in background (by the shared sweeper)."""
+
+    _local: threading.local = field(init=False, default_factory=threading.local)
+    _connections: List[Tuple[int, sqlite3.Connection]] = field(
+        init=False, default_factory=list
+    )  # (pid, connection) of each thread
+    _connections_lock: threading.Lock = field(
+        init=False, default_factory=threading.Lock
+    )
+    _stats_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _hits: int = field(init=False, default=0)
+    _misses: int = field(init=False, default=0)
+    _evictions: int = field(init=False, default=0)
+    _expired: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self._connection.executescript(SCHEMA)
+        if self.expiry_sweep:
+            get_shared_sweeper().register(self)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != pid:
+            # (a connection must not be used after a fork)
+            try:
+                # (check_same_thread=False: only to be closed by close())
+                connection = sqlite3.connect(
+                    self.path,
+                    timeout=self.timeout,
+                    isolation_level=None,
+                    check_same_thread=False,
+                )
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            except sqlite3.Error as e:
+                raise StorageCacheException(f"Failed to open {self.path}: {e}") from e
+            self._local.connection = connection
+            self._local.pid = pid
+            with self._connections_lock:
+                self._connections.append((pid, connection))
+        return connection
+
+    def _count(
+        self, hits: int = 0, misses: int = 0, evictions: int = 0, expired: int = 0
+    ):
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._expired += expired
+
+    @property
+    def stats(self) -> LocalCacheStats:
+        """Statistics (hits, misses... are counted by this object only)."""
+        try:
+            entries, size = self._connection.execute(
+                "SELECT entries, size FROM rtc_totals WHERE id = 0"
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise StorageCacheException(f"Failed to read {self.path}: {e}") from e
+        with self._stats_lock:
+            return LocalCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expired=self._expired,
+                entries=entries,
+                size_in_bytes=size,
+            )
+
+    def sweep(self) -> None:
+        """Delete a batch of expired values (called by the shared sweeper)."""
+        try:
+            cursor = self._connection.execute(
+                "DELETE FROM rtc_values WHERE rowid IN (SELECT rowid FROM rtc_values "
+                "WHERE expiration > 0 AND expiration < ? LIMIT ?)",
+                (time.time(), self.batch_size),
+            )
+        except sqlite3.Error as e:
+            raise StorageCacheException(f"Failed to sweep {self.path}: {e}") from e
+        self._count(expired=cursor.rowcount)
+
+    def close(self) -> None:
+        """Stop the background expiry sweep and close the connections of all threads.
+
+        Note: the adapter must not be used (by any thread) after that.
+
+        """
+        get_shared_sweeper().unregister(self)
+        pid = os.getpid()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection_pid, connection in connections:
+            if connection_pid == pid:
+                # (connections inherited from a parent process are not ours)
+                connection.close()
+        self._local.connection = None
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        # must be called in a write transaction
+        if self.max_bytes <= 0:
+            return
+        (size,) = connection.execute(
+            "SELECT size FROM rtc_totals WHERE id = 0"
+        ).fetchone()
+        while size > self.max_bytes:
+            rowids: List[int] = []
+            for rowid, value_size in connection.execute(
+                "SELECT rowid, size FROM rtc_values ORDER BY accessed LIMIT ?",
+                (self.batch_size,),
+            ).fetchall():
+                rowids.append(rowid)
+                size -= value_size
+                if size <= self.max_bytes:
+                    break
+            if not rowids:
+                break
+            connection.execute(
+                f"DELETE FROM rtc_values WHERE rowid IN ({','.join('?' * len(rowids))})",
+                rowids,
+            )
+            self._count(evictions=len(rowids))
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        now = time.time()
+        expiration = now + lifetime if lifetime > 0 else 0.0
+        rows = []
+        for key, metadata_hash, value in items:
+            if self.max_bytes > 0 and len(value) > self.max_bytes:
+                continue
+            rows.append(
+                (namespace, key, metadata_hash, len(value), expiration, now, value)
+            )
+        if not rows:
+            return
+        try:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # (not INSERT OR REPLACE: the delete trigger wouldn't be fired)
+                connection.executemany(
+                    "DELETE FROM rtc_values "
+                    "WHERE namespace = ? AND key = ? AND metadata_hash = ?",
+                    [row[:3] for row in rows],
+                )
+                connection.executemany(
+                    "INSERT INTO rtc_values (namespace, key, metadata_hash, size, "
+                    "expiration, accessed, value) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageCacheException(f"Failed to write to {self.path}: {e}") from e
+
+    def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        self.set_many(namespace, [(key, metadata_hash, value)], lifetime)
+
+    def _get(
+        self, namespace: str, key: str, metadata_hash: str, now: float
+    ) -> Tuple[Optional[bytes], float]:
+        """Return the value (None if not found) and its expiration (0.0: none)."""
+        try:
+            connection = self._connection
+            row = connection.execute(
+                "SELECT rowid, expiration, accessed FROM rtc_values "
+                "WHERE namespace = ? AND key = ? AND metadata_hash = ?",
+                (namespace, key, metadata_hash),
+            ).fetchone()
+            if row is None:
+                self._count(misses=1)
+                return None, 0.0
+            rowid, expiration, accessed = row
+            if 0.0 < expiration < now:
+                self._count(misses=1, expired=1)
+                return None, 0.0
+            # (the value is read only if it's not expired)
+            value_row = connection.execute(
+                "SELECT value FROM rtc_values WHERE rowid = ?", (rowid,)
+            ).fetchone()
+            if value_row is None:  # (deleted in the meantime)
+                self._count(misses=1)
+                return None, 0.0
+        except sqlite3.Error as e:
+            raise StorageCacheException(f"Failed to read from {self.path}: {e}") from e
+        if now - accessed > ACCESS_UPDATE_INTERVAL:
+            # (best effort: the database can be locked by another writer)
+            try:
+                connection.execute(
+                    "UPDATE rtc_values SET accessed = ? WHERE rowid = ?", (now, rowid)
+                )
+            except sqlite3.OperationalError:
+                pass
+        self._count(hits=1)
+        return bytes(value_row[0]), expiration
+
+    def get(self, namespace: str, key: str, metadata_hash: str) -> Optional[bytes]:
+        return self._get(namespace, key, metadata_hash, time.time())[0]
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        return [self.get(namespace, key, metadata_hash) for key, metadata_hash in keys]
+
+    def get_many_with_lifetime(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        res: List[Tuple[Optional[bytes], Optional[float]]] = []
+        for key, metadata_hash in keys:
+            now = time.time()
+            value, expiration = self._get(namespace, key, metadata_hash, now)
+            if value is None:
+                res.append((None, None))
+            else:
+                res.append((value, max(expiration - now, 0.001) if expiration else 0.0))
+        return res
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        try:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = 0
+                for key, metadata_hash in keys:
+                    deleted += connection.execute(
+                        "DELETE FROM rtc_values "
+                        "WHERE namespace = ? AND key = ? AND metadata_hash = ?",
+                        (namespace, key, metadata_hash),
+                    ).rowcount
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageCacheException(
+                f"Failed to delete from {self.path}: {e}"
+            ) from e
+        return deleted
+
+    def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        return self.delete_many(namespace, [(key, metadata_hash)]) > 0
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from rtc.app.storage import StoragePort
+
+
+@dataclass
+class TieredStorageAdapter(StoragePort):
+    """Storage adapter that stacks a fast (smaller) adapter over a slower one.
+
+    Values are read from the upper adapter first, then from the lower one (a value
+    found in the lower adapter is copied to the upper one). Writes and deletes go
+    to both adapters.
+
+    Values copied to the upper adapter are never kept longer than their remaining
+    lifetime in the lower one. As storage keys embed the metadata hash, a stored
+    value is not supposed to change. But a delete made (by another host) directly
+    on the lower adapter can be seen up to `upper_max_lifetime` seconds later.
+
+    """
+
+    upper: StoragePort
+    lower: StoragePort
+
+    upper_max_lifetime: int = 0
+    """Maximum lifetime (in seconds) of values in the upper adapter (0 means: no limit).
+
+    Values copied from the lower adapter (after a read) are kept their remaining
+    lifetime in the lower adapter, capped by this value (see
+    `StoragePort.get_many_with_lifetime()`, if the lower adapter doesn't know the
+    remaining lifetime, this value is used as is).
+    """
+
+    upper_max_value_size: int = 0
+    """Values bigger than this (in bytes) are not stored in the upper adapter (0 means: no limit)."""
+
+    def _get_upper_lifetime(self, lifetime: int) -> int:
+        if self.upper_max_lifetime <= 0:
+            return lifetime
+        if lifetime <= 0:
+            return self.upper_max_lifetime
+        return min(lifetime, self.upper_max_lifetime)
+
+    def _get_promotion_lifetime(self, remaining: Optional[float]) -> Optional[int]:
+        """Return the lifetime of a value copied from the lower adapter (None: don't copy)."""
+        if remaining is None or remaining <= 0.0:
+            # (unknown or no expiration)
+            return self.upper_max_lifetime
+        # (rounded down: the copy must not outlive the value)
+        lifetime = int(remaining)
+        return self._get_upper_lifetime(lifetime) if lifetime >= 1 else None
+
+    def _fits_upper(self, value: bytes) -> bool:
+        return self.upper_max_value_size <= 0 or len(value) <= self.upper_max_value_size
+
+    def set(
+        self, namespace: str, key: str, metadata_hash: str, value: bytes, lifetime: int
+    ) -> None:
+        self.lower.set(namespace, key, metadata_hash, value, lifetime)
+        if self._fits_upper(value):
+            self.upper.set(
+                namespace, key, metadata_hash, value, self._get_upper_lifetime(lifetime)
+            )
+        else:
+            self.upper.delete(namespace, key, metadata_hash)
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, str, bytes]],
+        lifetime: int,
+    ) -> None:
+        items = list(items)
+        self.lower.set_many(namespace, items, lifetime)
+        upper_items = [item for item in items if self._fits_upper(item[2])]
+        if upper_items:
+            self.upper.set_many(
+                namespace, upper_items, self._get_upper_lifetime(lifetime)
+            )
+        if len(upper_items) < len(items):
+            self.upper.delete_many(
+                namespace,
+                [
+                    (key, mhash)
+                    for key, mhash, value in items
+                    if not self._fits_upper(value)
+                ],
+            )
+
+    def _get_many(
+        self, namespace: str, keys: List[Tuple[str, str]], with_lifetime: bool
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        if with_lifetime:
+            res = self.upper.get_many_with_lifetime(namespace, keys)
+        else:
+            res = [(value, None) for value in self.upper.get_many(namespace, keys)]
+        missing_indexes = [i for i, (value, _) in enumerate(res) if value is None]
+        if not missing_indexes:
+            return res
+        fetched = self.lower.get_many_with_lifetime(
+            namespace, [keys[i] for i in missing_indexes]
+        )
+        for i, (value, remaining) in zip(missing_indexes, fetched):
+            res[i] = (value, remaining)
+            if value is None or not self._fits_upper(value):
+                continue
+            lifetime = self._get_promotion_lifetime(remaining)
+            if lifetime is not None:
+                self.upper.set(namespace, keys[i][0], keys[i][1], value, lifetime)
+        return res
+
+    def get(self, namespace: str, key: str, metadata_hash: str) -> Optional[bytes]:
+        return self._get_many(namespace, [(key, metadata_hash)], False)[0][0]
+
+    def get_many(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Optional[bytes]]:
+        return [value for value, _ in self._get_many(namespace, list(keys), False)]
+
+    def get_many_with_lifetime(
+        self, namespace: str, keys: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        return self._get_many(namespace, list(keys), True)
+
+    def delete(self, namespace: str, key: str, metadata_hash: str) -> bool:
+        upper_res = self.upper.delete(namespace, key, metadata_hash)
+        lower_res = self.lower.delete(namespace, key, metadata_hash)
+        return upper_res or lower_res
+
+    def delete_many(self, namespace: str, keys: Iterable[Tuple[str, str]]) -> int:
+        keys = list(keys)
+        self.upper.delete_many(namespace, keys)
+        return self.lower.delete_many(namespace, keys)
@@ -0,0 +1,119 @@
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+LOGGER = logging.getLogger("rtc.infra.adapters.sweeper")
+
+DEFAULT_SWEEP_INTERVAL = 1.0
+"""Default interval (in seconds) between two sweeps of the shared sweeper."""
+
+
+class Sweeper:
+    """A single daemon thread calling `sweep()` of registered objects periodically.
+
+    Objects are referenced weakly: a garbage collected object is automatically
+    unregistered. The thread is started with the first registered object, stopped
+    with `stop()` (it's restarted by the next `register()`) and restarted in a
+    child process right after a fork (if objects are registered and if
+    `os.register_at_fork()` is available, else by the next `register()`).
+
+    `sweep()` is called from the sweeper thread, so it must be thread-safe and
+    short (it should do an incremental part of the work at each call). Exceptions
+    are logged and ignored.
+
+    """
+
+    def __init__(self, interval: float = DEFAULT_SWEEP_INTERVAL):
+        self.interval = interval
+        # (reentrant: weakref callbacks can be called by the GC while it's held)
+        self._lock = threading.RLock()
+        self._refs: Dict[int, weakref.ref[Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._pid = 0
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: _after_fork_in_child(ref))
+
+    def register(self, obj: Any) -> None:
+        """Register the given object (its `sweep()` method will be called periodically)."""
+        obj_id = id(obj)
+
+        def _remove(ref: Any) -> None:
+            with self._lock:
+                if self._refs.get(obj_id) is ref:
+                    del self._refs[obj_id]
+
+        with self._lock:
+            self._refs[obj_id] = weakref.ref(obj, _remove)
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._start()
+
+    def _start(self) -> None:
+        # must be called with self._lock acquired
+        self._pid = os.getpid()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._stop_event,),
+            name="rtc-sweeper",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _after_fork_in_child(self) -> None:
+        # (the lock can have been held by another thread of the parent: let's
+        # rebuild it, the parent thread doesn't exist in the child)
+        self._lock = threading.RLock()
+        self._thread = None
+        if self._refs:
+            self._start()
+
+    def unregister(self, obj: Any) -> None:
+        """Unregister the given object (if registered)."""
+        with self._lock:
+            self._refs.pop(id(obj), None)
+
+    def stop(self) -> None:
+        """Stop the sweeper thread (and wait for it)."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._thread = None
+            self._stop_event.set()
+        thread.join()
+
+    def sweep(self) -> None:
+        """Call `sweep()` of all registered objects (now, in the current thread)."""
+        with self._lock:
+            refs = list(self._refs.values())
+        for ref in refs:
+            obj = ref()
+            if obj is None:
+                continue
+            try:
+                obj.sweep()
+            except Exception:
+                LOGGER.warning(f"Error while sweeping {type(obj)}", exc_info=True)
+
+    def _run(self, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self.interval):
+            self.sweep()
+
+
+def _after_fork_in_child(ref: "weakref.ref[Sweeper]") -> None:
+    sweeper = ref()
+    if sweeper is not None:
+        sweeper._after_fork_in_child()
+
+
+_SHARED_SWEEPER = Sweeper()
+
+
+def get_shared_sweeper() -> Sweeper:
+    """Return the sweeper shared by all in-memory adapters of the process."""
+    return _SHARED_SWEEPER
@@ -0,0 +1,224 @@
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Iterable, Optional, Union
+
+from rtc.app.metadata import AsyncMetadataPort, AsyncMetadataService
+from rtc.app.serializer import DEFAULT_SERIALIZER, DEFAULT_UNSERIALIZER
+from rtc.app.service import AsyncService
+from rtc.app.storage import AsyncStoragePort, AsyncStorageService
+from rtc.infra.adapters.metadata.async_blackhole import AsyncBlackHoleMetadataAdapter
+from rtc.infra.adapters.metadata.async_dict import AsyncDictMetadataAdapter
+from rtc.infra.adapters.metadata.async_redis import AsyncRedisMetadataAdapter
+from rtc.infra.adapters.storage.async_blackhole import AsyncBlackHoleStorageAdapter
+from rtc.infra.adapters.storage.async_dict import AsyncDictStorageAdapter
+from rtc.infra.adapters.storage.async_redis import AsyncRedisStorageAdapter
+
+
+@dataclass
+class AsyncRedisTaggedCache:
+    """An asyncio-native version of RedisTaggedCache (based on `redis.asyncio`).
+
+    The key layout is exactly the same than `RedisTaggedCache` so sync and async
+    clients (with the same namespace) share the same cache (and the same invalidations).
+
+    Note: `redis>=4.2.0` is required for this class.
+
+    Example:
+        ```python
+        cache = AsyncRedisTaggedCache(
+            host="localhost",
+            port=6379
+        )
+
+        await cache.set("key", "value", tags=["tag1", "tag2"])
+        assert await cache.get("key", tags=["tag1", "tag2"]) == "value"
+        await cache.invalidate("tag1")  # Invalidates all entries with tag1
+
+        await cache.get("key", tags=["tag1", "tag2"])  # it will raise a CacheMiss exception
+
+        await cache.aclose()
+        ```
+
+    Note:
+        As redis.asyncio clients are bound to an event loop, an instance must not be
+        shared between several event loops.
+    """
+
+    namespace: str = "default"
+    """Namespace prefix for all cache entries to avoid key collisions."""
+
+    host: str = "localhost"
+    """Redis server hostname or IP address."""
+
+    port: int = 6379
+    """Redis server port number."""
+
+    db: int = 0
+    """Redis database number (0-15)."""
+
+    ssl: bool = False
+    """Whether to use SSL/TLS for Redis connection."""
+
+    socket_timeout: int = 5
+    """Socket timeout in seconds for Redis operations."""
+
+    socket_connect_timeout: int = 5
+    """Socket connection timeout in seconds when establishing Redis connection."""
+
+    default_lifetime: Optional[int] = 3600  # 1h
+    """Default lifetime for cache entries in seconds (see `RedisTaggedCache`)."""
+
+    lifetime_for_tags: Optional[int] = 86400  # 24h
+    """Lifetime for tag entries in seconds (see `RedisTaggedCache`)."""
+
+    disabled: bool = False
+    """If True, disables all caching operations while maintaining the API interface."""
+
+    in_local_memory: bool = False
+    """If True, uses process-local memory instead of Redis for storage (for testing only)."""
+
+    serializer: Callable[[Any], Optional[bytes]] = DEFAULT_SERIALIZER
+    """Function to serialize Python objects before storing in cache."""
+
+    unserializer: Callable[[bytes], Any] = DEFAULT_UNSERIALIZER
+    """Function to deserialize data read from cache back into Python objects."""
+
+    _internal_lock: Lock = field(init=False, default_factory=Lock)
+    _forced_metadata_adapter: Optional[AsyncMetadataPort] = field(
+        init=False, default=None
+    )  # for advanced usage only
+    _forced_storage_adapter: Optional[AsyncStoragePort] = field(
+        init=False, default=None
+    )  # for advanced usage only
+    __service: Optional[AsyncService] = field(
+        init=False, default=None
+    )  # cache of the AsyncService object
+
+    @property
+    def _service(self) -> AsyncService:
+        with self._internal_lock:
+            if self.__service is None:
+                self.__service = self._make_service()
+            return self.__service
+
+    def _make_service(self) -> AsyncService:
+        metadata_adapter: AsyncMetadataPort
+        storage_adapter: AsyncStoragePort
+        redis_kwargs = {
+            "host": self.host,
+            "port": self.port,
+            "db": self.db,
+            "ssl": self.ssl,
+            "socket_timeout": self.socket_timeout,
+            "socket_connect_timeout": self.socket_connect_timeout,
+        }
+        if self._forced_metadata_adapter:
+            metadata_adapter = self._forced_metadata_adapter
+        elif self.disabled:
+            metadata_adapter = AsyncBlackHoleMetadataAdapter()
+        elif self.in_local_memory:
+            metadata_adapter = AsyncDictMetadataAdapter()
+        else:
+            metadata_adapter = AsyncRedisMetadataAdapter(redis_kwargs)
+        if self._forced_storage_adapter:
+            storage_adapter = self._forced_storage_adapter
+        elif self.disabled:
+            storage_adapter = AsyncBlackHoleStorageAdapter()
+        elif self.in_local_memory:
+            storage_adapter = AsyncDictStorageAdapter()
+        else:
+            storage_adapter = AsyncRedisStorageAdapter(redis_kwargs)
+        return AsyncService(
+            namespace=self.namespace,
+            metadata_service=AsyncMetadataService(
+                namespace=self.namespace,
+                adapter=metadata_adapter,
+                default_lifetime=self.lifetime_for_tags or 0,
+            ),
+            storage_service=AsyncStorageService(
+                namespace=self.namespace,
+                adapter=storage_adapter,
+                default_lifetime=self.default_lifetime or 0,
+            ),
+            serializer=self.serializer,
+            unserializer=self.unserializer,
+        )
+
+    def _rebuild_service(self):
+        with self._internal_lock:
+            self.__service = None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Optional[Iterable[str]] = None,
+        lifetime: Optional[int] = None,
+    ) -> bool:
+        """Store a value in the cache with optional tags and lifetime.
+
+        See `RedisTaggedCache.set()` for details.
+
+        """
+        return await self._service.set(key, value, tags, lifetime)
+
+    async def delete(self, key: str, tags: Optional[Iterable[str]] = None) -> bool:
+        """Remove an entry from the cache.
+
+        See `RedisTaggedCache.delete()` for details.
+
+        """
+        return await self._service.delete(key, tags)
+
+    async def get(
+        self,
+        key: str,
+        tags: Optional[Iterable[str]] = None,
+    ) -> Any:
+        """Retrieve a value from the cache.
+
+        See `RedisTaggedCache.get()` for details.
+
+        Raises:
+            CacheMiss: If the key doesn't exist, has expired, or was invalidated
+
+        """
+        return await self._service.get(key, tags)
+
+    async def invalidate(self, tags: Union[str, Iterable[str]]) -> bool:
+        """Invalidate all cache entries associated with the given tag(s).
+
+        See `RedisTaggedCache.invalidate()` for details.
+
+        """
+        if isinstance(tags, str):
+            return await self._service.invalidate_tags([tags])
+        else:
+            return await self._service.invalidate_tags(tags)
+
+    async def invalidate_all(self) -> bool:
+        """Invalidate all cache entries in the current namespace.
+
+        See `RedisTaggedCache.invalidate_all()` for details.
+
+        """
+        return await self._service.invalidate_all()
+
+    async def aclose(self) -> None:
+        """Close the underlying Redis connections (if any).
+
+        The instance can still be used after that (new connections will be opened).
+
+        """
+        with self._internal_lock:
+            service = self.__service
+        if service is None:
+            return
+        for adapter in (
+            service.metadata_service.adapter,
+            service.storage_service.adapter,
+        ):
+            if isinstance(
+                adapter, (AsyncRedisMetadataAdapter, AsyncRedisStorageAdapter)
+            ):
+                await adapter.aclose()
@@ -1,21 +1,54 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from threading import Lock
-from typing import Any, Callable, Iterable, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+import redis
+
+from rtc.app.combined import CombinedReadPort
 from rtc.app.decorator import cache_decorator
+from rtc.app.hooks import HookDispatcher
 from rtc.app.metadata import MetadataPort, MetadataService
 from rtc.app.serializer import DEFAULT_SERIALIZER, DEFAULT_UNSERIALIZER
 from rtc.app.service import Service
 from rtc.app.storage import StoragePort, StorageService
 from rtc.app.types import (
     CacheHook,
+    ConnectionPoolStats,
+    LocalCacheStats,
+    SpanHook,
 )
+from rtc.infra.adapters.combined.redis import RedisCombinedReadAdapter
 from rtc.infra.adapters.metadata.blackhole import BlackHoleMetadataAdapter
+from rtc.infra.adapters.metadata.cached import CachedMetadataAdapter
 from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
 from rtc.infra.adapters.metadata.redis import RedisMetadataAdapter
+from rtc.infra.adapters.metadata.redis_cluster import RedisClusterMetadataAdapter
+from rtc.infra.adapters.redis_pool import (
+    InstrumentedBlockingConnectionPool,
+    InstrumentedConnectionPool,
+    make_connection_pool,
+)
+from rtc.infra.adapters.redis_replicas import RedisReplicaRouter
 from rtc.infra.adapters.storage.blackhole import BlackHoleStorageAdapter
+from rtc.infra.adapters.storage.cached import CachedStorageAdapter
 from rtc.infra.adapters.storage.dict import DictStorageAdapter
 from rtc.infra.adapters.storage.redis import RedisStorageAdapter
+from rtc.infra.adapters.storage.redis_cluster import RedisClusterStorageAdapter
+from rtc.infra.adapters.storage.shared_memory import SharedMemoryStorageAdapter
+from rtc.infra.adapters.storage.sqlite import SQLiteStorageAdapter
+from rtc.infra.adapters.storage.tiered import TieredStorageAdapter
+
+LOGGER = logging.getLogger("rtc.infra.controllers.lib")
+
+REDIS_CLUSTER_AVAILABLE = False
+try:
+    from redis.cluster import RedisCluster
+
+    REDIS_CLUSTER_AVAILABLE = True
+except Exception:  # pragma: no cover
+    pass
 
 
 @dataclass
@@ -69,12 +102,114 @@ class RedisTaggedCache:
     ssl: bool = False
     """Whether to use SSL/TLS for Redis connection."""
 
+    cluster: bool = False
+    """If True, connect to a Redis Cluster (host and port of any node of the cluster).
+
+    `redis.cluster.RedisCluster` is used (redis-py >= 4.1 is required) with a key
+    layout designed for the cluster: tag keys of the namespace are in the same slot,
+    stored values are spread over the cluster.
+
+    Note: `db`, `unix_socket_path` and connection pool settings (except
+    `max_connections`, per node) are ignored.
+    """
+
     socket_timeout: int = 5
     """Socket timeout in seconds for Redis operations."""
 
     socket_connect_timeout: int = 5
     """Socket connection timeout in seconds when establishing Redis connection."""
 
+    unix_socket_path: Optional[str] = None
+    """If set, connect to Redis with this unix domain socket (host, port and ssl are ignored)."""
+
+    socket_keepalive: bool = False
+    """Whether to enable TCP keepalive on Redis connections."""
+
+    health_check_interval: int = 0
+    """If > 0 (in seconds), idle connections are checked (PING) before being used again.
+
+    Note: redis-py >= 3.3 is required.
+    """
+
+    protocol: int = 2
+    """Redis protocol version (2 or 3 for RESP3, redis-py >= 5 is required for 3)."""
+
+    max_connections: Optional[int] = None
+    """Maximum number of connections of the connection pool (None means: redis-py default).
+
+    A single pool is shared by all Redis adapters of this cache (so at most
+    max_connections per process, except the 2 dedicated connections of
+    `tags_client_tracking`).
+    """
+
+    connection_pool_blocking_timeout: Optional[float] = None
+    """If set (in seconds), wait for a free connection when max_connections are in use.
+
+    Without it, a `ConnectionError` is raised (and the cache is bypassed) when the pool
+    is full. With it, max_connections defaults to 50.
+    """
+
+    connection_pool: Optional[redis.ConnectionPool] = None
+    """Use this redis-py connection pool instead of creating one.
+
+    Useful to share a single pool between several caches (different namespaces) of the
+    same process. If set, all other connection settings are ignored (and
+    `get_connection_pool_stats()` returns None, unless the pool is an instrumented one).
+    """
+
+    connection_pool_hook: Optional[Callable[[ConnectionPoolStats], None]] = None
+    """Optional callback called after each connection checkout with the pool statistics.
+
+    The `wait_time` attribute of the given `ConnectionPoolStats` is the time spent
+    getting this connection. Exceptions raised by the callback are logged and ignored.
+    """
+
+    read_replicas: Optional[List[Tuple[str, int]]] = None
+    """If set, (host, port) of the replicas of the Redis server to route value reads to.
+
+    Writes, invalidations and locks stay on the primary (`host`, `port`), other
+    connection settings are the same. A lagging replica can only produce a miss, never
+    a stale hit: each write waits (up to `read_replicas_wait_timeout`) for the
+    acknowledgment of all replicas (it's reported as failed if they don't acknowledge
+    it in time) and replicas which are disconnected or behind the primary are not
+    used until their next successful check (see `read_replicas_check_interval`).
+
+    Note: all replicas of the primary must be given. Ignored if `disabled`,
+    `in_local_memory` or `cluster` is True. If set, `single_round_trip_reads` is ignored.
+    """
+
+    read_replicas_strategy: str = "round_robin"
+    """How to choose the replica of a read: round_robin or least_latency.
+
+    Note: only used if `read_replicas` is set.
+    """
+
+    read_replicas_for_tags: bool = False
+    """If True, tag values are also read from replicas (not only stored values).
+
+    Invalidations then wait for the acknowledgment of all replicas.
+
+    Warning: if an invalidation is not acknowledged in time by a replica, only the
+    process which invalidated stops reading from it. Other processes can read the old
+    tag values from the lagging replica (and serve stale hits) until their next
+    replica check, i.e. up to `read_replicas_check_interval` seconds. Keep this option
+    off if you can't accept this window.
+
+    Note: only used if `read_replicas` is set, ignored if `tags_client_tracking` is True.
+    """
+
+    read_replicas_wait_timeout: int = 100
+    """Maximum time (in milliseconds) to wait for replicas acknowledgment of a write.
+
+    Note: only used if `read_replicas` is set.
+    """
+
+    read_replicas_check_interval: float = 1.0
+    """Interval (in seconds) between two checks (link status, replication offset, latency) of replicas.
+
+    Note: only used if `read_replicas` is set.
+    """
+
     default_lifetime: Optional[int] = 3600  # 1h
     """Default lifetime for cache entries in seconds.
 
@@ -103,6 +238,154 @@ class RedisTaggedCache:
         as it doesn't provide cross-process cache consistency.
     """
 
+    in_local_memory_max_entries: int = 100000
+    """Maximum number of values stored in process memory (LRU eviction, 0 means: no limit).
+
+    Note: only used if `in_local_memory` is True.
+    """
+
+    in_local_memory_max_bytes: int = 256 * 1024 * 1024
+    """Maximum size (in bytes) of values stored in process memory (LRU eviction, 0 means: no limit).
+
+    Note: only used if `in_local_memory` is True.
+    """
+
+    single_round_trip_reads: bool = False
+    """If True, cache reads are done in a single Redis round trip (with a server-side Lua script).
+
+    Tag values are resolved, the metadata hash is computed and the stored value is read
+    in one EVALSHA call (instead of a MGET followed by a GET). If scripting is not
+    available on the Redis server, we fall back to the classic two round trips read.
+
+    The first read of a key (by the process) and the first read after an
+    invalidation of its tags still need a second round trip (the script can only
+    read the storage key of the last metadata hash seen for the key).
+
+    Note: ignored if `disabled`, `in_local_memory` or `cluster` is True (with a
+    cluster, values are not in the same slot than tags).
+    """
+
+    tags_local_cache_max_staleness: Optional[float] = None
+    """If set (in seconds, for example 0.2), tag values are also cached in process memory.
+
+    When the local cache is warm, reads don't need the tag values round trip at all.
+    The counterpart is that an invalidation made by another process can be seen up to
+    this delay later by the current process (invalidations made by the current
+    process are seen immediately).
+
+    Note: if set, `single_round_trip_reads` is ignored.
+    """
+
+    tags_local_cache_max_size: int = 10000
+    """Maximum number of tag values in the process memory cache (LRU eviction).
+
+    Note: only used if `tags_local_cache_max_staleness` is set.
+    """
+
+    tags_client_tracking: bool = False
+    """If True, tag values are cached in process memory and invalidated by Redis itself.
+
+    This uses the server-assisted client-side caching feature of Redis (>= 6) with
+    `CLIENT TRACKING` (broadcasting mode): contrary to `tags_local_cache_max_staleness`,
+    invalidations made by other processes are pushed by Redis (so they are seen almost
+    immediately). If the tracking connections are lost, the local values are dropped
+    and tag values are read from Redis until the tracking is re-established.
+
+    Note: ignored if `disabled`, `in_local_memory` or `cluster` is True. If set,
+    `single_round_trip_reads` is ignored.
+    """
+
+    tags_client_tracking_max_size: int = 100000
+    """Maximum number of tag values in the client tracking local map (LRU eviction).
+
+    Note: only used if `tags_client_tracking` is True.
+    """
+
+    values_local_cache_max_bytes: Optional[int] = None
+    """If set (in bytes, for example 64MB), stored values are also cached in process memory (L1).
+
+    As storage keys embed the metadata hash of the tags, a stored value is not supposed
+    to change, so hot entries are served without the Redis read (and the network
+    transfer of the value). Writes and deletes made by the current process are seen
+    immediately, a delete (or an overwrite with the same tags) made by another process
+    can be seen up to `values_local_cache_ttl` seconds later. Values are never kept
+    longer than their remaining lifetime in Redis.
+
+    Note: if set, `single_round_trip_reads` is ignored.
+    """
+
+    values_local_cache_max_entries: int = 10000
+    """Maximum number of values in the process memory cache (LRU eviction).
+
+    Note: only used if `values_local_cache_max_bytes` is set.
+    """
+
+    values_local_cache_ttl: float = 60.0
+    """Maximum time (in seconds) a value is kept in the process memory cache.
+
+    Note: only used if `values_local_cache_max_bytes` is set.
+    """
+
+    shared_memory_path: Optional[str] = None
+    """If set (for example "/dev/shm/myapp-cache"), stored values are also kept in a file shared by all processes of the host.
+
+    The file is memory-mapped by all processes using the same path (for example all
+    workers of a gunicorn server), so a value computed (or read from Redis) by one
+    worker is served to all the others without any Redis round trip. Values are
+    kept at most `shared_memory_ttl` seconds (so a delete made by another host can be
+    seen up to this delay later) and evicted (approximate LRU) when the file is full.
+
+    Note: POSIX only, ignored if `disabled` or `in_local_memory` is True. All
+    processes using the same path must use the same `shared_memory_size` (if the
+    file can't be used, for example because it exists with other settings, a
+    warning is logged and values are not kept in shared memory).
+    """
+
+    shared_memory_size: int = 64 * 1024 * 1024
+    """Size (in bytes) of values stored in the shared memory file.
+
+    Note: only used if `shared_memory_path` is set.
+    """
+
+    shared_memory_ttl: int = 60
+    """Maximum time (in seconds) a value is kept in the shared memory file (0 means: no limit).
+
+    Note: only used if `shared_memory_path` is set.
+    """
+
+    disk_path: Optional[str] = None
+    """If set (for example "/var/cache/myapp/rtc.sqlite"), stored values are also kept in a local SQLite database.
+
+    The database is a lower tier behind Redis (or the process memory if
+    `in_local_memory` is True): values are written to both, read from Redis first
+    and from the disk if they are not in Redis (anymore), in this case they are copied
+    back to Redis for their remaining lifetime only. Big values can be kept out
+    of Redis memory with `disk_redis_max_value_size`. The database survives
+    restarts and can be shared by all processes of the host.
+
+    Note: ignored if `disabled` is True. As with `shared_memory_path`, a delete made
+    by another host is not seen by the local database (until the value expires or
+    its tags are invalidated).
+    """
+
+    disk_max_bytes: int = 1024 * 1024 * 1024
+    """Maximum size (in bytes) of values stored in the local database (least recently accessed values are deleted first).
+
+    Note: only used if `disk_path` is set.
+    """
+
+    disk_redis_max_value_size: int = 0
+    """Values bigger than this (in bytes) are only stored in the local database (0 means: no limit).
+
+    Note: only used if `disk_path` is set.
+    """
+
+    refresh_max_workers: int = 4
+    """Maximum number of threads used to refresh stale values in background.
+
+    Note: only used by decorators with `stale_while_revalidate` set.
+    """
+
     cache_hook: Optional[CacheHook] = None
     """Optional callback function for monitoring cache operations.
 
@@ -124,6 +407,56 @@ class RedisTaggedCache:
         - userdata: Optional custom data passed through the decorator
     """
 
+    cache_hook_sample_rate: float = 1.0
+    """Ratio (between 0.0 and 1.0) of cache decorator calls given to the cache hook.
+
+    For example, with 0.01, the hook is called for 1% of the calls (randomly chosen).
+    Calls which are not sampled don't even build the `CacheInfo` object.
+
+    Note: only used if `cache_hook` is set.
+    """
+
+    cache_hook_in_background: bool = False
+    """If True, the cache hook is called in a background thread (through a bounded queue).
+
+    So slow hooks (writing logs, sending metrics...) don't add latency to cache calls.
+    If the queue is full, events are dropped (see `get_cache_hook_dropped_events()`).
+
+    Note: only used if `cache_hook` is set. As the hook is called later (in another
+    thread), mutable arguments given to the hook can have changed in the meantime.
+    """
+
+    cache_hook_queue_size: int = 10000
+    """Maximum number of events waiting for the background cache hook.
+
+    Note: only used if `cache_hook_in_background` is True.
+    """
+
+    span_hook: Optional[SpanHook] = None
+    """Optional callback function for tracing cache decorator calls (span-style).
+
+    The hook function is called after each cache decorator call, once for the whole
+    call (phase: "call") and once per phase, with the following signature:
+    ```python
+    def span_hook(
+        key: str,
+        phase: str,
+        start_ns: int,
+        end_ns: int,
+        userdata: Optional[Any] = None
+    ) -> None:
+        pass
+    ```
+
+    Phases: "key", "tags", "storage_get", "lock", "unserialize", "decorated",
+    "serialize" and "storage_set" (see `rtc.app.timings`). Start and end are
+    nanoseconds since the epoch (as `time.time_ns()`), so they can be given as is
+    to most tracers (for example OpenTelemetry `start_span(start_time=...)`).
+
+    Note: the same durations are always available in `CacheInfo` (given to the
+    cache hook).
+    """
+
     serializer: Callable[[Any], Optional[bytes]] = DEFAULT_SERIALIZER
     """Function to serialize Python objects before storing in cache.
 
@@ -146,6 +479,18 @@ class RedisTaggedCache:
     __service: Optional[Service] = field(
         init=False, default=None
     )  # cache of the Service object
+    __refresh_executor: Optional[ThreadPoolExecutor] = field(
+        init=False, default=None
+    )  # created on first use
+    __connection_pool: Optional[redis.ConnectionPool] = field(
+        init=False, default=None
+    )  # pool shared by Redis adapters (created with the Service object)
+    __redis_cluster_client: Optional[Any] = field(
+        init=False, default=None
+    )  # client shared by Redis Cluster adapters (created with the Service object)
+    __hook_dispatcher: Optional[HookDispatcher] = field(
+        init=False, default=None
+    )  # (only with cache_hook_in_background, kept when the Service is rebuilt)
 
     @property
     def _service(self) -> Service:
@@ -154,10 +499,35 @@ class RedisTaggedCache:
                 self.__service = self._make_service()
             return self.__service
 
-    def _make_service(self) -> Service:
-        metadata_adapter: MetadataPort
-        storage_adapter: StoragePort
-        redis_kwargs = {
+    def _get_redis_cluster_client(self) -> Any:
+        """Return the RedisCluster client shared by Redis Cluster adapters."""
+        if self.__redis_cluster_client is None:
+            kwargs: Dict[str, Any] = {
+                "host": self.host,
+                "port": self.port,
+                "ssl": self.ssl,
+                "socket_timeout": self.socket_timeout,
+                "socket_connect_timeout": self.socket_connect_timeout,
+            }
+            # (only when set, for compatibility with old redis-py versions)
+            if self.socket_keepalive:
+                kwargs["socket_keepalive"] = True
+            if self.health_check_interval > 0:
+                kwargs["health_check_interval"] = self.health_check_interval
+            if self.protocol != 2:
+                kwargs["protocol"] = self.protocol
+            if self.max_connections is not None:
+                kwargs["max_connections"] = self.max_connections
+            if not REDIS_CLUSTER_AVAILABLE:
+                raise ValueError(
+                    "redis.cluster is not available (redis>=4.1.0 is required)"
+                )
+            self.__redis_cluster_client = RedisCluster(**kwargs)
+        return self.__redis_cluster_client
+
+    def _get_connection_kwargs(self) -> Dict[str, Any]:
+        """Return redis.Redis() keyword arguments for the connection settings."""
+        connection_kwargs: Dict[str, Any] = {
             "host": self.host,
             "port": self.port,
             "db": self.db,
@@ -165,22 +535,161 @@ class RedisTaggedCache:
             "socket_timeout": self.socket_timeout,
             "socket_connect_timeout": self.socket_connect_timeout,
         }
+        # (only when set, for compatibility with old redis-py versions)
+        if self.unix_socket_path is not None:
+            connection_kwargs["unix_socket_path"] = self.unix_socket_path
+        if self.socket_keepalive:
+            connection_kwargs["socket_keepalive"] = True
+        if self.health_check_interval > 0:
+            connection_kwargs["health_check_interval"] = self.health_check_interval
+        if self.protocol != 2:
+            connection_kwargs["protocol"] = self.protocol
+        return connection_kwargs
+
+    def _get_replica_router(
+        self, redis_kwargs: Dict[str, Any]
+    ) -> Optional[RedisReplicaRouter]:
+        """Return the replica router shared by Redis adapters (if any)."""
+        if not self.read_replicas or not redis_kwargs:
+            return None
+        replicas_redis_kwargs: List[Dict[str, Any]] = []
+        for host, port in self.read_replicas:
+            kwargs = self._get_connection_kwargs()
+            kwargs.pop("unix_socket_path", None)
+            kwargs.update({"host": host, "port": port})
+            if self.max_connections is not None:
+                kwargs["max_connections"] = self.max_connections
+            replicas_redis_kwargs.append(kwargs)
+        return RedisReplicaRouter(
+            redis_kwargs,
+            replicas_redis_kwargs,
+            strategy=self.read_replicas_strategy,
+            check_interval=self.read_replicas_check_interval,
+            wait_timeout=self.read_replicas_wait_timeout,
+        )
+
+    def _get_redis_kwargs(self) -> Dict[str, Any]:
+        """Return keyword arguments for the Redis adapters (with a shared pool)."""
+        if self.disabled or self.in_local_memory or self.cluster:
+            return {}
+        pool = self.connection_pool
+        if pool is None:
+            pool = make_connection_pool(
+                self._get_connection_kwargs(),
+                max_connections=self.max_connections,
+                blocking_timeout=self.connection_pool_blocking_timeout,
+                hook=self.connection_pool_hook,
+            )
+        self.__connection_pool = pool
+        return {"connection_pool": pool}
+
+    def _get_cache_hook(self) -> Optional[CacheHook]:
+        """Return the cache hook for the Service object (wrapped if called in background)."""
+        if self.cache_hook is None or not self.cache_hook_in_background:
+            return self.cache_hook
+        if self.__hook_dispatcher is None or self.__hook_dispatcher.hook is not (
+            self.cache_hook
+        ):
+            self.__hook_dispatcher = HookDispatcher(
+                self.cache_hook, max_queue_size=self.cache_hook_queue_size
+            )
+        return self.__hook_dispatcher
+
+    def _make_service(self) -> Service:
+        metadata_adapter: MetadataPort
+        storage_adapter: StoragePort
+        combined_read_adapter: Optional[CombinedReadPort] = None
+        redis_kwargs = self._get_redis_kwargs()
+        replica_router = self._get_replica_router(redis_kwargs)
         if self._forced_metadata_adapter:
             metadata_adapter = self._forced_metadata_adapter
         elif self.disabled:
             metadata_adapter = BlackHoleMetadataAdapter()
         elif self.in_local_memory:
             metadata_adapter = DictMetadataAdapter()
+        elif self.cluster:
+            metadata_adapter = RedisClusterMetadataAdapter(
+                _redis_client=self._get_redis_cluster_client()
+            )
         else:
-            metadata_adapter = RedisMetadataAdapter(redis_kwargs)
+            metadata_adapter = RedisMetadataAdapter(
+                redis_kwargs,
+                client_tracking=self.tags_client_tracking,
+                client_tracking_max_size=self.tags_client_tracking_max_size,
+                replica_router=replica_router
+                if self.read_replicas_for_tags and not self.tags_client_tracking
+                else None,
+            )
+        if self.tags_local_cache_max_staleness is not None and not self.disabled:
+            metadata_adapter = CachedMetadataAdapter(
+                metadata_adapter,
+                max_staleness=self.tags_local_cache_max_staleness,
+                max_size=self.tags_local_cache_max_size,
+            )
         if self._forced_storage_adapter:
             storage_adapter = self._forced_storage_adapter
         elif self.disabled:
             storage_adapter = BlackHoleStorageAdapter()
         elif self.in_local_memory:
-            storage_adapter = DictStorageAdapter()
+            storage_adapter = DictStorageAdapter(
+                max_entries=self.in_local_memory_max_entries,
+                max_bytes=self.in_local_memory_max_bytes,
+            )
+        elif self.cluster:
+            storage_adapter = RedisClusterStorageAdapter(
+                _redis_client=self._get_redis_cluster_client()
+            )
         else:
-            storage_adapter = RedisStorageAdapter(redis_kwargs)
+            storage_adapter = RedisStorageAdapter(
+                redis_kwargs, replica_router=replica_router
+            )
+        if self.disk_path is not None and not self.disabled:
+            storage_adapter = TieredStorageAdapter(
+                upper=storage_adapter,
+                lower=SQLiteStorageAdapter(
+                    path=self.disk_path, max_bytes=self.disk_max_bytes
+                ),
+                upper_max_lifetime=self.default_lifetime or 0,
+                upper_max_value_size=self.disk_redis_max_value_size,
+            )
+        if (
+            self.shared_memory_path is not None
+            and not self.disabled
+            and not self.in_local_memory
+        ):
+            try:
+                shared_memory_adapter = SharedMemoryStorageAdapter(
+                    path=self.shared_memory_path, size_in_bytes=self.shared_memory_size
+                )
+            except (ValueError, OSError):
+                # (raised at each call otherwise, as the Service is not built)
+                LOGGER.warning(
+                    "can't use the shared memory file %s => values not shared",
+                    self.shared_memory_path,
+                    exc_info=True,
+                )
+            else:
+                storage_adapter = TieredStorageAdapter(
+                    upper=shared_memory_adapter,
+                    lower=storage_adapter,
+                    upper_max_lifetime=self.shared_memory_ttl,
+                )
+        if self.values_local_cache_max_bytes is not None and not self.disabled:
+            storage_adapter = CachedStorageAdapter(
+                storage_adapter,
+                max_bytes=self.values_local_cache_max_bytes,
+                max_entries=self.values_local_cache_max_entries,
+                ttl=self.values_local_cache_ttl,
+            )
+        if (
+            self.single_round_trip_reads
+            and not self.cluster
+            and replica_router is None
+            and isinstance(metadata_adapter, RedisMetadataAdapter)
+            and not metadata_adapter.client_tracking
+            and isinstance(storage_adapter, RedisStorageAdapter)
+        ):
+            combined_read_adapter = RedisCombinedReadAdapter(redis_kwargs)
         return Service(
             namespace=self.namespace,
             metadata_service=MetadataService(
@@ -193,15 +702,135 @@ class RedisTaggedCache:
                 adapter=storage_adapter,
                 default_lifetime=self.default_lifetime or 0,
             ),
-            cache_hook=self.cache_hook,
+            cache_hook=self._get_cache_hook(),
+            cache_hook_sample_rate=self.cache_hook_sample_rate,
+            span_hook=self.span_hook,
             serializer=self.serializer,
             unserializer=self.unserializer,
+            combined_read_adapter=combined_read_adapter,
         )
 
+    @property
+    def _refresh_executor(self) -> ThreadPoolExecutor:
+        with self._internal_lock:
+            if self.__refresh_executor is None:
+                self.__refresh_executor = ThreadPoolExecutor(
+                    max_workers=self.refresh_max_workers,
+                    thread_name_prefix="rtc-refresh",
+                )
+            return self.__refresh_executor
+
     def _rebuild_service(self):
         with self._internal_lock:
             self.__service = None
 
+    def get_tags_local_cache_stats(self) -> Optional[LocalCacheStats]:
+        """Return statistics about the process memory cache of tag values.
+
+        None is returned if this cache is not enabled (see `tags_local_cache_max_staleness`
+        and `tags_client_tracking`).
+
+        """
+        adapter = self._service.metadata_service.adapter
+        if isinstance(adapter, CachedMetadataAdapter):
+            return adapter.stats
+        if isinstance(adapter, RedisMetadataAdapter):
+            return adapter.tracker_stats
+        return None
+
+    def get_connection_pool_stats(self) -> Optional[ConnectionPoolStats]:
+        """Return statistics about the Redis connection pool.
+
+        None is returned if Redis is not used (`disabled` or `in_local_memory`), if
+        an external (not instrumented) `connection_pool` is used or if the cache was
+        not used yet.
+
+        """
+        with self._internal_lock:
+            pool = self.__connection_pool
+        if isinstance(
+            pool, (InstrumentedConnectionPool, InstrumentedBlockingConnectionPool)
+        ):
+            return pool.get_stats()
+        return None
+
+    def get_cache_hook_dropped_events(self) -> int:
+        """Return the number of cache hook events dropped because the queue was full.
+
+        Note: always 0 if `cache_hook_in_background` is False.
+
+        """
+        with self._internal_lock:
+            dispatcher = self.__hook_dispatcher
+        return dispatcher.dropped if dispatcher is not None else 0
+
+    def flush_cache_hook(self) -> None:
+        """Wait for all cache hook events to be processed (if `cache_hook_in_background`)."""
+        with self._internal_lock:
+            dispatcher = self.__hook_dispatcher
+        if dispatcher is not None:
+            dispatcher.flush()
+
+    def get_values_local_cache_stats(self) -> Optional[LocalCacheStats]:
+        """Return statistics about the process memory cache of stored values.
+
+        None is returned if this cache is not enabled (see `values_local_cache_max_bytes`).
+
+        """
+        adapter = self._service.storage_service.adapter
+        if isinstance(adapter, CachedStorageAdapter):
+            return adapter.stats
+        return None
+
+    def get_local_memory_stats(self) -> Optional[LocalCacheStats]:
+        """Return statistics about values stored in process memory.
+
+        None is returned if `in_local_memory` is False.
+
+        """
+        adapter = self._service.storage_service.adapter
+        if isinstance(adapter, CachedStorageAdapter):
+            adapter = adapter.adapter
+        if isinstance(adapter, TieredStorageAdapter):  # (see `disk_path`)
+            adapter = adapter.upper
+        if isinstance(adapter, DictStorageAdapter):
+            return adapter.stats
+        return None
+
+    def get_disk_stats(self) -> Optional[LocalCacheStats]:
+        """Return statistics about values stored in the local database.
+
+        None is returned if `disk_path` is not set. Note: entries and size are
+        shared by all processes using the database, other counters are only
+        about the current process.
+
+        """
+        adapter = self._service.storage_service.adapter
+        while isinstance(adapter, (CachedStorageAdapter, TieredStorageAdapter)):
+            if isinstance(adapter, CachedStorageAdapter):
+                adapter = adapter.adapter
+            elif isinstance(adapter.lower, SQLiteStorageAdapter):
+                return adapter.lower.stats
+            else:
+                adapter = adapter.lower
+        return None
+
+    def get_shared_memory_stats(self) -> Optional[LocalCacheStats]:
+        """Return statistics about values stored in the shared memory file.
+
+        None is returned if `shared_memory_path` is not set (or if the file can't be
+        used). Note: statistics are shared by all processes using the file.
+
+        """
+        adapter = self._service.storage_service.adapter
+        if isinstance(adapter, CachedStorageAdapter):
+            adapter = adapter.adapter
+        if isinstance(adapter, TieredStorageAdapter) and isinstance(
+            adapter.upper, SharedMemoryStorageAdapter
+        ):
+            return adapter.upper.stats
+        return None
+
     def set(
         self,
         key: str,
@@ -269,6 +898,74 @@ class RedisTaggedCache:
         """
         return self._service.get(key, tags)
 
+    def set_many(
+        self,
+        entries: Iterable[Tuple[str, Any, Optional[Iterable[str]]]],
+        lifetime: Optional[int] = None,
+    ) -> bool:
+        """Store many values in the cache with optional tags and a common lifetime.
+
+        All tag values are read in a single round trip (tags are de-duplicated between
+        entries) and all values are stored in a single round trip.
+
+        Args:
+            entries: Iterable of (key, value, tags) tuples (tags can be None)
+            lifetime: Optional TTL in seconds (if set: overrides default_lifetime, 0 means no expiration)
+
+        Returns:
+            bool: True if all values were successfully stored, False otherwise
+
+        Example:
+            ```python
+            cache.set_many(
+                [
+                    ("user:123", user123_data, ["user", "user:123"]),
+                    ("user:456", user456_data, ["user", "user:456"]),
+                ],
+                lifetime=3600,
+            )
+            ```
+        """
+        return self._service.set_many(entries, lifetime)
+
+    def delete_many(
+        self, entries: Iterable[Tuple[str, Optional[Iterable[str]]]]
+    ) -> int:
+        """Remove many entries from the cache.
+
+        Args:
+            entries: Iterable of (key, tags) tuples (for consistency, tags should match set() tags)
+
+        Returns:
+            int: The number of entries really deleted
+        """
+        return self._service.delete_many(entries)
+
+    def get_many(
+        self, entries: Iterable[Tuple[str, Optional[Iterable[str]]]]
+    ) -> Dict[str, Any]:
+        """Retrieve many values from the cache.
+
+        All tag values are read in a single round trip (tags are de-duplicated between
+        entries) and all values are read in a single round trip.
+
+        Args:
+            entries: Iterable of (key, tags) tuples (for consistency, tags should match set() tags)
+
+        Returns:
+            A dict key => value with only the found and valid entries (cache misses are not in the dict)
+
+        Example:
+            ```python
+            values = cache.get_many(
+                [("user:123", ["user", "user:123"]), ("user:456", ["user", "user:456"])]
+            )
+            if "user:123" not in values:
+                values["user:123"] = compute_user_data(123)
+            ```
+        """
+        return self._service.get_many(entries)
+
     def invalidate(self, tags: Union[str, Iterable[str]]) -> bool:
         """Invalidate all cache entries associated with the given tag(s).
 
@@ -320,6 +1017,9 @@ class RedisTaggedCache:
         lock_timeout: int = 5,
         serializer: Optional[Callable[[Any], Optional[bytes]]] = None,
         unserializer: Optional[Callable[[bytes], Any]] = None,
+        stale_while_revalidate: int = 0,
+        early_refresh_beta: float = 0.0,
+        single_flight: bool = False,
     ) -> Callable:
         """Decorator for automatically caching function results.
 
@@ -340,6 +1040,31 @@ class RedisTaggedCache:
             lock_timeout: Lock timeout in seconds (default: 5)
             serializer: Optional custom serializer for this function
             unserializer: Optional custom unserializer for this function
+            stale_while_revalidate: If > 0 (in seconds), when the value is expired or
+                invalidated, the previously computed value is returned immediately
+                and refreshed in background (see `refresh_max_workers`). The previous
+                value is returned during at most stale_while_revalidate seconds
+                after the first stale read following the invalidation or the
+                expiration (invalidate_all() removes it). Note: the previous value
+                is a second (untagged) copy, so each write of the decorator costs
+                one more storage write.
+            early_refresh_beta: If > 0 (1.0 is a good default), the value is
+                probabilistically recomputed before its expiration (XFetch algorithm).
+                The probability increases when the expiration gets closer and when
+                the computation is slow, so a single caller usually refreshes the
+                value before the expiration (without any lock). If
+                `stale_while_revalidate` is also set, the early refresh is done in
+                background (and the cached value is returned).
+            single_flight: If True, concurrent calls (in the same process) with the
+                same key and tags are coalesced: only the first one reads the cache
+                (and computes the value in case of miss, with the lock if `lock` is
+                set), the other ones wait for its result. Each caller gets its own
+                (unserialized) copy of the value: if the value can't be serialized
+                (or in case of cache error), waiting callers call the function
+                themselves. If the first call raises an exception, waiting callers
+                raise a copy of it (with the original one as the cause). It can be
+                used with or without `lock` (which protects against stampedes
+                between processes).
 
         Returns:
             A decorator function that can be applied to methods or functions
@@ -370,6 +1095,12 @@ class RedisTaggedCache:
             @cache.decorator(lock=True, lock_timeout=10)
             def expensive_computation() -> dict:
                 return perform_slow_calculation()
+
+            # Return the previous value (and refresh it in background) for
+            # up to 60s after its expiration/invalidation
+            @cache.decorator(tags=["user"], stale_while_revalidate=60)
+            def expensive_computation2() -> dict:
+                return perform_slow_calculation()
             ```
 
         Note:
@@ -387,6 +1118,12 @@ class RedisTaggedCache:
             hook_userdata=hook_userdata,
             tags=tags,
             lifetime=lifetime,
+            stale_while_revalidate=stale_while_revalidate,
+            early_refresh_beta=early_refresh_beta,
+            single_flight=single_flight,
+            refresh_executor=self._refresh_executor
+            if stale_while_revalidate > 0
+            else None,
         )
 
     def function_decorator(self, *args, **kwargs):
@@ -1,11 +1,18 @@
-from typing import Any, Iterable, List
+import inspect
+import json
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Iterable, List, Optional
 
 import pytest
 
-from rtc.app.decorator import cache_decorator
+from rtc.app.decorator import _should_refresh_early, cache_decorator
+from rtc.app.hash import short_hash
 from rtc.app.metadata import MetadataPort, MetadataService
 from rtc.app.service import Service
 from rtc.app.storage import StoragePort, StorageService
+from rtc.app.tags import SPECIAL_ALL_TAG_NAME, TagSet
 from rtc.app.types import CacheInfo
 from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
 from rtc.infra.adapters.storage.dict import DictStorageAdapter
@@ -186,3 +193,384 @@ def test_bad_cache_hook(service: Service):
     assert service.delete("called") is True
     decorated("foo", 1, bar="baz")
     assert service.get_bytes("called") is None
+
+
+def _collect_cache_infos(
+    service: Service, cache_keys: Optional[List[str]] = None
+) -> List[CacheInfo]:
+    cache_infos: List[CacheInfo] = []
+
+    def cache_hook(
+        cache_key: str,
+        cache_tags: Iterable[str],
+        cache_info: CacheInfo,
+        userdata: Any = None,
+    ):
+        if cache_keys is not None:
+            cache_keys.append(cache_key)
+        cache_infos.append(cache_info)
+
+    service.cache_hook = cache_hook
+    return cache_infos
+
+
+def test_key_compatibility(service: Service):
+    cache_keys: List[str] = []
+    cache_infos = _collect_cache_infos(service, cache_keys)
+
+    class A:
+        @cache_decorator(service=service)
+        def decorated(self, *args, **kwargs):
+            return 1
+
+    A().decorated(1, "2", foo={"b": 1, "a": [1, 2]}, bar="baz")
+    A().decorated(1, "2", bar="baz", foo={"a": [1, 2], "b": 1})
+    # the key must stay the same than in previous versions (not to lose
+    # cached values when upgrading)
+    expected = short_hash(
+        json.dumps(
+            [
+                [inspect.getfile(A.decorated), "A", "decorated"],
+                (1, "2"),
+                {"foo": {"b": 1, "a": [1, 2]}, "bar": "baz"},
+            ],
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    assert cache_keys == [expected, expected]
+    assert [x.hit for x in cache_infos] == [False, True]
+    assert cache_infos[1].class_name == "A"
+    assert cache_infos[1].function_name == "decorated"
+    assert cache_infos[1].method_decorator
+    assert cache_infos[1].serialized_size > 0
+
+
+def test_stale_while_revalidate(service: Service):
+    cache_infos = _collect_cache_infos(service)
+    calls: List[int] = []
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    @cache_decorator(
+        service=service,
+        tags=["tag1"],
+        stale_while_revalidate=60,
+        refresh_executor=executor,
+    )
+    def decorated():
+        calls.append(1)
+        return len(calls)
+
+    assert decorated() == 1
+    assert decorated() == 1
+    service.invalidate_tags(["tag1"])
+    # the stale value is returned (and refreshed in background)
+    assert decorated() == 1
+    executor.shutdown(wait=True)
+    assert len(calls) == 2
+    assert decorated() == 2
+    assert [(x.hit, x.stale) for x in cache_infos] == [
+        (False, False),
+        (True, False),
+        (True, True),
+        (True, False),
+    ]
+    # invalidate_all() also removes the stale value
+    service.invalidate_all()
+    assert decorated() == 3
+
+
+class NoRefreshExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):  # type: ignore
+        return Future()
+
+
+def test_stale_while_revalidate_window(service: Service):
+    # (no refresh here: the stale value is only returned during
+    # stale_while_revalidate seconds, even with a long lifetime)
+    calls: List[int] = []
+
+    @cache_decorator(
+        service=service,
+        tags=["tag1"],
+        lifetime=3600,
+        stale_while_revalidate=1,
+        refresh_executor=NoRefreshExecutor(),
+    )
+    def decorated():
+        calls.append(1)
+        return len(calls)
+
+    assert decorated() == 1
+    service.invalidate_tags(["tag1"])
+    assert decorated() == 1
+    time.sleep(0.5)
+    assert decorated() == 1
+    time.sleep(0.7)
+    assert decorated() == 2
+
+
+def test_stale_while_revalidate_without_executor(service: Service):
+    with pytest.raises(ValueError):
+        cache_decorator(service=service, stale_while_revalidate=60)
+
+
+def test_should_refresh_early():
+    now = time.time()
+    assert not _should_refresh_early(now + 3600, 0.1, 1.0)
+    assert _should_refresh_early(now - 1, 0.1, 1.0)
+    assert not _should_refresh_early(0.0, 0.1, 1.0)  # no expiration
+    assert not _should_refresh_early(now - 1, 0.1, 0.0)  # disabled
+
+
+def test_early_refresh(service: Service):
+    cache_infos = _collect_cache_infos(service)
+    calls: List[int] = []
+
+    # with a huge beta, the value is always refreshed early
+    @cache_decorator(service=service, lifetime=3600, early_refresh_beta=1e12)
+    def decorated():
+        time.sleep(0.001)
+        calls.append(1)
+        return len(calls)
+
+    assert decorated() == 1
+    assert decorated() == 2
+    assert [(x.hit, x.early_refresh) for x in cache_infos] == [
+        (False, False),
+        (False, True),
+    ]
+
+    # with a small beta, the value is not refreshed before its expiration
+    @cache_decorator(service=service, lifetime=3600, early_refresh_beta=1.0)
+    def decorated2():
+        calls.append(1)
+        return len(calls)
+
+    assert decorated2() == 3
+    assert decorated2() == 3
+
+
+def test_early_refresh_stale_while_revalidate(service: Service):
+    cache_infos = _collect_cache_infos(service)
+    calls: List[int] = []
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    @cache_decorator(
+        service=service,
+        lifetime=3600,
+        early_refresh_beta=1e12,
+        stale_while_revalidate=60,
+        refresh_executor=executor,
+    )
+    def decorated():
+        time.sleep(0.001)
+        calls.append(1)
+        return len(calls)
+
+    assert decorated() == 1
+    # the cached value is returned (and refreshed in background)
+    assert decorated() == 1
+    executor.shutdown(wait=True)
+    assert len(calls) == 2
+    assert [(x.hit, x.early_refresh) for x in cache_infos] == [
+        (False, False),
+        (True, True),
+    ]
+
+
+def test_early_refresh_without_envelope(service: Service):
+    @cache_decorator(service=service, key=lambda: "key")
+    def decorated():
+        return "old"
+
+    @cache_decorator(service=service, key=lambda: "key", early_refresh_beta=1.0)
+    def decorated2():
+        return "new"
+
+    assert decorated() == "old"
+    # values written without early refresh are still readable
+    assert decorated2() == "old"
+
+
+def _run_concurrently(func, started: threading.Event, release: threading.Event):
+    results: List[Any] = []
+
+    def _call():
+        try:
+            results.append(func())
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=_call)]
+    threads[0].start()
+    assert started.wait(5)  # the first call is in progress
+    threads += [threading.Thread(target=_call) for _ in range(9)]
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.1)  # let the other calls join the in-flight one
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.mark.parametrize("lock", [False, True])
+def test_single_flight(service: Service, lock: bool):
+    cache_infos = _collect_cache_infos(service)
+    calls: List[int] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache_decorator(service=service, tags=["tag1"], lock=lock, single_flight=True)
+    def decorated():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        return {"value": len(calls)}
+
+    results = _run_concurrently(decorated, started, release)
+    assert len(calls) == 1
+    assert results == [{"value": 1}] * 10
+    # each caller gets its own copy
+    assert len({id(x) for x in results}) == 10
+    assert (
+        sorted((x.hit, x.coalesced) for x in cache_infos)
+        == [(False, False)] + [(True, True)] * 9
+    )
+    # the in-flight call is forgotten when done
+    service.invalidate_tags(["tag1"])
+    assert decorated() == {"value": 2}
+
+
+def test_single_flight_exception(service: Service):
+    calls: List[int] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache_decorator(service=service, single_flight=True)
+    def decorated():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        raise ValueError("foo")
+
+    results = _run_concurrently(decorated, started, release)
+    assert len(calls) == 1
+    assert len(results) == 10
+    assert all(isinstance(x, ValueError) for x in results)
+    # each caller gets its own exception (the first call one is the cause)
+    assert len({id(x) for x in results}) == 10
+    causes = {id(x.__cause__) for x in results if x.__cause__ is not None}
+    assert len(causes) == 1
+    assert sum(1 for x in results if x.__cause__ is None) == 1
+
+
+def test_single_flight_not_serializable(service: Service):
+    calls: List[int] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache_decorator(service=service, single_flight=True, serializer=lambda value: None)
+    def decorated():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        return {"value": 1}
+
+    results = _run_concurrently(decorated, started, release)
+    # no copy to share => waiting callers call the function themselves
+    assert len(calls) == 10
+    assert results == [{"value": 1}] * 10
+    assert len({id(x) for x in results}) == 10
+
+
+def test_prepared_tag_sets(
+    service: Service, metadata_adapter: MetadataPort, monkeypatch
+):
+    seen: List[Any] = []
+    original = metadata_adapter.get_or_set_tag_values
+
+    def spy(namespace: str, tag_names: Iterable[str], lifetime: Any):
+        seen.append(tag_names)
+        return original(namespace, tag_names, lifetime)
+
+    monkeypatch.setattr(metadata_adapter, "get_or_set_tag_values", spy)
+
+    @cache_decorator(service=service, tags=["tag2", "tag1"])
+    def decorated():
+        return 1
+
+    @cache_decorator(service=service, tags=lambda i: [f"tag{i}"])
+    def decorated_dynamic(i: int):
+        return i
+
+    decorated()
+    decorated()
+    decorated_dynamic(1)
+    decorated_dynamic(1)
+    decorated_dynamic(2)
+    # always the same (precomputed) sorted tag set for the same tags
+    assert all(isinstance(x, TagSet) for x in seen)
+    assert len({id(x) for x in seen}) == 3
+    assert list(seen[-1]) == sorted(["tag2", SPECIAL_ALL_TAG_NAME])
+
+
+@pytest.mark.parametrize("lock", [False, True])
+def test_phase_timings(service: Service, lock: bool):
+    cache_infos = _collect_cache_infos(service)
+    spans: List[Any] = []
+
+    def span_hook(
+        cache_key: str, phase: str, start_ns: int, end_ns: int, userdata: Any = None
+    ):
+        spans.append((phase, start_ns, end_ns, userdata))
+
+    service.span_hook = span_hook
+
+    @cache_decorator(service=service, tags=["tag1"], lock=lock, hook_userdata="foo")
+    def decorated(i: int) -> int:
+        time.sleep(0.01)
+        return i
+
+    before = time.time_ns()
+    decorated(1)
+    decorated(1)
+    after = time.time_ns()
+    miss, hit = cache_infos
+    for cache_info in (miss, hit):
+        assert cache_info.key_elapsed_ns > 0
+        assert cache_info.tags_elapsed_ns > 0
+        assert cache_info.storage_get_elapsed_ns > 0
+    assert miss.serialize_elapsed_ns > 0
+    assert miss.storage_set_elapsed_ns > 0
+    assert miss.unserialize_elapsed_ns == 0
+    assert (miss.lock_elapsed_ns > 0) is lock
+    assert hit.unserialize_elapsed_ns > 0
+    assert hit.serialize_elapsed_ns == 0
+    assert hit.storage_set_elapsed_ns == 0
+    assert hit.lock_elapsed_ns == 0
+    phases = [x[0] for x in spans]
+    expected = ["call", "key", "tags", "storage_get"]
+    if lock:
+        expected.append("lock")
+    expected += ["decorated", "serialize", "storage_set"]
+    expected += ["call", "key", "tags", "storage_get", "unserialize"]
+    assert phases == expected
+    assert all(before <= x[1] <= x[2] <= after for x in spans)
+    assert all(x[3] == "foo" for x in spans)
+    decorated_span = spans[phases.index("decorated")]
+    assert decorated_span[2] - decorated_span[1] >= 10_000_000
+    # timings are also collected without a span hook
+    service.span_hook = None
+    decorated(1)
+    assert cache_infos[-1].storage_get_elapsed_ns > 0
+
+
+def test_phase_timings_not_collected(service: Service):
+    @cache_decorator(service=service)
+    def decorated(i: int) -> int:
+        return i
+
+    assert service._get_phase_timings(service._should_call_hook()) is None
+    assert decorated(1) == 1
+    assert decorated(1) == 1
@@ -1,4 +1,13 @@
-from rtc.app.hash import get_random_bytes, short_hash
+import pytest
+
+from rtc.app.hash import (
+    get_hash_backend,
+    get_prefixed_short_hash,
+    get_random_bytes,
+    set_hash_backend,
+    short_hash,
+    short_hash_memoized,
+)
 
 
 def test_short_hash_with_string():
@@ -33,6 +42,41 @@ def test_short_hash_different_inputs():
     assert result1 != result2
 
 
+def test_get_prefixed_short_hash():
+    """Test that get_prefixed_short_hash is equivalent to short_hash(prefix + data)"""
+    prefixed_short_hash = get_prefixed_short_hash(b"prefix")
+    assert prefixed_short_hash(b"data") == short_hash(b"prefixdata")
+    assert prefixed_short_hash(b"data2") == short_hash(b"prefixdata2")
+    assert prefixed_short_hash(b"") == short_hash(b"prefix")
+
+
+def test_short_hash_memoized():
+    """Test that short_hash_memoized returns the same results than short_hash"""
+    assert short_hash_memoized("namespace") == short_hash("namespace")
+    assert short_hash_memoized("namespace") == short_hash("namespace")
+
+
+def test_hash_backends():
+    """Test hash backends switching (and memoization/prefixed hash invalidation)"""
+    md5_hash = short_hash_memoized("test")
+    prefixed_short_hash = get_prefixed_short_hash(b"prefix")
+    set_hash_backend("blake2b")
+    try:
+        assert get_hash_backend() == "blake2b"
+        blake2b_hash = short_hash("test")
+        assert blake2b_hash != md5_hash
+        assert len(blake2b_hash) == len(md5_hash)
+        assert short_hash_memoized("test") == blake2b_hash
+        assert prefixed_short_hash(b"data") == short_hash(b"prefixdata")
+        assert get_prefixed_short_hash(b"prefix")(b"data") == short_hash(b"prefixdata")
+    finally:
+        set_hash_backend("md5")
+    assert get_hash_backend() == "md5"
+    assert short_hash_memoized("test") == md5_hash
+    with pytest.raises(ValueError):
+        set_hash_backend("unknown")
+
+
 def test_get_random_bytes_type():
     """Test get_random_bytes returns bytes"""
     result = get_random_bytes()
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Any, List
+
+from rtc import CacheInfo, RedisTaggedCache
+from rtc.app.hooks import HookDispatcher
+
+
+def test_hook_dispatcher():
+    events: List[Any] = []
+
+    def hook(cache_key, cache_tags, cache_info, userdata=None):
+        events.append((cache_key, threading.current_thread().name, userdata))
+
+    dispatcher = HookDispatcher(hook)
+    for i in range(10):
+        dispatcher(f"key{i}", [], CacheInfo(), userdata=i)
+    dispatcher.flush()
+    assert [x[0] for x in events] == [f"key{i}" for i in range(10)]
+    assert {x[1] for x in events} == {"rtc-hook-dispatcher"}
+    assert [x[2] for x in events] == list(range(10))
+    assert dispatcher.dropped == 0
+    dispatcher.stop()
+    dispatcher("key", [], CacheInfo())  # (restarted)
+    dispatcher.stop()
+    assert len(events) == 11
+
+
+def test_hook_dispatcher_overflow():
+    release = threading.Event()
+    events: List[str] = []
+
+    def slow_hook(cache_key, cache_tags, cache_info, userdata=None):
+        release.wait(5)
+        events.append(cache_key)
+
+    dispatcher = HookDispatcher(slow_hook, max_queue_size=5)
+    before = time.perf_counter()
+    for i in range(100):
+        dispatcher(f"key{i}", [], CacheInfo())
+    # never blocked by the slow hook
+    assert time.perf_counter() - before < 1.0
+    release.set()
+    dispatcher.flush()
+    # (the first event can be taken by the worker before the queue is full)
+    assert 5 <= len(events) <= 6
+    assert dispatcher.dropped == 100 - len(events)
+
+
+def test_hook_dispatcher_exception(caplog):
+    def bad_hook(cache_key, cache_tags, cache_info, userdata=None):
+        raise ValueError("foo")
+
+    dispatcher = HookDispatcher(bad_hook)
+    dispatcher("key", [], CacheInfo())
+    dispatcher.flush()
+    assert "Error while calling hook" in caplog.text
+
+
+def test_lib_hook_in_background():
+    keys: List[str] = []
+    threads: List[str] = []
+
+    def hook(cache_key, cache_tags, cache_info, userdata=None):
+        keys.append(cache_key)
+        threads.append(threading.current_thread().name)
+
+    cache = RedisTaggedCache(
+        in_local_memory=True, cache_hook=hook, cache_hook_in_background=True
+    )
+
+    @cache.decorator()
+    def decorated(i: int) -> int:
+        return i
+
+    for i in range(20):
+        decorated(i)
+    cache.flush_cache_hook()
+    assert len(keys) == 20
+    assert set(threads) == {"rtc-hook-dispatcher"}
+    assert cache.get_cache_hook_dropped_events() == 0
+
+
+def test_lib_hook_sampling():
+    keys: List[str] = []
+
+    def hook(cache_key, cache_tags, cache_info, userdata=None):
+        keys.append(cache_key)
+
+    cache = RedisTaggedCache(
+        in_local_memory=True, cache_hook=hook, cache_hook_sample_rate=0.1
+    )
+
+    @cache.decorator()
+    def decorated(i: int) -> int:
+        return i
+
+    for i in range(2000):
+        decorated(i % 10)
+    assert 100 < len(keys) < 300
+    assert cache.get_cache_hook_dropped_events() == 0
+    cache = RedisTaggedCache(
+        in_local_memory=True, cache_hook=hook, cache_hook_sample_rate=0.0
+    )
+    keys.clear()
+    cache.decorator()(lambda: 1)()
+    assert keys == []
@@ -2,6 +2,7 @@ import pytest
 
 from rtc.app.hash import HASH_SIZE_IN_BYTES
 from rtc.app.metadata import MetadataPort, MetadataService
+from rtc.app.tags import SPECIAL_ALL_TAG_NAME, TagSet, TagSetMemo, get_tag_keys
 from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
 
 
@@ -34,3 +35,56 @@ def test_lock(service: MetadataService):
     lock1 = service.lock("key1", "hash1")
     assert lock1 is not None
     service.unlock("key1", "hash1", lock1)
+
+
+def test_get_metadata_hashes(service: MetadataService):
+    hashes = service.get_metadata_hashes([["tag1", "tag2"], ["tag2"], []])
+    assert hashes == [
+        service.get_metadata_hash(["tag2", "tag1"]),
+        service.get_metadata_hash(["tag2"]),
+        service.get_metadata_hash([]),
+    ]
+
+
+def test_tag_set(service: MetadataService):
+    tag_set = TagSet(["tag2", "tag1"])
+    assert list(tag_set) == ["tag2", "tag1"]
+    assert tag_set == TagSet(["tag2", "tag1"])
+    assert hash(tag_set) == hash(TagSet(["tag2", "tag1"]))
+    sorted_tag_names = service.get_sorted_tag_names(tag_set)
+    assert sorted_tag_names is tag_set.sorted_tag_names
+    assert list(sorted_tag_names) == sorted(["tag1", "tag2", SPECIAL_ALL_TAG_NAME])
+    # same metadata hash than other iterables of tag names
+    assert service.get_metadata_hash(tag_set) == service.get_metadata_hash(
+        ["tag1", "tag2"]
+    )
+    service.invalidate_tags(["tag1"])
+    assert service.get_metadata_hash(tag_set) == service.get_metadata_hash(
+        ("tag1", "tag2")
+    )
+
+
+def test_tag_set_keys():
+    calls = []
+
+    def get_key(namespace: str, tag_name: str) -> str:
+        calls.append(tag_name)
+        return f"{namespace}:{tag_name}"
+
+    tag_set = TagSet(["tag1", "tag2"])
+    assert tag_set.get_keys("ns", get_key) == ("ns:tag1", "ns:tag2")
+    assert tag_set.get_keys("ns", get_key) == ("ns:tag1", "ns:tag2")
+    assert len(calls) == 2
+    assert get_tag_keys("ns2", tag_set, get_key) == ["ns2:tag1", "ns2:tag2"]
+    assert get_tag_keys("ns2", ["tag3"], get_key) == ["ns2:tag3"]
+    assert len(calls) == 5
+
+
+def test_tag_set_memo():
+    memo = TagSetMemo(max_size=2)
+    tag_set = memo.get(["tag1"])
+    assert memo.get(("tag1",)) is tag_set
+    assert memo.get(tag_set) is tag_set
+    memo.get(["tag2"])
+    memo.get(["tag3"])  # => tag1 is evicted
+    assert memo.get(["tag1"]) is not tag_set
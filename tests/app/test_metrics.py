@@ -0,0 +1,101 @@
+import threading
+
+from rtc import CacheInfo, MetricsHook, RedisTaggedCache
+from rtc.app.metrics import (
+    HISTOGRAM_BOUNDS,
+    HISTOGRAM_BUCKETS,
+    MetricsSnapshot,
+    _bucket_index,
+    to_prometheus,
+)
+
+
+def test_bucket_index():
+    assert _bucket_index(0.0) == 0
+    assert _bucket_index(1e-6) == 0
+    assert _bucket_index(1.5e-6) == 1
+    assert _bucket_index(2e-6) == 1
+    assert _bucket_index(3e-6) == 2
+    for i, bound in enumerate(HISTOGRAM_BOUNDS):
+        assert _bucket_index(bound) == i
+        assert _bucket_index(bound * 1.01) == i + 1
+    assert _bucket_index(3600.0) == HISTOGRAM_BUCKETS
+
+
+def test_metrics_hook():
+    metrics = MetricsHook(namespace="foo")
+    cache = RedisTaggedCache(namespace="foo", in_local_memory=True, cache_hook=metrics)
+
+    @cache.decorator()
+    def decorated(i: int) -> str:
+        return "x" * 10
+
+    for i in range(10):
+        decorated(i % 5)
+    snapshot = metrics.snapshot()
+    assert snapshot.namespace == "foo"
+    assert len(snapshot.functions) == 1
+    function_metrics = next(iter(snapshot.functions.values()))
+    assert function_metrics.hits == 5
+    assert function_metrics.misses == 5
+    assert function_metrics.hit_ratio == 0.5
+    assert function_metrics.bytes_served > 50
+    assert function_metrics.elapsed.count == 10
+    assert function_metrics.decorated_elapsed.count == 5
+    assert function_metrics.lock_waiting.count == 0
+    assert 0 < function_metrics.elapsed.quantile(0.5) < 1.0
+    assert snapshot.total == function_metrics
+
+
+def test_metrics_hook_threads():
+    metrics = MetricsHook()
+    info = CacheInfo(function_name="f", hit=True, serialized_size=1, elapsed=1e-3)
+
+    def work():
+        for _ in range(1000):
+            metrics("key", [], info)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    work()  # (main thread)
+    for _ in range(2):  # (dead threads are merged only once)
+        total = metrics.snapshot().total
+        assert total.hits == 9000
+        assert total.bytes_served == 9000
+        assert total.elapsed.count == 9000
+    assert len(metrics._shards) == 1
+
+
+def test_lock_metrics():
+    metrics = MetricsHook()
+    metrics("key", [], CacheInfo(lock_full_hit=True, hit=True))
+    metrics("key", [], CacheInfo(lock_full_miss=True, lock_waiting_ms=3))
+    metrics("key", [], CacheInfo(lock_waiting_ms=20, hit=True))
+    total = metrics.snapshot().total
+    assert total.lock_full_hits == 1
+    assert total.lock_full_misses == 1
+    assert total.lock_waiting.count == 3
+    assert abs(total.lock_waiting.sum - 0.023) < 1e-9
+
+
+def test_prometheus():
+    metrics = MetricsHook(namespace="foo")
+    info = CacheInfo(
+        filepath="/app/x.py", class_name="A", function_name='m"', elapsed=3e-6
+    )
+    metrics("key", [], info)
+    text = metrics.to_prometheus()
+    labels = 'namespace="foo",file="/app/x.py",function="A.m\\""'
+    assert "# TYPE rtc_cache_hits_total counter" in text
+    assert f"rtc_cache_misses_total{{{labels}}} 1" in text
+    assert "# TYPE rtc_cache_elapsed_seconds histogram" in text
+    assert f'rtc_cache_elapsed_seconds_bucket{{{labels},le="2e-06"}} 0' in text
+    assert f'rtc_cache_elapsed_seconds_bucket{{{labels},le="4e-06"}} 1' in text
+    assert f'rtc_cache_elapsed_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"rtc_cache_elapsed_seconds_count{{{labels}}} 1" in text
+    # several namespaces => metric families are not repeated
+    text = to_prometheus([metrics.snapshot(), MetricsSnapshot(namespace="bar")])
+    assert text.count("# TYPE rtc_cache_hits_total counter") == 1
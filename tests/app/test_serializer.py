@@ -0,0 +1,54 @@
+import pickle
+
+import pytest
+
+from rtc.app.serializer import (
+    get_compressing_serializer,
+    get_compressing_unserializer,
+)
+
+BIG_VALUE = {"key": "value" * 1000, "list": list(range(100))}
+SMALL_VALUE = ["small"]
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma", "bz2"])
+def test_compressing_serializer(codec: str):
+    serializer = get_compressing_serializer(codec=codec, threshold=100)
+    unserializer = get_compressing_unserializer()
+    serialized = serializer(BIG_VALUE)
+    assert serialized is not None
+    assert len(serialized) < len(pickle.dumps(BIG_VALUE)) / 10
+    assert unserializer(serialized) == BIG_VALUE
+    serialized = serializer(SMALL_VALUE)
+    assert serialized == b"\x00" + pickle.dumps(SMALL_VALUE)
+    assert unserializer(serialized) == SMALL_VALUE
+
+
+def test_compressing_serializer_level():
+    serializer = get_compressing_serializer(codec="zlib", level=1, threshold=0)
+    serialized = serializer(BIG_VALUE)
+    assert serialized is not None
+    assert get_compressing_unserializer()(serialized) == BIG_VALUE
+
+
+def test_compressing_serializer_incompressible():
+    value = bytes(range(256))
+    serializer = get_compressing_serializer(threshold=0)
+    # compression is useless here => stored uncompressed
+    assert serializer(value) == b"\x00" + pickle.dumps(value)
+
+
+def test_mixed_codecs():
+    unserializer = get_compressing_unserializer()
+    for codec in ("zlib", "lzma", "bz2"):
+        serializer = get_compressing_serializer(codec=codec, threshold=0)
+        serialized = serializer(BIG_VALUE)
+        assert serialized is not None
+        assert unserializer(serialized) == BIG_VALUE
+    # value written by the default serializer (without header)
+    assert unserializer(pickle.dumps(BIG_VALUE)) == BIG_VALUE
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_compressing_serializer(codec="unknown")
@@ -1,8 +1,9 @@
 import time
-from typing import Any, Optional
+from typing import Any, Iterable, Optional, Tuple
 
 import pytest
 
+from rtc.app.combined import CombinedReadPort
 from rtc.app.exc import CacheMiss
 from rtc.app.metadata import MetadataPort, MetadataService
 from rtc.app.serializer import DEFAULT_SERIALIZER, DEFAULT_UNSERIALIZER
@@ -76,6 +77,32 @@ def test_basic(service: Service):
     assert service.get("key2") is None
 
 
+def test_many(service: Service):
+    assert (
+        service.set_many(
+            [
+                ("key1", "value1", ["tag1", "tag2"]),
+                ("key2", "value2", ["tag2"]),
+                ("key3", "value3", None),
+            ]
+        )
+        is True
+    )
+    assert service.get("key1", ["tag2", "tag1"]) == "value1"
+    assert service.get_many(
+        [("key1", ["tag1", "tag2"]), ("key2", ["tag2"]), ("key3", None), ("key4", [])]
+    ) == {"key1": "value1", "key2": "value2", "key3": "value3"}
+    assert service.get_many([("key1", ["tag1"]), ("key2", [])]) == {}
+    assert service.invalidate_tags(["tag1"]) is True
+    assert (
+        service.get_many_bytes([("key1", ["tag1", "tag2"]), ("key2", ["tag2"])])[0]
+        is None
+    )
+    assert service.delete_many([("key2", ["tag2"]), ("key3", None), ("key4", [])]) == 2
+    assert service.get_many([("key2", ["tag2"]), ("key3", None)]) == {}
+    assert service.get_many([]) == {}
+
+
 def test_expiration(service: Service):
     assert service.set("key1", ["value1", "value2"], ["tag1", "tag2"], 1) is True
     assert service.get("key1", ["tag2", "tag1"]) == ["value1", "value2"]
@@ -117,6 +144,17 @@ def test_bad_serializer(service: Service):
     assert service.get("key") == 3
 
 
+def test_many_bad_serializer(service: Service):
+    service.serializer = bad_serializer
+    assert (
+        service.set_many([("key1", 1, None), ("key2", 2, None), ("key3", 3, None)])
+        is False
+    )
+    assert service.get_many([("key1", None), ("key2", None), ("key3", None)]) == {
+        "key3": 3
+    }
+
+
 def test_bad_unserializer(service: Service):
     service.unserializer = bad_unserializer
     service.set_bytes("key", b"1")
@@ -124,3 +162,37 @@ def test_bad_unserializer(service: Service):
     service.set_bytes("key", b"2")
     with pytest.raises(CacheMiss):
         service.get("key")
+
+
+class UnavailableCombinedReadAdapter(CombinedReadPort):
+    def __init__(self):
+        self.calls = 0
+
+    def get_metadata_hash_and_value(
+        self,
+        namespace: str,
+        key: str,
+        sorted_tag_names: Iterable[str],
+        tags_lifetime: Optional[int],
+    ) -> Optional[Tuple[str, Optional[bytes]]]:
+        self.calls += 1
+        return None
+
+
+def test_combined_read_fallback(service: Service):
+    adapter = UnavailableCombinedReadAdapter()
+    service.combined_read_adapter = adapter
+    assert service.set_bytes("key1", b"value1", ["tag1", "tag2"]) is True
+    assert service.get_bytes("key1", ["tag2", "tag1"]) == b"value1"
+    assert adapter.calls == 1
+
+
+def test_combined_read_fallback_iterator(service: Service):
+    # (tag names given as a generator are consumed by the combined read)
+    adapter = UnavailableCombinedReadAdapter()
+    service.combined_read_adapter = adapter
+    tags = ["tag1", "tag2"]
+    assert service.set_bytes("key1", b"value1", tags) is True
+    assert service.get_bytes("key1", (tag for tag in tags)) == b"value1"
+    assert service.get_bytes("key1", reversed(tags)) == b"value1"
+    assert adapter.calls == 2
@@ -48,3 +48,10 @@ def test_basic(service: Service):
     assert service.delete("key") is False
     assert service.invalidate_tags(["tag"]) is False
     assert service.invalidate_all() is False
+
+
+def test_many(service: Service):
+    assert service.set_many([("key", "value", None)]) is False
+    assert service.get_many([("key", None)]) == {}
+    assert service.get_many_bytes([("key", None)]) == [None]
+    assert service.delete_many([("key", None)]) == 0
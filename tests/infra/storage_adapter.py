@@ -37,3 +37,33 @@ def _test_multiple_values(adapter: StoragePort):
 
 def _test_delete_nonexistent(adapter: StoragePort):
     assert adapter.delete("ns", "key1", "789") is False
+
+
+def _test_many(adapter: StoragePort):
+    adapter.set_many("ns", [("key1", "123", b"value1"), ("key2", "123", b"value2")], 10)
+    assert adapter.get_many(
+        "ns", [("key1", "123"), ("key2", "456"), ("key2", "123")]
+    ) == [
+        b"value1",
+        None,
+        b"value2",
+    ]
+    assert adapter.get_many("ns", []) == []
+    assert adapter.delete_many("ns", [("key1", "123"), ("key3", "123")]) == 1
+    assert adapter.get_many("ns", [("key1", "123"), ("key2", "123")]) == [
+        None,
+        b"value2",
+    ]
+
+
+def _test_remaining_lifetime(adapter: StoragePort):
+    adapter.set("ns", "key1", "123", b"value1", 10)
+    adapter.set("ns", "key2", "123", b"value2", 0)
+    res = adapter.get_many_with_lifetime(
+        "ns", [("key1", "123"), ("key2", "123"), ("key3", "123")]
+    )
+    assert res[0][0] == b"value1"
+    assert res[0][1] is not None
+    assert 8 < res[0][1] <= 10
+    assert res[1] == (b"value2", 0.0)
+    assert res[2] == (None, None)
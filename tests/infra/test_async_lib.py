@@ -0,0 +1,90 @@
+import asyncio
+import os
+
+import pytest
+
+from rtc import AsyncRedisTaggedCache, CacheMiss, RedisTaggedCache
+from rtc.app.hash import get_random_bytes
+
+REDIS_HOST = os.getenv("REDIS_HOST", "")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+
+
+def _instance(**kwargs) -> AsyncRedisTaggedCache:
+    if "namespace" not in kwargs:
+        kwargs["namespace"] = get_random_bytes().hex()
+    if "in_local_memory" not in kwargs:
+        kwargs["in_local_memory"] = True
+    return AsyncRedisTaggedCache(**kwargs)
+
+
+async def _test_basic(instance: AsyncRedisTaggedCache):
+    assert await instance.set("foo", b"value", tags=["tag1", "tag2"]) is True
+    assert await instance.get("foo", tags=["tag1", "tag2"]) == b"value"
+    assert await instance.delete("foo", tags=["tag1", "tag2"]) is True
+    with pytest.raises(CacheMiss):
+        await instance.get("foo", tags=["tag1", "tag2"])
+    await instance.set("foo", b"value", tags=["tag1", "tag2"])
+    assert await instance.invalidate("tag2") is True
+    with pytest.raises(CacheMiss):
+        await instance.get("foo", tags=["tag1", "tag2"])
+    await instance.set("foo", b"value", tags=["tag1"])
+    assert await instance.invalidate_all() is True
+    with pytest.raises(CacheMiss):
+        await instance.get("foo", tags=["tag1"])
+    await instance.aclose()
+
+
+def test_basic():
+    asyncio.run(_test_basic(_instance()))
+
+
+async def _test_blackhole(instance: AsyncRedisTaggedCache):
+    await instance.set("foo", b"value", tags=["tag1", "tag2"])
+    with pytest.raises(CacheMiss):
+        await instance.get("foo", tags=["tag1", "tag2"])
+    assert await instance.delete("foo", tags=["tag1", "tag2"]) is False
+    assert await instance.invalidate(["tag2"]) is True
+
+
+def test_blackhole():
+    asyncio.run(_test_blackhole(_instance(disabled=True)))
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_redis_basic():
+    asyncio.run(
+        _test_basic(_instance(in_local_memory=False, host=REDIS_HOST, port=REDIS_PORT))
+    )
+
+
+async def _test_shared_with_sync(
+    instance: AsyncRedisTaggedCache, sync_instance: RedisTaggedCache
+):
+    sync_instance.set("foo", "sync", tags=["tag1"])
+    assert await instance.get("foo", tags=["tag1"]) == "sync"
+    await instance.set("bar", "async", tags=["tag1", "tag2"])
+    assert sync_instance.get("bar", tags=["tag2", "tag1"]) == "async"
+    await instance.invalidate("tag1")
+    with pytest.raises(CacheMiss):
+        sync_instance.get("foo", tags=["tag1"])
+    sync_instance.invalidate("tag2")
+    with pytest.raises(CacheMiss):
+        await instance.get("bar", tags=["tag1", "tag2"])
+    await instance.aclose()
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_redis_shared_with_sync():
+    namespace = get_random_bytes().hex()
+    asyncio.run(
+        _test_shared_with_sync(
+            _instance(
+                namespace=namespace,
+                in_local_memory=False,
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+            ),
+            RedisTaggedCache(namespace=namespace, host=REDIS_HOST, port=REDIS_PORT),
+        )
+    )
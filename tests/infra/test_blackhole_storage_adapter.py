@@ -14,3 +14,9 @@ def test_basic(adapter: StoragePort):
     assert adapter.get("ns", "key", "123") is None
     adapter.delete("ns", "key", "123")
     assert adapter.get("ns", "key", "123") is None
+
+
+def test_many(adapter: StoragePort):
+    adapter.set_many("ns", [("key", "123", b"value")], 10)
+    assert adapter.get_many("ns", [("key", "123"), ("key2", "123")]) == [None, None]
+    assert adapter.delete_many("ns", [("key", "123")]) == 0
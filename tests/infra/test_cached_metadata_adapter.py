@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from rtc.infra.adapters.metadata.cached import CachedMetadataAdapter
+from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
+from tests.infra.metadata_adapter import (
+    _test_get_or_set_tag_values,
+    _test_invalidate_tags,
+    _test_lock,
+    _test_lock_timeout,
+    _test_lock_wait,
+)
+
+
+@pytest.fixture
+def adapter() -> CachedMetadataAdapter:
+    return CachedMetadataAdapter(DictMetadataAdapter(), max_staleness=10)
+
+
+def test_get_or_set_tag_values(adapter: CachedMetadataAdapter):
+    _test_get_or_set_tag_values(adapter)
+
+
+def test_invalidate_tags(adapter: CachedMetadataAdapter):
+    _test_invalidate_tags(adapter)
+
+
+def test_lock(adapter: CachedMetadataAdapter):
+    _test_lock(adapter)
+
+
+def test_lock_timeout(adapter: CachedMetadataAdapter):
+    _test_lock_timeout(adapter)
+
+
+def test_lock_wait(adapter: CachedMetadataAdapter):
+    _test_lock_wait(adapter)
+
+
+def test_stats(adapter: CachedMetadataAdapter):
+    values = list(adapter.get_or_set_tag_values("ns", ["tag1", "tag2"], 10))
+    assert adapter.stats.misses == 2
+    assert adapter.stats.hits == 0
+    assert adapter.stats.entries == 2
+    new_values = list(adapter.get_or_set_tag_values("ns", ["tag2", "tag3"], 10))
+    assert new_values[0] == values[1]
+    assert adapter.stats.misses == 3
+    assert adapter.stats.hits == 1
+
+
+def test_staleness():
+    wrapped = DictMetadataAdapter()
+    adapter = CachedMetadataAdapter(wrapped, max_staleness=0.5)
+    values = list(adapter.get_or_set_tag_values("ns", ["tag1"], 10))
+    # invalidation from "another process" (not seen during max_staleness)
+    wrapped.invalidate_tags("ns", ["tag1"], 10)
+    assert list(adapter.get_or_set_tag_values("ns", ["tag1"], 10)) == values
+    time.sleep(1)
+    assert list(adapter.get_or_set_tag_values("ns", ["tag1"], 10)) != values
+
+
+def test_lru_eviction():
+    adapter = CachedMetadataAdapter(DictMetadataAdapter(), max_staleness=10, max_size=2)
+    adapter.get_or_set_tag_values("ns", ["tag1", "tag2"], 10)
+    adapter.get_or_set_tag_values("ns", ["tag1"], 10)
+    adapter.get_or_set_tag_values("ns", ["tag3"], 10)
+    assert adapter.stats.evictions == 1
+    assert adapter.stats.entries == 2
+    adapter.get_or_set_tag_values("ns", ["tag1"], 10)
+    assert adapter.stats.hits == 2
+    adapter.get_or_set_tag_values("ns", ["tag2"], 10)
+    assert adapter.stats.misses == 4
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from rtc.app.storage import StoragePort
+from rtc.infra.adapters.storage.cached import CachedStorageAdapter
+from rtc.infra.adapters.storage.dict import DictStorageAdapter
+from tests.infra.storage_adapter import (
+    _test_basic,
+    _test_delete_nonexistent,
+    _test_expiration,
+    _test_many,
+    _test_multiple_values,
+    _test_no_expiration,
+)
+
+
+@pytest.fixture
+def adapter() -> StoragePort:
+    return CachedStorageAdapter(DictStorageAdapter())
+
+
+def test_basic(adapter: StoragePort):
+    _test_basic(adapter)
+
+
+def test_expiration(adapter: StoragePort):
+    _test_expiration(adapter)
+
+
+def test_no_expiration(adapter: StoragePort):
+    _test_no_expiration(adapter)
+
+
+def test_multiple_values(adapter: StoragePort):
+    _test_multiple_values(adapter)
+
+
+def test_delete_nonexistent(adapter: StoragePort):
+    _test_delete_nonexistent(adapter)
+
+
+def test_many(adapter: StoragePort):
+    _test_many(adapter)
+
+
+def test_stats():
+    wrapped = DictStorageAdapter()
+    adapter = CachedStorageAdapter(wrapped)
+    wrapped.set("ns", "key1", "123", b"value1", 10)
+    assert adapter.get("ns", "key1", "123") == b"value1"
+    assert adapter.get("ns", "key1", "123") == b"value1"
+    assert adapter.get_many("ns", [("key1", "123"), ("key2", "123")]) == [
+        b"value1",
+        None,
+    ]
+    stats = adapter.stats
+    assert stats.hits == 2
+    assert stats.misses == 2
+    assert stats.entries == 1
+    assert stats.size_in_bytes == 6
+
+
+def test_bounds():
+    wrapped = DictStorageAdapter()
+    adapter = CachedStorageAdapter(wrapped, max_bytes=10, max_entries=2)
+    adapter.set("ns", "key1", "123", b"12345", 10)
+    adapter.set("ns", "key2", "123", b"12345", 10)
+    assert adapter.stats.entries == 2
+    adapter.set("ns", "key3", "123", b"1", 10)  # evicts key1 (max_bytes)
+    assert adapter.stats.evictions == 1
+    assert adapter.stats.size_in_bytes == 6
+    adapter.set("ns", "key4", "123", b"1", 10)  # evicts key2 (max_entries)
+    assert adapter.stats.evictions == 2
+    adapter.set("ns", "key5", "123", b"12345678901", 10)  # too big
+    assert adapter.stats.entries == 2
+    # evicted or not cached values are still read from the wrapped adapter
+    assert adapter.get("ns", "key1", "123") == b"12345"
+    assert adapter.get("ns", "key5", "123") == b"12345678901"
+
+
+def test_ttl():
+    wrapped = DictStorageAdapter()
+    adapter = CachedStorageAdapter(wrapped, ttl=0.5)
+    adapter.set("ns", "key1", "123", b"value1", 10)
+    # delete from "another process" (not seen during ttl)
+    wrapped.delete("ns", "key1", "123")
+    assert adapter.get("ns", "key1", "123") == b"value1"
+    time.sleep(1)
+    assert adapter.get("ns", "key1", "123") is None
+
+
+def test_remaining_lifetime():
+    # (a value read from the wrapped adapter is not kept longer than its lifetime)
+    wrapped = DictStorageAdapter()
+    adapter = CachedStorageAdapter(wrapped, ttl=60)
+    wrapped.set("ns", "key1", "123", b"value1", 1)
+    wrapped.set("ns", "key2", "123", b"value2", 1)
+    assert adapter.get("ns", "key1", "123") == b"value1"
+    assert adapter.get_many("ns", [("key2", "123")]) == [b"value2"]
+    time.sleep(1.1)
+    assert adapter.get("ns", "key1", "123") is None
+    assert adapter.get_many("ns", [("key2", "123")]) == [None]
@@ -1,8 +1,14 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
 import pytest
 
 from rtc.app.metadata import MetadataPort
 from rtc.infra.adapters.metadata.dict import DictMetadataAdapter
 from tests.infra.metadata_adapter import (
+    _test_expiration,
     _test_get_or_set_tag_values,
     _test_invalidate_tags,
     _test_lock,
@@ -34,3 +40,69 @@ def test_lock_timeout(adapter: MetadataPort):
 
 def test_lock_wait(adapter: MetadataPort):
     _test_lock_wait(adapter)
+
+
+def test_expiration(adapter: MetadataPort):
+    _test_expiration(adapter)
+
+
+def test_invalidate_tags_no_output(capsys):
+    adapter = DictMetadataAdapter()
+    adapter.invalidate_tags("ns", ["tag1"], None)
+    assert capsys.readouterr().out == ""
+
+
+def test_lock_released_by_owner():
+    adapter = DictMetadataAdapter()
+    id1 = adapter.lock("ns", "key", "hash", 10, 1)
+    assert id1 is not None
+    results: List[Optional[str]] = []
+    waiter = threading.Thread(
+        target=lambda: results.append(adapter.lock("ns", "key", "hash", 10, 5))
+    )
+    before = time.perf_counter()
+    waiter.start()
+    time.sleep(0.1)
+    adapter.unlock("ns", "key", "hash", "bad-id")  # (not the owner => ignored)
+    adapter.unlock("ns", "key", "hash", id1)
+    waiter.join()
+    # woken up by the owner => None (the value is probably available)
+    assert results == [None]
+    assert time.perf_counter() - before < 1
+    id2 = adapter.lock("ns", "key", "hash", 10, 1)
+    assert id2 is not None
+    adapter.unlock("ns", "key", "hash", id2)
+
+
+def test_sweep():
+    adapter = DictMetadataAdapter(shards=2, expiry_sweep=False)
+    adapter.invalidate_tags("ns", ["tag1", "tag2"], 1)
+    adapter.get_or_set_tag_values("ns", ["tag3"], None)
+    assert adapter.lock("ns", "key", "hash", 1, 1) is not None
+    time.sleep(1.1)
+    adapter.sweep()
+    adapter.sweep()
+    assert sum(len(shard.tags) for shard in adapter._shards) == 1
+    assert sum(len(shard.locks) for shard in adapter._shards) == 0
+
+
+def test_no_thread_per_instance():
+    before = threading.active_count()
+    adapters = [DictMetadataAdapter() for _ in range(20)]
+    assert threading.active_count() <= before + 1  # (the shared sweeper)
+    for adapter in adapters:
+        adapter.close()
+
+
+def test_threads():
+    adapter = DictMetadataAdapter()
+    tag_names = [f"tag{i}" for i in range(100)]
+
+    def _run(_: int) -> List[bytes]:
+        return list(adapter.get_or_set_tag_values("ns", tag_names, None))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_run, range(32)))
+    # all threads must get the same values (a tag is created only once)
+    assert all(result == results[0] for result in results)
+    assert len(set(results[0])) == 100
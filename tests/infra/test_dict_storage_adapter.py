@@ -1,13 +1,19 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from rtc.app.storage import StoragePort
 from rtc.infra.adapters.storage.dict import DictStorageAdapter
+from rtc.infra.adapters.sweeper import get_shared_sweeper
 from tests.infra.storage_adapter import (
     _test_basic,
     _test_delete_nonexistent,
     _test_expiration,
+    _test_many,
     _test_multiple_values,
     _test_no_expiration,
+    _test_remaining_lifetime,
 )
 
 
@@ -34,3 +40,95 @@ def test_multiple_values(adapter: StoragePort):
 
 def test_delete_nonexistent(adapter: StoragePort):
     _test_delete_nonexistent(adapter)
+
+
+def test_many(adapter: StoragePort):
+    _test_many(adapter)
+
+
+def test_remaining_lifetime(adapter: StoragePort):
+    _test_remaining_lifetime(adapter)
+
+
+def test_lru_eviction_max_entries():
+    adapter = DictStorageAdapter(max_entries=3, shards=1, expiry_sweep=False)
+    for i in range(3):
+        adapter.set("ns", f"key{i}", "hash", b"value", 0)
+    assert adapter.get("ns", "key0", "hash") == b"value"  # (key0 is now recent)
+    adapter.set("ns", "key3", "hash", b"value", 0)
+    assert adapter.get("ns", "key1", "hash") is None
+    assert adapter.get("ns", "key0", "hash") == b"value"
+    assert adapter.get("ns", "key3", "hash") == b"value"
+    stats = adapter.stats
+    assert stats.entries == 3
+    assert stats.evictions == 1
+    assert stats.hits == 3
+    assert stats.misses == 1
+
+
+def test_lru_eviction_max_bytes():
+    adapter = DictStorageAdapter(max_bytes=100, shards=1, expiry_sweep=False)
+    for i in range(10):
+        adapter.set("ns", f"key{i}", "hash", b"x" * 30, 0)
+    stats = adapter.stats
+    assert stats.entries == 3
+    assert stats.size_in_bytes == 90
+    assert stats.evictions == 7
+    adapter.set("ns", "big", "hash", b"x" * 101, 0)  # never stored
+    assert adapter.get("ns", "big", "hash") is None
+    assert adapter.stats.size_in_bytes == 90
+    assert adapter.delete("ns", "key9", "hash")
+    assert adapter.stats.size_in_bytes == 60
+
+
+def test_sharded_bounds():
+    adapter = DictStorageAdapter(max_entries=1000, shards=8, expiry_sweep=False)
+    adapter.set_many("ns", ((f"key{i}", "hash", b"value") for i in range(5000)), 0)
+    assert 900 <= adapter.stats.entries <= 1000
+    with pytest.raises(ValueError):
+        DictStorageAdapter(shards=0)
+
+
+def test_expiry_sweep():
+    adapter = DictStorageAdapter(shards=2, expiry_sweep=False)
+    adapter.set_many("ns", ((f"key{i}", "hash", b"value") for i in range(100)), 1)
+    adapter.set("ns", "forever", "hash", b"value", 0)
+    time.sleep(1.1)
+    adapter.sweep()
+    adapter.sweep()
+    stats = adapter.stats
+    assert stats.entries == 1
+    assert stats.expired == 100
+    assert stats.size_in_bytes == len(b"value")
+    assert adapter.get("ns", "forever", "hash") == b"value"
+
+
+def test_shared_sweeper():
+    adapter = DictStorageAdapter()
+    sweeper = get_shared_sweeper()
+    adapter.set("ns", "key", "hash", b"value", 1)
+    time.sleep(1.1)
+    for _ in range(adapter.shards):
+        sweeper.sweep()
+    assert adapter.stats.entries == 0
+    adapter.close()
+
+
+def test_threads():
+    adapter = DictStorageAdapter(max_entries=500, expiry_sweep=False)
+
+    def _run(thread_index: int) -> None:
+        for i in range(2000):
+            key = f"key{(thread_index * 7 + i) % 1000}"
+            adapter.set("ns", key, "hash", key.encode(), 0)
+            value = adapter.get("ns", key, "hash")
+            assert value is None or value == key.encode()
+            adapter.delete("ns", f"key{i % 1000}", "hash")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_run, range(8)))
+    stats = adapter.stats
+    assert stats.entries <= 500
+    assert stats.size_in_bytes == sum(
+        len(value) for shard in adapter._shards for value, _ in shard.entries.values()
+    )
@@ -34,6 +34,69 @@ def test_basic(instance: RedisTaggedCache):
         instance.get("foo", tags=["tag1", "tag2"])
 
 
+def test_many(instance: RedisTaggedCache):
+    assert instance.set_many(
+        [("foo", b"value1", ["tag1", "tag2"]), ("bar", b"value2", ["tag2"])]
+    )
+    assert instance.get_many([("foo", ["tag1", "tag2"]), ("bar", ["tag2"])]) == {
+        "foo": b"value1",
+        "bar": b"value2",
+    }
+    instance.invalidate("tag1")
+    assert instance.get_many([("foo", ["tag1", "tag2"]), ("bar", ["tag2"])]) == {
+        "bar": b"value2",
+    }
+    assert instance.delete_many([("foo", ["tag1", "tag2"]), ("bar", ["tag2"])]) == 1
+    assert instance.get_many([("bar", ["tag2"])]) == {}
+
+
+def test_tags_local_cache(instance: RedisTaggedCache):
+    assert instance.get_tags_local_cache_stats() is None
+    inst = _instance(tags_local_cache_max_staleness=10)
+    inst.set("foo", b"value", tags=["tag1", "tag2"])
+    assert inst.get("foo", tags=["tag1", "tag2"]) == b"value"
+    inst.invalidate("tag1")
+    with pytest.raises(CacheMiss):
+        inst.get("foo", tags=["tag1", "tag2"])
+    stats = inst.get_tags_local_cache_stats()
+    assert stats is not None
+    assert stats.hits == 5
+    assert stats.misses == 4
+
+
+def test_values_local_cache(instance: RedisTaggedCache):
+    assert instance.get_values_local_cache_stats() is None
+    inst = _instance(values_local_cache_max_bytes=1024)
+    inst.set("foo", b"value", tags=["tag1", "tag2"])
+    assert inst.get("foo", tags=["tag1", "tag2"]) == b"value"
+    inst.invalidate("tag1")
+    with pytest.raises(CacheMiss):
+        inst.get("foo", tags=["tag1", "tag2"])
+    inst.set("foo", b"value2", tags=["tag1", "tag2"])
+    assert inst.get("foo", tags=["tag1", "tag2"]) == b"value2"
+    inst.delete("foo", tags=["tag1", "tag2"])
+    with pytest.raises(CacheMiss):
+        inst.get("foo", tags=["tag1", "tag2"])
+    stats = inst.get_values_local_cache_stats()
+    assert stats is not None
+    assert stats.hits == 2
+    assert stats.misses == 2
+
+
+def test_local_memory_stats(instance: RedisTaggedCache):
+    assert (
+        _instance(in_local_memory=False, disabled=True).get_local_memory_stats() is None
+    )
+    inst = _instance(in_local_memory_max_entries=16)
+    for i in range(100):
+        inst.set(f"foo{i}", b"value", tags=["tag1"])
+    stats = inst.get_local_memory_stats()
+    assert stats is not None
+    assert stats.entries <= 16
+    assert stats.evictions >= 84
+    assert stats.size_in_bytes > 0
+
+
 def test_blackhole():
     inst = _instance(disabled=True)
     inst.set("foo", b"value", tags=["tag1", "tag2"])
@@ -158,6 +221,24 @@ def test_dynamic_key(instance: RedisTaggedCache):
     assert instance.get("fookey", tags=["tag1", "tag2", "tag3"]) is not None
 
 
+def test_decorator_stale_while_revalidate(instance: RedisTaggedCache):
+    calls: List[int] = []
+
+    @instance.decorator(tags=["tag1"], stale_while_revalidate=60)
+    def decorated(x: int) -> int:
+        calls.append(x)
+        return len(calls)
+
+    assert decorated(1) == 1
+    instance.invalidate("tag1")
+    assert decorated(1) == 1  # stale value
+    before = time.perf_counter()
+    while decorated(1) != 2:  # refreshed in background
+        assert time.perf_counter() - before < 5
+        time.sleep(0.01)
+    assert len(calls) == 2
+
+
 def test_function_decorator_with_hook(instance: RedisTaggedCache):
     calls = []
 
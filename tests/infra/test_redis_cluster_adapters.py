@@ -0,0 +1,131 @@
+import os
+from typing import List
+
+import pytest
+from redis.crc import key_slot
+
+from rtc import RedisTaggedCache
+from rtc.app.hash import get_random_bytes
+from rtc.app.metadata import MetadataPort
+from rtc.app.storage import StoragePort
+from rtc.infra.adapters.metadata.redis_cluster import (
+    RedisClusterMetadataAdapter,
+    get_cluster_lock_keys,
+    get_cluster_tag_key,
+)
+from rtc.infra.adapters.storage.redis import get_storage_key
+from rtc.infra.adapters.storage.redis_cluster import RedisClusterStorageAdapter
+from tests.infra.metadata_adapter import (
+    _test_get_or_set_tag_values,
+    _test_invalidate_tags,
+    _test_lock,
+    _test_lock_wait,
+)
+from tests.infra.storage_adapter import (
+    _test_basic,
+    _test_many,
+    _test_remaining_lifetime,
+)
+
+REDIS_CLUSTER_HOST = os.getenv("REDIS_CLUSTER_HOST", "")
+REDIS_CLUSTER_PORT = int(os.getenv("REDIS_CLUSTER_PORT", "7000"))
+REDIS_CLUSTER_KWARGS = {"host": REDIS_CLUSTER_HOST, "port": REDIS_CLUSTER_PORT}
+
+
+def test_key_slots():
+    # all tag keys of a namespace are in the same slot
+    tag_slots = {
+        key_slot(get_cluster_tag_key("ns", f"tag{i}").encode()) for i in range(100)
+    }
+    assert len(tag_slots) == 1
+    assert key_slot(get_cluster_tag_key("ns2", "tag1").encode()) not in tag_slots
+    # lock keys of an entry are in the same slot
+    for i in range(10):
+        lock_keys = get_cluster_lock_keys("ns", f"key{i}", "hash")
+        assert len({key_slot(x.encode()) for x in lock_keys}) == 1
+    # stored values are spread
+    storage_slots = {
+        key_slot(get_storage_key("ns", f"key{i}", "hash").encode()) for i in range(100)
+    }
+    assert len(storage_slots) > 50
+
+
+def test_client_tracking_not_supported():
+    with pytest.raises(ValueError):
+        RedisClusterMetadataAdapter(REDIS_CLUSTER_KWARGS, client_tracking=True)
+
+
+@pytest.fixture
+def metadata_adapter() -> MetadataPort:
+    return RedisClusterMetadataAdapter(REDIS_CLUSTER_KWARGS)
+
+
+@pytest.fixture
+def storage_adapter() -> StoragePort:
+    return RedisClusterStorageAdapter(REDIS_CLUSTER_KWARGS)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_get_or_set_tag_values(metadata_adapter: MetadataPort):
+    _test_get_or_set_tag_values(metadata_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_invalidate_tags(metadata_adapter: MetadataPort):
+    _test_invalidate_tags(metadata_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_lock(metadata_adapter: MetadataPort):
+    _test_lock(metadata_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_lock_wait(metadata_adapter: MetadataPort):
+    _test_lock_wait(metadata_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_storage_basic(storage_adapter: StoragePort):
+    _test_basic(storage_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_storage_many(storage_adapter: StoragePort):
+    _test_many(storage_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_storage_remaining_lifetime(storage_adapter: StoragePort):
+    _test_remaining_lifetime(storage_adapter)
+
+
+@pytest.mark.skipif(REDIS_CLUSTER_HOST == "", reason="REDIS_CLUSTER_HOST is not set")
+def test_lib():
+    cache = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_CLUSTER_HOST,
+        port=REDIS_CLUSTER_PORT,
+        cluster=True,
+        single_round_trip_reads=True,  # ignored
+    )
+    assert cache._service.combined_read_adapter is None
+    calls: List[int] = []
+
+    @cache.decorator(tags=["tag1", "tag2"], lock=True)
+    def decorated(i: int) -> int:
+        calls.append(1)
+        return i
+
+    assert [decorated(i) for i in range(20)] == list(range(20))
+    assert [decorated(i) for i in range(20)] == list(range(20))
+    assert len(calls) == 20
+    cache.invalidate("tag2")
+    assert decorated(1) == 1
+    assert len(calls) == 21
+    entries = [(f"key{i}", i, ["tag1"]) for i in range(20)]
+    assert cache.set_many(entries)
+    assert cache.get_many([(f"key{i}", ["tag1"]) for i in range(20)]) == {
+        f"key{i}": i for i in range(20)
+    }
+    assert cache.delete_many([(f"key{i}", ["tag1"]) for i in range(20)]) == 20
@@ -0,0 +1,153 @@
+import os
+
+import pytest
+from redis.exceptions import ResponseError
+
+from rtc.app.hash import get_random_bytes, set_hash_backend
+from rtc.app.metadata import MetadataService
+from rtc.app.service import Service
+from rtc.app.storage import StorageService
+from rtc.infra.adapters.combined.redis import (
+    RedisCombinedReadAdapter,
+    is_scripting_unavailable,
+)
+from rtc.infra.adapters.metadata.redis import RedisMetadataAdapter
+from rtc.infra.adapters.storage.redis import RedisStorageAdapter
+
+REDIS_HOST = os.getenv("REDIS_HOST", "")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_KWARGS = {"host": REDIS_HOST, "port": REDIS_PORT}
+
+
+def _service(combined: bool) -> Service:
+    namespace = "combined"
+    return Service(
+        namespace=namespace,
+        metadata_service=MetadataService(
+            namespace=namespace, adapter=RedisMetadataAdapter(REDIS_KWARGS)
+        ),
+        storage_service=StorageService(
+            namespace=namespace, adapter=RedisStorageAdapter(REDIS_KWARGS)
+        ),
+        combined_read_adapter=RedisCombinedReadAdapter(REDIS_KWARGS)
+        if combined
+        else None,
+    )
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_same_metadata_hash():
+    classic = _service(combined=False)
+    combined = _service(combined=True)
+    tags = [get_random_bytes().hex() for _ in range(10)]
+    # the combined read creates the missing tags
+    value, metadata_hash = combined._get_bytes("key", tags)
+    assert value is None
+    assert metadata_hash == classic.metadata_service.get_metadata_hash(tags)
+    _, metadata_hash2 = combined._get_bytes("key", reversed(tags))
+    assert metadata_hash2 == metadata_hash
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_get():
+    classic = _service(combined=False)
+    combined = _service(combined=True)
+    tags = [get_random_bytes().hex(), get_random_bytes().hex()]
+    key = get_random_bytes().hex()
+    assert combined.get_bytes(key, tags) is None
+    assert classic.set_bytes(key, b"value", tags) is True
+    assert combined.get_bytes(key, tags) == b"value"
+    assert combined.get_bytes(key, tags[0:1]) is None
+    assert combined.invalidate_tags(tags[1:2]) is True
+    assert combined.get_bytes(key, tags) is None
+    assert classic.get_bytes(key, tags) is None
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_expected_metadata_hash():
+    # (the value is read by the script only if the storage key is declared)
+    classic = _service(combined=False)
+    combined = _service(combined=True)
+    adapter = combined.combined_read_adapter
+    assert isinstance(adapter, RedisCombinedReadAdapter)
+    tags = [get_random_bytes().hex()]
+    key = get_random_bytes().hex()
+    assert classic.set_bytes(key, b"value", tags) is True
+    calls = []
+    original_cmd = adapter.redis_combined_read_cmd
+
+    def _cmd(keys, args):
+        res = original_cmd(keys=keys, args=args)
+        calls.append(len(res))
+        return res
+
+    adapter._redis_combined_read_cmd = _cmd
+    assert combined.get_bytes(key, tags) == b"value"
+    assert combined.get_bytes(key, tags) == b"value"
+    assert calls == [1, 2]  # (the first read needs a second GET)
+    combined.invalidate_tags(tags)
+    assert classic.set_bytes(key, b"value2", tags) is True
+    assert combined.get_bytes(key, tags) == b"value2"
+    assert combined.get_bytes(key, tags) == b"value2"
+    assert calls == [1, 2, 1, 2]
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_scripting_not_available():
+    adapter = RedisCombinedReadAdapter(REDIS_KWARGS)
+
+    def _cmd(keys, args):
+        raise ResponseError("unknown command 'EVALSHA', with args beginning with: ")
+
+    adapter._redis_combined_read_cmd = _cmd
+    assert adapter.get_metadata_hash_and_value("ns", "key", ["tag"], 10) is None
+    assert adapter._unavailable is True
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+@pytest.mark.parametrize(
+    "script",
+    [
+        "return redis.error_reply(\"OOM command not allowed when used memory > 'maxmemory'\")",
+        'return redis.error_reply("BUSY Redis is busy running a script")',
+        "return redis.call('FOO')",
+        "redis.call('SET', KEYS[#KEYS], 'foo'); return redis.call('HGET', KEYS[#KEYS], 'f')",
+    ],
+)
+def test_script_error(script: str):
+    # (the classic read is used for this call only)
+    adapter = RedisCombinedReadAdapter(REDIS_KWARGS)
+    adapter._redis_combined_read_cmd = adapter.redis_client.register_script(script)
+    assert adapter.get_metadata_hash_and_value("ns", "key", ["tag"], 10) is None
+    assert adapter._unavailable is False
+
+
+def test_is_scripting_unavailable():
+    assert is_scripting_unavailable(
+        ResponseError("unknown command `EVALSHA`, with args beginning with: ")
+    )
+    assert is_scripting_unavailable(
+        ResponseError(
+            "NOPERM this user has no permissions to run the 'evalsha' command"
+        )
+    )
+    assert not is_scripting_unavailable(
+        ResponseError("command not allowed when used memory > 'maxmemory'.")
+    )
+    assert not is_scripting_unavailable(
+        ResponseError(
+            "WRONGTYPE Operation against a key holding the wrong kind of value "
+            "script: 1234, on @user_script:1."
+        )
+    )
+    assert not is_scripting_unavailable(ResponseError("something else"))
+
+
+def test_other_hash_backend():
+    # the combined read is only available with md5 (no redis call at all here)
+    adapter = RedisCombinedReadAdapter(REDIS_KWARGS)
+    set_hash_backend("blake2b")
+    try:
+        assert adapter.get_metadata_hash_and_value("ns", "key", ["tag"], 10) is None
+    finally:
+        set_hash_backend("md5")
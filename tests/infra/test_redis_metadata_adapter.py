@@ -1,4 +1,7 @@
 import os
+import threading
+import time
+from typing import List
 
 import pytest
 
@@ -44,3 +47,27 @@ def test_lock_timeout(adapter: MetadataPort):
 @pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
 def test_lock_wait(adapter: MetadataPort):
     _test_lock_wait(adapter)
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_lock_wake_up_all_waiters(adapter: MetadataPort):
+    lock_id = adapter.lock("ns", "key", "hash2", 10, 1)
+    assert lock_id is not None
+    elapsed: List[float] = []
+
+    def _wait():
+        before = time.perf_counter()
+        # woken up by the unlock (without acquiring the lock)
+        assert adapter.lock("ns", "key", "hash2", 10, 5) is None
+        elapsed.append(time.perf_counter() - before)
+
+    threads = [threading.Thread(target=_wait) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    adapter.unlock("ns", "key", "hash2", lock_id)
+    for thread in threads:
+        thread.join()
+    assert len(elapsed) == 10
+    # all waiters are woken up at once (not one per second)
+    assert max(elapsed) < 0.9
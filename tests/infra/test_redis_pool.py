@@ -0,0 +1,113 @@
+import os
+import threading
+from typing import List
+
+import pytest
+import redis
+
+from rtc import ConnectionPoolStats, RedisTaggedCache
+from rtc.app.hash import get_random_bytes
+from rtc.infra.adapters.redis_pool import (
+    InstrumentedBlockingConnectionPool,
+    InstrumentedConnectionPool,
+    make_connection_pool,
+)
+
+REDIS_HOST = os.getenv("REDIS_HOST", "")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+
+
+def test_make_connection_pool():
+    pool = make_connection_pool({"host": "foo", "port": 1234, "ssl": False})
+    assert isinstance(pool, InstrumentedConnectionPool)
+    assert pool.connection_class is redis.Connection
+    assert pool.connection_kwargs["host"] == "foo"
+    pool = make_connection_pool({"host": "foo", "ssl": True})
+    assert pool.connection_class is redis.SSLConnection
+    pool = make_connection_pool(
+        {"host": "foo", "port": 1234, "ssl": True, "unix_socket_path": "/tmp/foo"}
+    )
+    assert pool.connection_class is redis.UnixDomainSocketConnection
+    assert pool.connection_kwargs["path"] == "/tmp/foo"
+    assert "host" not in pool.connection_kwargs
+    pool = make_connection_pool({"host": "foo"}, blocking_timeout=1.0)
+    assert isinstance(pool, InstrumentedBlockingConnectionPool)
+    assert pool.max_connections == 50
+
+
+def test_no_connection_pool():
+    cache = RedisTaggedCache(in_local_memory=True)
+    cache.set("foo", "bar")
+    assert cache.get_connection_pool_stats() is None
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_shared_connection_pool():
+    hook_stats: List[ConnectionPoolStats] = []
+    cache = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        max_connections=10,
+        connection_pool_hook=hook_stats.append,
+    )
+    cache.set("foo", "bar", tags=["tag1"])
+    assert cache.get("foo", tags=["tag1"]) == "bar"
+    service = cache._service
+    metadata_client = service.metadata_service.adapter.redis_client  # type: ignore
+    storage_client = service.storage_service.adapter.redis_client  # type: ignore
+    assert metadata_client.connection_pool is storage_client.connection_pool
+    stats = cache.get_connection_pool_stats()
+    assert stats is not None
+    assert stats.max_connections == 10
+    assert stats.created_connections == 1
+    assert stats.in_use_connections == 0
+    assert stats.idle_connections == 1
+    assert stats.checkouts == len(hook_stats) > 0
+    assert hook_stats[-1].in_use_connections == 1
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_blocking_connection_pool():
+    cache = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        max_connections=2,
+        connection_pool_blocking_timeout=5,
+    )
+    calls: List[int] = []
+
+    @cache.decorator(lock=True)
+    def decorated():
+        calls.append(1)
+        return "value"
+
+    results: List[str] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(decorated())) for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 10
+    stats = cache.get_connection_pool_stats()
+    assert stats is not None
+    assert stats.created_connections <= 2
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_resp3():
+    cache = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        protocol=3,
+        socket_keepalive=True,
+        health_check_interval=30,
+    )
+    cache.set("foo", "bar", tags=["tag1"])
+    assert cache.get("foo", tags=["tag1"]) == "bar"
+    cache.invalidate("tag1")
+    assert cache.get_many([("foo", ["tag1"])]) == {}
@@ -0,0 +1,135 @@
+import os
+from typing import List
+
+import pytest
+
+from rtc import RedisTaggedCache
+from rtc.app.exc import StorageCacheException
+from rtc.app.hash import get_random_bytes
+from rtc.infra.adapters.metadata.redis import RedisMetadataAdapter
+from rtc.infra.adapters.redis_replicas import RedisReplicaRouter
+from rtc.infra.adapters.storage.redis import RedisStorageAdapter, get_storage_key
+from tests.infra.metadata_adapter import (
+    _test_get_or_set_tag_values,
+    _test_invalidate_tags,
+    _test_lock,
+)
+from tests.infra.storage_adapter import _test_basic, _test_many
+
+REDIS_HOST = os.getenv("REDIS_HOST", "")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_REPLICA_HOST = os.getenv("REDIS_REPLICA_HOST", "")
+REDIS_REPLICA_PORT = int(os.getenv("REDIS_REPLICA_PORT", "6380"))
+REDIS_KWARGS = {"host": REDIS_HOST, "port": REDIS_PORT}
+REDIS_REPLICA_KWARGS = {"host": REDIS_REPLICA_HOST, "port": REDIS_REPLICA_PORT}
+
+requires_replica = pytest.mark.skipif(
+    REDIS_HOST == "" or REDIS_REPLICA_HOST == "",
+    reason="REDIS_HOST or REDIS_REPLICA_HOST is not set",
+)
+
+
+def _make_router(**kwargs) -> RedisReplicaRouter:
+    return RedisReplicaRouter(REDIS_KWARGS, [REDIS_REPLICA_KWARGS], **kwargs)
+
+
+def test_router_bad_settings():
+    with pytest.raises(ValueError):
+        RedisReplicaRouter(REDIS_KWARGS, [REDIS_REPLICA_KWARGS], strategy="foo")
+    with pytest.raises(ValueError):
+        RedisReplicaRouter(REDIS_KWARGS, [])
+    with pytest.raises(ValueError):
+        RedisMetadataAdapter(
+            REDIS_KWARGS, client_tracking=True, replica_router=_make_router()
+        )
+
+
+@requires_replica
+@pytest.mark.parametrize("strategy", ["round_robin", "least_latency"])
+def test_router(strategy: str):
+    router = _make_router(strategy=strategy)
+    client = router.get_client()
+    assert client is not None
+    assert client.connection_pool.connection_kwargs["port"] == REDIS_REPLICA_PORT
+    router.mark_failed(client)
+    assert router.get_client() is None  # (until the next check)
+
+
+@requires_replica
+def test_storage_adapter():
+    adapter = RedisStorageAdapter(REDIS_KWARGS, replica_router=_make_router())
+    _test_basic(adapter)
+    _test_many(adapter)
+
+
+@requires_replica
+def test_metadata_adapter():
+    adapter = RedisMetadataAdapter(REDIS_KWARGS, replica_router=_make_router())
+    _test_get_or_set_tag_values(adapter)
+    _test_invalidate_tags(adapter)
+    _test_lock(adapter)
+
+
+@requires_replica
+def test_writes_are_replicated():
+    router = _make_router()
+    adapter = RedisStorageAdapter(REDIS_KWARGS, replica_router=router)
+    namespace = get_random_bytes().hex()
+    replica = router.get_client()
+    assert replica is not None
+    storage_key = get_storage_key(namespace, "key", "hash")
+    for _ in range(20):
+        # (no lag: the replica is up-to-date as soon as writes return)
+        adapter.set(namespace, "key", "hash", b"value1", lifetime=60)
+        assert replica.get(storage_key) == b"value1"
+        adapter.set(namespace, "key", "hash", b"value2", lifetime=60)
+        assert replica.get(storage_key) == b"value2"
+        assert adapter.delete(namespace, "key", "hash")
+        assert replica.get(storage_key) is None
+
+
+@requires_replica
+def test_unavailable_replica():
+    router = RedisReplicaRouter(
+        REDIS_KWARGS,
+        [REDIS_REPLICA_KWARGS, {"host": REDIS_REPLICA_HOST, "port": 1}],
+        wait_timeout=10,
+    )
+    adapter = RedisStorageAdapter(REDIS_KWARGS, replica_router=router)
+    namespace = get_random_bytes().hex()
+    assert router.get_client() is not None  # (first check: one replica is up)
+    # writes are done on the primary but can't be acknowledged by all replicas
+    with pytest.raises(StorageCacheException):
+        adapter.set(namespace, "key", "hash", b"value", lifetime=60)
+    # => replicas are not used anymore (reads are done on the primary)
+    assert router.get_client() is None
+    assert adapter.get(namespace, "key", "hash") == b"value"
+
+
+@requires_replica
+def test_lib():
+    cache = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        read_replicas=[(REDIS_REPLICA_HOST, REDIS_REPLICA_PORT)],
+        read_replicas_for_tags=True,
+        single_round_trip_reads=True,  # ignored
+    )
+    service = cache._service
+    assert service.combined_read_adapter is None
+    assert service.metadata_service.adapter.replica_router is not None  # type: ignore
+    calls: List[int] = []
+
+    @cache.decorator(tags=["tag1"])
+    def decorated(i: int) -> int:
+        calls.append(1)
+        return i + len(calls)
+
+    for i in range(20):
+        value = decorated(i)
+        assert decorated(i) == value
+        cache.invalidate("tag1")
+        # never a stale hit (even if values and tags are read from the replica)
+        assert decorated(i) != value
+    assert len(calls) == 40
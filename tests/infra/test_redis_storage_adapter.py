@@ -8,8 +8,10 @@ from tests.infra.storage_adapter import (
     _test_basic,
     _test_delete_nonexistent,
     _test_expiration,
+    _test_many,
     _test_multiple_values,
     _test_no_expiration,
+    _test_remaining_lifetime,
 )
 
 REDIS_HOST = os.getenv("REDIS_HOST", "")
@@ -44,3 +46,13 @@ def test_multiple_values(adapter: StoragePort):
 @pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
 def test_delete_nonexistent(adapter: StoragePort):
     _test_delete_nonexistent(adapter)
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_many(adapter: StoragePort):
+    _test_many(adapter)
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_remaining_lifetime(adapter: StoragePort):
+    _test_remaining_lifetime(adapter)
@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import time
+from typing import Iterator
+
+import pytest
+
+from rtc.infra.adapters.metadata.redis import RedisMetadataAdapter
+from tests.infra.metadata_adapter import (
+    _test_get_or_set_tag_values,
+    _test_invalidate_tags,
+)
+
+REDIS_HOST = os.getenv("REDIS_HOST", "")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+
+
+def _wait_ready(adapter: RedisMetadataAdapter):
+    assert adapter._tracker is not None
+    adapter._tracker.start()
+    before = time.perf_counter()
+    while not adapter._tracker.ready:
+        assert time.perf_counter() - before < 5
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def adapter() -> Iterator[RedisMetadataAdapter]:
+    res = RedisMetadataAdapter(
+        redis_kwargs={"host": REDIS_HOST, "port": REDIS_PORT}, client_tracking=True
+    )
+    yield res
+    res.close()
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_get_or_set_tag_values(adapter: RedisMetadataAdapter):
+    _wait_ready(adapter)
+    _test_get_or_set_tag_values(adapter)
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_invalidate_tags(adapter: RedisMetadataAdapter):
+    _wait_ready(adapter)
+    _test_invalidate_tags(adapter)
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_invalidation_by_another_client(adapter: RedisMetadataAdapter):
+    _wait_ready(adapter)
+    other = RedisMetadataAdapter(redis_kwargs={"host": REDIS_HOST, "port": REDIS_PORT})
+    values = list(adapter.get_or_set_tag_values("ns", ["tag1", "tag2"], 10))
+    assert list(adapter.get_or_set_tag_values("ns", ["tag1", "tag2"], 10)) == values
+    stats = adapter.tracker_stats
+    assert stats is not None
+    assert stats.hits == 2
+    assert stats.entries == 2
+    other.invalidate_tags("ns", ["tag1"], 10)
+    before = time.perf_counter()
+    while True:
+        new_values = list(adapter.get_or_set_tag_values("ns", ["tag1", "tag2"], 10))
+        if new_values[0] != values[0]:
+            break
+        assert time.perf_counter() - before < 5
+        time.sleep(0.01)
+    assert new_values[1] == values[1]
+    assert new_values == list(other.get_or_set_tag_values("ns", ["tag1", "tag2"], 10))
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_connection_lost(adapter: RedisMetadataAdapter):
+    _wait_ready(adapter)
+    assert adapter._tracker is not None
+    adapter.get_or_set_tag_values("ns", ["tag1"], 10)
+    assert adapter._tracker.stats.entries == 1
+    adapter.redis_client.client_kill_filter(_type="pubsub")
+    before = time.perf_counter()
+    while adapter._tracker.stats.entries != 0:
+        assert time.perf_counter() - before < 5
+        time.sleep(0.01)
+    # the tracking is re-established
+    _wait_ready(adapter)
+    _test_invalidate_tags(adapter)
+
+
+def _check_forked_adapter(adapter: RedisMetadataAdapter) -> None:
+    # (the values copied from the parent would never be invalidated)
+    assert adapter._tracker is not None
+    assert not adapter._tracker.ready
+    assert adapter._tracker.stats.entries == 0
+    _wait_ready(adapter)
+    _test_invalidate_tags(adapter)
+    adapter.close()
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_after_fork(adapter: RedisMetadataAdapter):
+    _wait_ready(adapter)
+    adapter.get_or_set_tag_values("ns", ["tag1"], 10)
+    process = multiprocessing.get_context("fork").Process(
+        target=_check_forked_adapter, args=(adapter,)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert adapter._tracker is not None
+    assert adapter._tracker.ready
+    _test_invalidate_tags(adapter)
+
+
+def test_not_ready():
+    # no server here => tag values are never stored locally
+    adapter = RedisMetadataAdapter(
+        redis_kwargs={"host": "127.0.0.1", "port": 1}, client_tracking=True
+    )
+    assert adapter._tracker is not None
+    values, generation = adapter._tracker.get("prefix", ["prefix1", "prefix2"])
+    assert values == [None, None]
+    assert generation is None
+    adapter._tracker.set(["prefix1"], [b"value"], generation)
+    stats = adapter.tracker_stats
+    assert stats is not None
+    assert stats.misses == 2
+    assert stats.entries == 0
+    adapter.close()
+
+
+def test_disabled():
+    adapter = RedisMetadataAdapter()
+    assert adapter.tracker_stats is None
+    adapter.close()
@@ -0,0 +1,308 @@
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from rtc import CacheMiss, RedisTaggedCache
+from rtc.app.exc import StorageCacheException
+from rtc.app.hash import get_random_bytes
+from rtc.app.storage import StoragePort
+from rtc.infra.adapters.storage.dict import DictStorageAdapter
+from rtc.infra.adapters.storage.shared_memory import (
+    STATS_FIELDS,
+    SharedMemoryStorageAdapter,
+)
+from rtc.infra.adapters.storage.tiered import TieredStorageAdapter
+from tests.infra.storage_adapter import (
+    _test_basic,
+    _test_delete_nonexistent,
+    _test_expiration,
+    _test_many,
+    _test_multiple_values,
+    _test_no_expiration,
+    _test_remaining_lifetime,
+)
+
+REDIS_HOST = os.getenv("REDIS_HOST", "")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+
+
+def _adapter(path: Path, **kwargs) -> SharedMemoryStorageAdapter:
+    kwargs.setdefault("size_in_bytes", 1024 * 1024)
+    kwargs.setdefault("page_size", 4096)
+    kwargs.setdefault("stripes", 2)
+    kwargs.setdefault("max_entries", 1024)
+    return SharedMemoryStorageAdapter(path=str(path), **kwargs)
+
+
+@pytest.fixture
+def adapter(tmp_path: Path) -> StoragePort:
+    return _adapter(tmp_path / "shm")
+
+
+def test_basic(adapter: StoragePort):
+    _test_basic(adapter)
+
+
+def test_expiration(adapter: StoragePort):
+    _test_expiration(adapter)
+
+
+def test_no_expiration(adapter: StoragePort):
+    _test_no_expiration(adapter)
+
+
+def test_multiple_values(adapter: StoragePort):
+    _test_multiple_values(adapter)
+
+
+def test_delete_nonexistent(adapter: StoragePort):
+    _test_delete_nonexistent(adapter)
+
+
+def test_many(adapter: StoragePort):
+    _test_many(adapter)
+
+
+def test_remaining_lifetime(adapter: StoragePort):
+    _test_remaining_lifetime(adapter)
+
+
+def test_same_path_instances(tmp_path: Path):
+    # (adapters of the same process share the same segment and locks)
+    adapters = [_adapter(tmp_path / "shm", stripes=1) for _ in range(2)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def _run(i: int) -> None:
+        adapter = adapters[i % 2]
+        for j in range(300):
+            key = f"k{i}-{j}"
+            adapter.set("ns", key, "hash", key.encode() * 10, 0)
+            value = adapter.get("ns", key, "hash")
+            assert value is None or value == key.encode() * 10
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_run, range(4)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    adapters[0].close()
+    adapters[1].set("ns", "key", "hash", b"value", 0)
+    assert adapters[1].get("ns", "key", "hash") == b"value"
+    adapters[1].close()
+    with pytest.raises(StorageCacheException):
+        adapters[1].get("ns", "key", "hash")
+    with pytest.raises(ValueError):
+        _adapter(tmp_path / "shm", stripes=1, max_entries=2048)
+
+
+def test_internal_error(adapter: SharedMemoryStorageAdapter, monkeypatch):
+    adapter.set("ns", "key", "hash", b"value", 0)
+    segment = adapter._segment
+    assert segment is not None
+
+    def _fail(*args):
+        raise IndexError("foo")
+
+    for stripe in segment.stripes:
+        monkeypatch.setattr(stripe, "set", _fail)
+    with pytest.raises(StorageCacheException):
+        adapter.set("ns", "key", "hash", b"value2", 0)
+    # (the stripe was left dirty => reset)
+    assert adapter.get("ns", "key", "hash") is None
+
+
+def test_settings_mismatch(tmp_path: Path):
+    _adapter(tmp_path / "shm").close()
+    with pytest.raises(ValueError):
+        _adapter(tmp_path / "shm", stripes=4)
+    with pytest.raises(ValueError):
+        _adapter(tmp_path / "shm", page_size=1000)
+
+
+def test_too_big_value(adapter: SharedMemoryStorageAdapter):
+    adapter.set("ns", "key", "hash", b"x" * 100, 0)
+    adapter.set("ns", "key", "hash", b"x" * 4096, 0)
+    assert adapter.get("ns", "key", "hash") is None
+    value = b"x" * (4096 - 8)
+    adapter.set("ns", "key", "hash", value, 0)
+    assert adapter.get("ns", "key", "hash") == value
+
+
+def test_eviction(tmp_path: Path):
+    # (the reference model is a dict: read values must be the last written ones)
+    adapter = _adapter(tmp_path / "shm", size_in_bytes=64 * 1024, max_entries=256)
+    rng = random.Random(42)
+    model: Dict[str, bytes] = {}
+    for i in range(5000):
+        key = f"key{rng.randrange(500)}"
+        if rng.random() < 0.1:
+            adapter.delete("ns", key, "hash")
+            model.pop(key, None)
+            continue
+        value = bytes([i % 256]) * rng.choice((1, 50, 200, 1000, 3000))
+        adapter.set("ns", key, "hash", value, 0)
+        model[key] = value
+        read_key = f"key{rng.randrange(500)}"
+        read_value = adapter.get("ns", read_key, "hash")
+        assert read_value is None or read_value == model.get(read_key)
+    stats = adapter.stats
+    assert 0 < stats.entries <= 256
+    assert stats.size_in_bytes <= 64 * 1024
+    assert stats.evictions > 0
+    assert stats.hits > 0
+    found = 0
+    for key, value in model.items():
+        read_value = adapter.get("ns", key, "hash")
+        assert read_value is None or read_value == value
+        found += read_value is not None
+    assert found == stats.entries
+
+
+def test_stats_fields(adapter: SharedMemoryStorageAdapter):
+    segment = adapter._segment
+    assert segment is not None
+    assert len(segment.stripes[0].get_stats()) == STATS_FIELDS
+    adapter.set("ns", "key", "hash", b"value", 0)
+    assert adapter.get("ns", "key", "hash") == b"value"
+    stats = adapter.stats
+    assert (stats.hits, stats.entries, stats.size_in_bytes) == (1, 1, 5)
+
+
+def test_stale_stripe_is_reset(tmp_path: Path):
+    adapter = _adapter(tmp_path / "shm", stripes=1)
+    adapter.set("ns", "key", "hash", b"value", 0)
+    # (a process died while modifying the stripe)
+    adapter._segment.stripes[0].set_dirty(True)  # type: ignore
+    assert adapter.get("ns", "key", "hash") is None
+    adapter.set("ns", "key", "hash", b"value", 0)
+    assert adapter.get("ns", "key", "hash") == b"value"
+    assert adapter.stats.entries == 1
+
+
+def _child_set(path: str, key: str) -> None:
+    adapter = _adapter(Path(path))
+    adapter.set("ns", key, "hash", f"value of {key}".encode(), 0)
+
+
+def _child_crash(path: str) -> None:
+    adapter = _adapter(Path(path), stripes=1)
+    # (as if killed during a write)
+    adapter._segment.stripes[0].set_dirty(True)  # type: ignore
+    os._exit(1)
+
+
+def test_multi_processes(adapter: SharedMemoryStorageAdapter):
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_child_set, args=(adapter.path, f"key{i}"))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    for i in range(4):
+        assert adapter.get("ns", f"key{i}", "hash") == f"value of key{i}".encode()
+    assert adapter.stats.entries == 4
+
+
+def test_crashed_process(tmp_path: Path):
+    adapter = _adapter(tmp_path / "shm", stripes=1)
+    adapter.set("ns", "key", "hash", b"value", 0)
+    process = multiprocessing.get_context("spawn").Process(
+        target=_child_crash, args=(adapter.path,)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 1
+    # (the lock was released by the kernel, the stripe is reset)
+    assert adapter.get("ns", "key", "hash") is None
+    adapter.set("ns", "key", "hash", b"value", 0)
+    assert adapter.get("ns", "key", "hash") == b"value"
+
+
+def test_tiered(tmp_path: Path):
+    upper = _adapter(tmp_path / "shm")
+    lower = DictStorageAdapter(expiry_sweep=False)
+    adapter = TieredStorageAdapter(
+        upper=upper, lower=lower, upper_max_lifetime=10, upper_max_value_size=100
+    )
+    _test_basic(adapter)
+    _test_many(adapter)
+    lower.set("ns", "key", "hash", b"value", 0)
+    assert upper.get("ns", "key", "hash") is None
+    assert adapter.get("ns", "key", "hash") == b"value"
+    assert upper.get("ns", "key", "hash") == b"value"
+    adapter.set("ns", "big", "hash", b"x" * 101, 0)
+    assert upper.get("ns", "big", "hash") is None
+    assert adapter.get_many("ns", [("big", "hash"), ("key", "hash")]) == [
+        b"x" * 101,
+        b"value",
+    ]
+
+
+def test_tiered_remaining_lifetime(tmp_path: Path):
+    # (a value copied to the upper adapter must not outlive the lower one)
+    upper = _adapter(tmp_path / "shm")
+    lower = DictStorageAdapter(expiry_sweep=False)
+    adapter = TieredStorageAdapter(upper=upper, lower=lower, upper_max_lifetime=60)
+    lower.set("ns", "key1", "hash", b"value1", 2)
+    lower.set("ns", "key2", "hash", b"value2", 0)
+    assert adapter.get("ns", "key1", "hash") == b"value1"
+    ((_, lifetime),) = upper.get_many_with_lifetime("ns", [("key1", "hash")])
+    assert lifetime is not None
+    assert 0 < lifetime <= 2
+    ((_, lifetime),) = adapter.get_many_with_lifetime("ns", [("key2", "hash")])
+    assert lifetime == 0.0  # (from the lower adapter)
+    ((_, lifetime),) = upper.get_many_with_lifetime("ns", [("key2", "hash")])
+    assert lifetime is not None
+    assert 59 < lifetime <= 60  # (capped by upper_max_lifetime)
+    time.sleep(2.1)
+    assert adapter.get("ns", "key1", "hash") is None
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_lib(tmp_path: Path):
+    instance = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        shared_memory_path=str(tmp_path / "shm"),
+        shared_memory_size=1024 * 1024,
+    )
+    assert RedisTaggedCache(in_local_memory=True).get_shared_memory_stats() is None
+    instance.set("foo", b"value", tags=["tag1"])
+    assert instance.get("foo", tags=["tag1"]) == b"value"
+    instance.invalidate("tag1")
+    with pytest.raises(CacheMiss):
+        instance.get("foo", tags=["tag1"])
+    stats = instance.get_shared_memory_stats()
+    assert stats is not None
+    assert stats.hits == 1
+    assert stats.entries == 1
+
+
+@pytest.mark.skipif(REDIS_HOST == "", reason="REDIS_HOST is not set")
+def test_lib_settings_mismatch(tmp_path: Path, caplog):
+    # (the shared memory is not used, but the cache still works)
+    _adapter(tmp_path / "shm", size_in_bytes=1024 * 1024).close()
+    instance = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        shared_memory_path=str(tmp_path / "shm"),
+        shared_memory_size=2 * 1024 * 1024,
+    )
+    instance.set("foo", b"value", tags=["tag1"])
+    assert instance.get("foo", tags=["tag1"]) == b"value"
+    assert instance.get_shared_memory_stats() is None
+    assert "can't use the shared memory file" in caplog.text
@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from rtc import CacheMiss, RedisTaggedCache
+from rtc.app.hash import get_random_bytes
+from rtc.app.storage import StoragePort
+from rtc.infra.adapters.storage.dict import DictStorageAdapter
+from rtc.infra.adapters.storage.sqlite import SQLiteStorageAdapter
+from rtc.infra.adapters.storage.tiered import TieredStorageAdapter
+from tests.infra.storage_adapter import (
+    _test_basic,
+    _test_delete_nonexistent,
+    _test_expiration,
+    _test_many,
+    _test_multiple_values,
+    _test_no_expiration,
+    _test_remaining_lifetime,
+)
+
+
+@pytest.fixture
+def adapter(tmp_path: Path) -> StoragePort:
+    return SQLiteStorageAdapter(path=str(tmp_path / "db.sqlite"), expiry_sweep=False)
+
+
+def test_basic(adapter: StoragePort):
+    _test_basic(adapter)
+
+
+def test_expiration(adapter: StoragePort):
+    _test_expiration(adapter)
+
+
+def test_no_expiration(adapter: StoragePort):
+    _test_no_expiration(adapter)
+
+
+def test_multiple_values(adapter: StoragePort):
+    _test_multiple_values(adapter)
+
+
+def test_delete_nonexistent(adapter: StoragePort):
+    _test_delete_nonexistent(adapter)
+
+
+def test_many(adapter: StoragePort):
+    _test_many(adapter)
+
+
+def test_remaining_lifetime(adapter: StoragePort):
+    _test_remaining_lifetime(adapter)
+
+
+def test_overwrite(adapter: SQLiteStorageAdapter):
+    adapter.set("ns", "key", "hash", b"value1", 0)
+    adapter.set("ns", "key", "hash", b"value22", 0)
+    assert adapter.get("ns", "key", "hash") == b"value22"
+    stats = adapter.stats
+    assert stats.entries == 1
+    assert stats.size_in_bytes == 7
+
+
+def test_max_bytes(tmp_path: Path):
+    adapter = SQLiteStorageAdapter(
+        path=str(tmp_path / "db.sqlite"), max_bytes=1000, expiry_sweep=False
+    )
+    for i in range(10):
+        adapter.set("ns", f"key{i}", "hash", b"x" * 200, 0)
+        time.sleep(0.01)
+    stats = adapter.stats
+    assert stats.entries == 5
+    assert stats.size_in_bytes == 1000
+    assert stats.evictions == 5
+    # (least recently accessed values are evicted first)
+    assert adapter.get("ns", "key4", "hash") is None
+    assert adapter.get("ns", "key5", "hash") == b"x" * 200
+    adapter.set("ns", "big", "hash", b"x" * 1001, 0)
+    assert adapter.get("ns", "big", "hash") is None
+
+
+def test_sweep(tmp_path: Path):
+    adapter = SQLiteStorageAdapter(
+        path=str(tmp_path / "db.sqlite"), batch_size=3, expiry_sweep=False
+    )
+    adapter.set_many("ns", [(f"key{i}", "hash", b"value") for i in range(5)], 1)
+    adapter.set("ns", "forever", "hash", b"value", 0)
+    time.sleep(1.1)
+    adapter.sweep()
+    assert adapter.stats.entries == 3
+    adapter.sweep()
+    stats = adapter.stats
+    assert stats.entries == 1
+    assert stats.expired == 5
+    assert adapter.get("ns", "forever", "hash") == b"value"
+
+
+def test_persistence(tmp_path: Path):
+    path = str(tmp_path / "db.sqlite")
+    adapter = SQLiteStorageAdapter(path=path, expiry_sweep=False)
+    adapter.set("ns", "key", "hash", b"value", 0)
+    adapter.close()
+    adapter = SQLiteStorageAdapter(path=path, expiry_sweep=False)
+    assert adapter.get("ns", "key", "hash") == b"value"
+    assert adapter.stats.entries == 1
+
+
+def test_threads(adapter: SQLiteStorageAdapter):
+    def _run(i: int) -> None:
+        for j in range(20):
+            adapter.set("ns", f"key{i}-{j}", "hash", b"value", 0)
+            assert adapter.get("ns", f"key{i}-{j}", "hash") == b"value"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_run, range(4)))
+    assert adapter.stats.entries == 80
+
+
+def test_locked_access_time_update(tmp_path: Path):
+    # (the access time update is best effort: the read must succeed)
+    path = str(tmp_path / "db.sqlite")
+    adapter = SQLiteStorageAdapter(path=path, timeout=0.1, expiry_sweep=False)
+    adapter.set("ns", "key", "hash", b"value", 0)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("UPDATE rtc_values SET accessed = 0")
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        assert adapter.get("ns", "key", "hash") == b"value"
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert adapter.stats.hits == 1
+
+
+def test_close_all_threads(adapter: SQLiteStorageAdapter):
+    threads = [
+        threading.Thread(target=adapter.get, args=("ns", f"key{i}", "hash"))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(adapter._connections) == 3
+    connections = [connection for _, connection in adapter._connections]
+    adapter.close()
+    assert adapter._connections == []
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+
+def _child_set(path: str, key: str) -> None:
+    adapter = SQLiteStorageAdapter(path=path, expiry_sweep=False)
+    adapter.set("ns", key, "hash", f"value of {key}".encode(), 0)
+
+
+def test_multi_processes(adapter: SQLiteStorageAdapter):
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_child_set, args=(adapter.path, f"key{i}"))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    for i in range(4):
+        assert adapter.get("ns", f"key{i}", "hash") == f"value of key{i}".encode()
+
+
+def test_tiered(tmp_path: Path):
+    lower = SQLiteStorageAdapter(path=str(tmp_path / "db.sqlite"), expiry_sweep=False)
+    upper = DictStorageAdapter(expiry_sweep=False)
+    adapter = TieredStorageAdapter(upper=upper, lower=lower, upper_max_value_size=10)
+    adapter.set("ns", "small", "hash", b"value", 0)
+    adapter.set("ns", "big", "hash", b"x" * 100, 0)
+    assert upper.get("ns", "big", "hash") is None
+    assert adapter.get("ns", "big", "hash") == b"x" * 100
+    upper.delete("ns", "small", "hash")  # (for example: evicted from Redis)
+    assert adapter.get("ns", "small", "hash") == b"value"
+    assert upper.get("ns", "small", "hash") == b"value"
+
+
+def test_lib(tmp_path: Path):
+    instance = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        in_local_memory=True,
+        disk_path=str(tmp_path / "db.sqlite"),
+        disk_redis_max_value_size=10,
+    )
+    assert RedisTaggedCache(in_local_memory=True).get_disk_stats() is None
+    instance.set("foo", b"x" * 100, tags=["tag1"])
+    assert instance.get("foo", tags=["tag1"]) == b"x" * 100
+    local_stats = instance.get_local_memory_stats()
+    assert local_stats is not None
+    assert local_stats.entries == 0
+    instance.invalidate("tag1")
+    with pytest.raises(CacheMiss):
+        instance.get("foo", tags=["tag1"])
+    stats = instance.get_disk_stats()
+    assert stats is not None
+    assert stats.hits == 1
+    assert stats.entries == 1
+    assert os.path.exists(tmp_path / "db.sqlite")
+
+
+def test_lib_lifetime(tmp_path: Path):
+    # (a value copied back from the disk must not outlive its lifetime)
+    instance = RedisTaggedCache(
+        namespace=get_random_bytes().hex(),
+        in_local_memory=True,
+        disk_path=str(tmp_path / "db.sqlite"),
+    )
+    calls: List[int] = []
+
+    @instance.decorator(lifetime=1)
+    def decorated() -> int:
+        calls.append(1)
+        return len(calls)
+
+    assert decorated() == 1
+    # (the local copy is lost, for example evicted)
+    local_adapter = instance._service.storage_service.adapter.upper  # type: ignore
+    for shard in local_adapter._shards:
+        with shard.lock:
+            shard.entries.clear()
+            shard.size_in_bytes = 0
+    assert decorated() == 1  # (read from the disk, copied back)
+    time.sleep(1.5)
+    assert decorated() == 2
@@ -0,0 +1,80 @@
+import gc
+import multiprocessing
+import os
+import time
+from typing import List
+
+import pytest
+
+from rtc.infra.adapters.sweeper import Sweeper
+
+
+class Swept:
+    def __init__(self):
+        self.calls: List[float] = []
+
+    def sweep(self) -> None:
+        self.calls.append(time.monotonic())
+
+
+class BadSwept:
+    def sweep(self) -> None:
+        raise ValueError("foo")
+
+
+def test_sweeper(caplog):
+    sweeper = Sweeper(interval=0.01)
+    swept = Swept()
+    bad = BadSwept()
+    sweeper.register(bad)
+    sweeper.register(swept)
+    time.sleep(0.2)
+    assert len(swept.calls) > 3
+    assert "Error while sweeping" in caplog.text
+    sweeper.stop()
+    calls = len(swept.calls)
+    time.sleep(0.05)
+    assert len(swept.calls) == calls
+    sweeper.register(swept)  # (restarted)
+    time.sleep(0.05)
+    assert len(swept.calls) > calls
+    sweeper.unregister(swept)
+    sweeper.unregister(bad)
+    calls = len(swept.calls)
+    time.sleep(0.05)
+    assert len(swept.calls) <= calls + 1
+    sweeper.stop()
+
+
+def test_sweeper_weak_references():
+    sweeper = Sweeper(interval=100)
+    swept = Swept()
+    sweeper.register(swept)
+    sweeper.sweep()
+    assert len(swept.calls) == 1
+    assert len(sweeper._refs) == 1
+    del swept
+    gc.collect()
+    assert len(sweeper._refs) == 0
+    sweeper.stop()
+
+
+def _check_forked_sweeper(sweeper: Sweeper, swept: Swept) -> None:
+    # (in the child process: no new register() call)
+    calls = len(swept.calls)
+    time.sleep(0.2)
+    os._exit(0 if len(swept.calls) > calls else 1)
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="fork is required")
+def test_sweeper_after_fork():
+    sweeper = Sweeper(interval=0.01)
+    swept = Swept()
+    sweeper.register(swept)
+    process = multiprocessing.get_context("fork").Process(
+        target=_check_forked_sweeper, args=(sweeper, swept)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    sweeper.stop()